@@ -0,0 +1,270 @@
+import json
+import gzip
+import asyncio
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+from http import HTTPStatus
+import pandas as pd
+import numpy as np
+from models.predictive_models import PredictiveAnalytics
+from models.period_analytics import PeriodAnalytics, LEVELS
+from utils.reporting import ReportGenerator
+from utils.config import API_HOST, API_PORT, API_CACHE_SIZE, API_WORKERS, API_GZIP_MIN_SIZE
+
+def to_jsonable(value):
+    """Konversi hasil pandas/NumPy ke tipe yang bisa di-serialisasi JSON"""
+    if isinstance(value, pd.DataFrame):
+        return json.loads(value.to_json(orient='records'))
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class ResponseCache:
+    """Cache respons LRU; kunci sudah memuat versi data sehingga tidak perlu invalidasi"""
+
+    def __init__(self, max_size=API_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+class AnalyticsAPI:
+    """Endpoint JSON read-only di atas OBEDatabase, PredictiveAnalytics dan ReportGenerator"""
+
+    def __init__(self, database):
+        self.db = database
+        self.predictive = PredictiveAnalytics(database)
+        self.period_analytics = PeriodAnalytics(database)
+        self.report_generator = ReportGenerator(database)
+        self.routes = {
+            '/health': self.health,
+            '/plo': self.plo_achievement,
+            '/plo/kategori': self.plo_achievement_by_category,
+            '/risk': self.risk_assessment,
+            '/forecast': self.forecast,
+            '/periode': self.period_comparison,
+            '/summary': self.summary
+        }
+
+    def health(self, params):
+        return {'status': 'ok', 'data_version': self.db.get_data_version()}
+
+    def plo_achievement(self, params):
+        return self.db.get_plo_achievement()
+
+    def plo_achievement_by_category(self, params):
+        return self.db.get_plo_achievement_by_category()
+
+    def risk_assessment(self, params):
+        risk_data = self.predictive.calculate_plo_risk_assessment()
+        level = params.get('tingkat_risiko')
+        if level and not risk_data.empty:
+            risk_data = risk_data[risk_data['tingkat_risiko'] == level]
+        return risk_data
+
+    def forecast(self, params):
+        periods = self._int_param(params, 'periods', 2, 1, 8)
+        n_bootstrap = self._int_param(params, 'n_bootstrap', 1000, 100, 20000)
+        kode_plo = params.get('plo')
+        if kode_plo:
+            result = self.predictive.predict_plo_trend(kode_plo, periods, n_bootstrap=n_bootstrap)
+            if 'error' in result:
+                raise ApiError(HTTPStatus.NOT_FOUND, result['error'])
+            return result
+        return self.predictive.predict_all_plo_trends(periods=periods, n_bootstrap=n_bootstrap)
+
+    def period_comparison(self, params):
+        level = params.get('level', 'plo')
+        if level not in LEVELS:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"level harus salah satu dari {', '.join(LEVELS)}")
+        keys = [k for k in params.get('kode', '').split(',') if k] or None
+        rolling_years = self._int_param(params, 'rolling_tahun', 2, 1, 10)
+        if params.get('terakhir') == '1':
+            return self.period_analytics.latest_changes(level, keys=keys, rolling_years=rolling_years)
+        return self.period_analytics.compare_periods(
+            level, self._period_param(params, 'dari'), self._period_param(params, 'sampai'),
+            keys=keys, rolling_years=rolling_years
+        )
+
+    def summary(self, params):
+        return self.report_generator._prepare_summary_data()
+
+    @staticmethod
+    def _int_param(params, name, default, minimum, maximum):
+        try:
+            value = int(params.get(name, default))
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Parameter {name} harus bilangan bulat")
+        return max(minimum, min(maximum, value))
+
+    @staticmethod
+    def _period_param(params, name):
+        value = params.get(name)
+        if not value:
+            return None
+        try:
+            tahun, semester = (int(v) for v in value.split('/'))
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Parameter {name} harus berformat tahun/semester")
+        return tahun, semester
+
+    def render(self, path, params):
+        handler = self.routes.get(path)
+        if handler is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"Endpoint tidak ditemukan: {path}")
+        return json.dumps(to_jsonable(handler(params)), ensure_ascii=False, allow_nan=False).encode('utf-8')
+
+class AnalyticsServer:
+    """Server HTTP asyncio kecil dengan ETag berbasis versi data, cache dan gzip.
+
+    Respons yang ada di cache dilayani langsung di event loop; hanya cache
+    miss yang menjalankan query dan analitik di thread pool terbatas.
+    """
+
+    def __init__(self, database, host=API_HOST, port=API_PORT, workers=API_WORKERS):
+        self.db = database
+        self.api = AnalyticsAPI(database)
+        self.host = host
+        self.port = port
+        self.cache = ResponseCache()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='obe-api')
+
+    async def serve_forever(self):
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        print(f"OBE Analytics API berjalan di http://{self.host}:{self.port}")
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, headers = request
+                status, response_headers, body = await self.handle_request(method, target, headers)
+                self._write_response(writer, status, response_headers, body, method == 'HEAD')
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        parts = request_line.decode('latin-1').split()
+        if len(parts) != 3:
+            return None
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return parts[0].upper(), parts[1], headers
+
+    async def handle_request(self, method, target, headers):
+        if method not in ('GET', 'HEAD'):
+            return self._error(HTTPStatus.METHOD_NOT_ALLOWED, "Hanya GET yang didukung")
+
+        url = urlsplit(target)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        path = url.path.rstrip('/') or '/'
+
+        loop = asyncio.get_running_loop()
+        version = await loop.run_in_executor(self.executor, self.db.get_data_version)
+        key = (path, tuple(sorted(params.items())), version)
+        etag = '"v{}-{}"'.format(version, hashlib.sha1(repr(key[:2]).encode()).hexdigest()[:12])
+
+        if headers.get('if-none-match') == etag:
+            return HTTPStatus.NOT_MODIFIED, {'ETag': etag}, b''
+
+        entry = self.cache.get(key)
+        if entry is None:
+            try:
+                body = await loop.run_in_executor(self.executor, self.api.render, path, params)
+            except ApiError as e:
+                return self._error(e.status, str(e))
+            except Exception as e:
+                return self._error(HTTPStatus.INTERNAL_SERVER_ERROR, str(e))
+            compressed = gzip.compress(body, compresslevel=6) if len(body) >= API_GZIP_MIN_SIZE else None
+            entry = (body, compressed)
+            self.cache.put(key, entry)
+
+        body, compressed = entry
+        response_headers = {
+            'Content-Type': 'application/json; charset=utf-8',
+            'ETag': etag,
+            'Cache-Control': 'no-cache',
+            'Vary': 'Accept-Encoding'
+        }
+        if compressed is not None and 'gzip' in headers.get('accept-encoding', ''):
+            body = compressed
+            response_headers['Content-Encoding'] = 'gzip'
+        return HTTPStatus.OK, response_headers, body
+
+    @staticmethod
+    def _error(status, message):
+        body = json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+        return status, {'Content-Type': 'application/json; charset=utf-8'}, body
+
+    @staticmethod
+    def _write_response(writer, status, headers, body, head_only=False):
+        lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+        headers = dict(headers, **{'Content-Length': str(len(body))})
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1'))
+        if not head_only:
+            writer.write(body)
+
+def main():
+    from database.database import OBEDatabase
+
+    parser = argparse.ArgumentParser(description="OBE Analytics JSON API")
+    parser.add_argument('--db', default="database/obe_database.db")
+    parser.add_argument('--host', default=API_HOST)
+    parser.add_argument('--port', type=int, default=API_PORT)
+    parser.add_argument('--workers', type=int, default=API_WORKERS)
+    args = parser.parse_args()
+
+    server = AnalyticsServer(OBEDatabase(args.db), args.host, args.port, args.workers)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
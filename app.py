@@ -5,6 +5,8 @@ import plotly.graph_objects as go
 from database.database import OBEDatabase
 from models.predictive_models import PredictiveAnalytics, AdvancedAnalytics
 from utils.reporting import ReportGenerator
+from utils.dashboard_snapshot import get_dashboard_snapshot
+from utils.profiling import profiled_page, profiling_sidebar
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -103,25 +105,27 @@ def main():
         show_predictive_analytics()
     elif page == "Automated Reporting":
         show_automated_reporting()
+    
+    # Ringkasan trace rerun ini (hanya tampil saat profiling aktif)
+    profiling_sidebar()
 
+@profiled_page("Dashboard Utama")
 def show_dashboard():
     st.markdown('<div class="main-header">🏠 Dashboard Sistem OBE</div>', unsafe_allow_html=True)
     
-    # Load data
-    plo_data = db.get_all_plo()
-    mk_data = db.get_all_mata_kuliah()
-    assessment_data = db.get_assessment_data()
+    # Snapshot bersama seluruh sesi, dibangun ulang hanya saat data berubah
+    snapshot = get_dashboard_snapshot(db)
+    metrics = snapshot.metrics
     
     # Metrics
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total PLO", len(plo_data), "12 target")
+        st.metric("Total PLO", metrics['total_plo'], "12 target")
     with col2:
-        st.metric("Mata Kuliah", len(mk_data), f"{len(mk_data)} aktif")
+        st.metric("Mata Kuliah", metrics['total_mk'], f"{metrics['total_mk']} aktif")
     with col3:
-        avg_achievement = calculate_avg_plo_achievement()
-        st.metric("Pencapaian PLO", f"{avg_achievement}%", "±2% from target")
+        st.metric("Pencapaian PLO", f"{metrics['avg_plo_achievement']}%", "±2% from target")
     with col4:
         st.metric("Tingkat Kepuasan", "4.2/5", "0.1 from last period")
     
@@ -132,7 +136,7 @@ def show_dashboard():
     
     with col1:
         st.subheader("📊 Pencapaian PLO per Kategori")
-        achievement_by_category = calculate_plo_achievement_by_category()
+        achievement_by_category = snapshot.achievement_by_category
         if not achievement_by_category.empty:
             fig = px.bar(achievement_by_category, x='kategori', y='pencapaian_rata_rata',
                         color='pencapaian_rata_rata', color_continuous_scale='Viridis',
@@ -141,46 +145,25 @@ def show_dashboard():
     
     with col2:
         st.subheader("🎯 Risk Assessment PLO")
-        risk_data = predictive_engine.calculate_plo_risk_assessment()
-        if not risk_data.empty:
-            risk_count = risk_data['tingkat_risiko'].value_counts()
-            fig = px.pie(values=risk_count.values, names=risk_count.index,
+        risk_count = snapshot.risk_distribution
+        if risk_count:
+            fig = px.pie(values=list(risk_count.values()), names=list(risk_count.keys()),
                         title='Distribusi Tingkat Risiko PLO')
             st.plotly_chart(fig, use_container_width=True)
     
     # Recent Assessments
     st.subheader("📈 Assessment Terbaru")
-    if not assessment_data.empty:
-        recent_assessments = assessment_data.nlargest(10, 'tahun')
-        st.dataframe(recent_assessments[['kode_mk', 'kode_clo', 'tahun', 'semester', 'nilai_rata_rata']], 
-                    use_container_width=True)
+    if not snapshot.recent_assessments.empty:
+        st.dataframe(snapshot.recent_assessments, use_container_width=True)
     else:
         st.info("Belum ada data assessment")
-
-def calculate_avg_plo_achievement():
-    """Menghitung rata-rata pencapaian PLO"""
-    assessment_data = db.get_assessment_data()
-    if assessment_data.empty:
-        return 0
-    return round(assessment_data['nilai_rata_rata'].mean(), 2)
-
-def calculate_plo_achievement_by_category():
-    """Menghitung pencapaian PLO per kategori"""
-    assessment_data = db.get_assessment_data()
-    plo_data = db.get_all_plo()
-    
-    if assessment_data.empty or plo_data.empty:
-        return pd.DataFrame()
     
-    # Merge data untuk analisis
-    matrix_data = db.get_plo_clo_matrix()
-    merged_data = pd.merge(assessment_data, matrix_data, on=['kode_mk', 'kode_clo'])
-    
-    achievement_by_category = merged_data.groupby('kategori')['nilai_rata_rata'].mean().reset_index()
-    achievement_by_category.columns = ['kategori', 'pencapaian_rata_rata']
-    achievement_by_category['pencapaian_rata_rata'] = achievement_by_category['pencapaian_rata_rata'].round(2)
-    
-    return achievement_by_category
+    # Anomali yang terdeteksi saat input assessment
+    st.subheader(f"🚨 Anomali Assessment ({metrics['anomali_baru']} belum ditinjau)")
+    if not snapshot.recent_anomalies.empty:
+        st.dataframe(snapshot.recent_anomalies, use_container_width=True, hide_index=True)
+    else:
+        st.success("✅ Tidak ada anomali baru")
 
 # Implement other page functions similarly...
 
@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+from utils.config import (ANOMALY_EWMA_ALPHA, ANOMALY_Z_THRESHOLD, ANOMALY_MIN_OBSERVASI,
+                          ANOMALY_MIN_STD)
+
+# tingkat statistik -> kolom pembentuk kunci
+TINGKAT = {
+    'mk': ['kode_mk'],
+    'clo': ['kode_mk', 'kode_clo']
+}
+METRIK = ['nilai_rata_rata', 'jumlah_mahasiswa']
+
+class StreamingAnomalyDetector:
+    """Deteksi anomali saat assessment masuk dengan statistik EWMA online.
+
+    Untuk setiap mata kuliah dan setiap CLO disimpan rata-rata dan varians
+    EWMA dari nilai_rata_rata dan jumlah_mahasiswa (tabel assessment_stats).
+    Baris baru dibandingkan dengan statistik sebelum baris itu masuk; jika
+    |z| melewati ANOMALY_Z_THRESHOLD baris dicatat di assessment_anomaly.
+    Batch diproses per "langkah": langkah ke-k memproses baris ke-k dari
+    setiap kunci sekaligus, sehingga urutan per kunci tetap terjaga tanpa
+    loop per baris.
+    """
+
+    def __init__(self, alpha=ANOMALY_EWMA_ALPHA, z_threshold=ANOMALY_Z_THRESHOLD,
+                 min_observasi=ANOMALY_MIN_OBSERVASI):
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.min_observasi = min_observasi
+
+    @staticmethod
+    def _keys(rows, tingkat):
+        columns = TINGKAT[tingkat]
+        keys = rows[columns[0]].astype(str)
+        for column in columns[1:]:
+            keys = keys + '/' + rows[column].astype(str)
+        return keys
+
+    @staticmethod
+    def _load_state(conn, tingkat, metrik, keys):
+        state = pd.DataFrame({'kunci': keys, 'n': 0, 'mean': 0.0, 'var': 0.0}).set_index('kunci')
+        # Dibaca per potongan agar jumlah parameter tetap di bawah batas SQLite
+        for start in range(0, len(keys), 500):
+            chunk = list(keys[start:start + 500])
+            stored = pd.read_sql(
+                "SELECT kunci, n, mean, var FROM assessment_stats WHERE tingkat = ? AND metrik = ? "
+                "AND kunci IN ({})".format(", ".join("?" * len(chunk))),
+                conn, params=[tingkat, metrik] + chunk, index_col='kunci'
+            )
+            state.loc[stored.index, ['n', 'mean', 'var']] = stored[['n', 'mean', 'var']].values
+        return state
+
+    def _score(self, key_idx, values, n, mean, var, min_std):
+        """Proses nilai per langkah; mengembalikan (ekspektasi, z) sebelum update"""
+        order = pd.Series(key_idx).groupby(key_idx).cumcount().values
+        expected = np.full(len(values), np.nan)
+        z = np.full(len(values), np.nan)
+        valid = ~np.isnan(values)
+
+        for step in range(order.max() + 1 if len(order) else 0):
+            rows = np.flatnonzero((order == step) & valid)
+            if not len(rows):
+                continue
+            k = key_idx[rows]
+            x = values[rows]
+
+            std = np.maximum(np.sqrt(var[k]), min_std)
+            ready = n[k] >= self.min_observasi
+            expected[rows] = np.where(ready, mean[k], np.nan)
+            z[rows] = np.where(ready, (x - mean[k]) / std, np.nan)
+
+            # Observasi pertama menjadi rata-rata awal, selanjutnya update EWMA
+            first = n[k] == 0
+            diff = x - mean[k]
+            increment = self.alpha * diff
+            mean[k] = np.where(first, x, mean[k] + increment)
+            var[k] = np.where(first, 0.0, (1 - self.alpha) * (var[k] + diff * increment))
+            n[k] += 1
+        return expected, z
+
+    def observe(self, conn, rows, record=True):
+        """Update statistik dari batch assessment (dengan kolom id) dan catat anomalinya.
+
+        Dipanggil di dalam transaksi insert sehingga statistik, anomali dan data
+        assessment selalu konsisten. Mengembalikan DataFrame anomali baru.
+        """
+        if rows.empty:
+            return pd.DataFrame()
+        rows = rows.sort_values(['tahun', 'semester', 'id'], kind='stable').reset_index(drop=True)
+        anomalies = []
+        stats = []
+
+        for tingkat in TINGKAT:
+            keys = self._keys(rows, tingkat)
+            key_idx, uniques = pd.factorize(keys)
+            for metrik in METRIK:
+                values = pd.to_numeric(rows[metrik], errors='coerce').to_numpy(dtype=float)
+                state = self._load_state(conn, tingkat, metrik, uniques)
+                n = state['n'].to_numpy(dtype=np.int64, copy=True)
+                mean = state['mean'].to_numpy(dtype=float, copy=True)
+                var = state['var'].to_numpy(dtype=float, copy=True)
+
+                expected, z = self._score(key_idx, values, n, mean, var, ANOMALY_MIN_STD[metrik])
+                stats.append(pd.DataFrame({'tingkat': tingkat, 'kunci': uniques, 'metrik': metrik,
+                                           'n': n, 'mean': mean, 'var': var}))
+
+                flagged = np.abs(np.nan_to_num(z)) >= self.z_threshold
+                if record and flagged.any():
+                    found = rows.loc[flagged, ['id', 'kode_mk', 'kode_clo', 'tahun', 'semester']].copy()
+                    found['tingkat'] = tingkat
+                    found['metrik'] = metrik
+                    found['nilai'] = values[flagged]
+                    found['ekspektasi'] = np.round(expected[flagged], 2)
+                    found['z_score'] = np.round(z[flagged], 2)
+                    found['arah'] = np.where(z[flagged] < 0, 'turun', 'naik')
+                    anomalies.append(found.rename(columns={'id': 'assessment_id'}))
+
+        stats = pd.concat(stats, ignore_index=True)
+        conn.executemany(
+            "INSERT OR REPLACE INTO assessment_stats (tingkat, kunci, metrik, n, mean, var) VALUES (?, ?, ?, ?, ?, ?)",
+            stats.astype(object).itertuples(index=False, name=None)
+        )
+        if not anomalies:
+            return pd.DataFrame()
+        anomalies = pd.concat(anomalies, ignore_index=True)
+        columns = ['assessment_id', 'tingkat', 'kode_mk', 'kode_clo', 'tahun', 'semester', 'metrik',
+                   'nilai', 'ekspektasi', 'z_score', 'arah']
+        conn.executemany(
+            """INSERT INTO assessment_anomaly
+            (assessment_id, tingkat, kode_mk, kode_clo, tahun, semester, metrik, nilai, ekspektasi, z_score, arah)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            anomalies[columns].astype(object).itertuples(index=False, name=None)
+        )
+        return anomalies[columns]
+
+    def replay(self, conn, record=True, chunksize=50000, archive=None):
+        """Bangun ulang statistik dari seluruh riwayat assessment (urut periode).
+
+        Partisi arsip (periode tertutup) diamati lebih dulu hanya untuk statistik;
+        anomalinya tidak dicatat karena barisnya sudah tidak ada di tabel assessment.
+        """
+        conn.execute("DELETE FROM assessment_stats")
+        if record:
+            conn.execute("DELETE FROM assessment_anomaly")
+        if archive is not None:
+            for rows in archive.iter_partitions(conn):
+                self.observe(conn, rows, record=False)
+        query = """SELECT id, kode_mk, kode_clo, tahun, semester, nilai_rata_rata, jumlah_mahasiswa
+                   FROM assessment ORDER BY tahun, semester, id"""
+        total = 0
+        for chunk in pd.read_sql(query, conn, chunksize=chunksize):
+            total += len(self.observe(conn, chunk, record=record))
+        return total
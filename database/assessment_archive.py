@@ -0,0 +1,216 @@
+import os
+import threading
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.config import ARCHIVE_DIR, ARCHIVE_HOT_YEARS, ARCHIVE_COMPRESSION
+
+ASSESSMENT_COLUMNS = ['id', 'kode_mk', 'kode_clo', 'tahun', 'semester', 'jenis_assessment',
+                      'nilai_rata_rata', 'jumlah_mahasiswa', 'created_at']
+
+# Ukuran aditif per sel (mk, clo, tahun, semester, jenis) yang dipindah ke tabel ringkasan arsip
+CELL_MEASURES = """
+    TOTAL(nilai_rata_rata) AS total_nilai,
+    COUNT(nilai_rata_rata) AS jumlah_nilai,
+    TOTAL(nilai_rata_rata * nilai_rata_rata) AS total_nilai_kuadrat,
+    SUM(jumlah_mahasiswa) AS total_mahasiswa,
+    COUNT(jumlah_mahasiswa) AS jumlah_mahasiswa_terisi,
+    COUNT(*) AS jumlah_baris
+"""
+MEASURES = ('total_nilai', 'jumlah_nilai', 'total_nilai_kuadrat', 'total_mahasiswa',
+            'jumlah_mahasiswa_terisi', 'jumlah_baris')
+
+class AssessmentArchive:
+    """Arsip bertingkat assessment: tahun akademik tertutup dipindah ke file Parquet.
+
+    Setiap partisi (tahun, semester) ditulis sebagai file Parquet terkompresi
+    di ``<arsip>/tahun=<t>/semester=<s>/``. Dalam satu transaksi baris
+    dihapus dari tabel assessment (anomali yang menunjuk ke baris tersebut
+    dilepas, assessment_id = NULL), file didaftarkan di
+    assessment_archive_partition dan agregat aditif per sel disimpan di
+    assessment_archive, sehingga agregasi SQL (view assessment_agregat) tetap
+    mencakup data arsip tanpa membaca file. File yang tidak terdaftar (mis.
+    proses gagal sebelum commit) tidak pernah dibaca.
+    """
+
+    def __init__(self, database, directory=ARCHIVE_DIR):
+        self.db = database
+        prefix = os.path.splitext(os.path.basename(database.db_path))[0]
+        self.directory = directory or os.path.join(os.path.dirname(database.db_path) or '.', 'archive',
+                                                   f"{prefix}-assessment")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def create_tables(cursor):
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS assessment_archive (
+                kode_mk TEXT,
+                kode_clo TEXT,
+                tahun INTEGER,
+                semester INTEGER,
+                jenis_assessment TEXT,
+                {", ".join(f"{m} {'REAL' if m in ('total_nilai', 'total_nilai_kuadrat') else 'INTEGER'}" for m in MEASURES)}
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_assessment_archive_mk_clo ON assessment_archive (kode_mk, kode_clo)")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS assessment_archive_partition (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tahun INTEGER,
+                semester INTEGER,
+                path TEXT,
+                jumlah_baris INTEGER,
+                id_min INTEGER,
+                id_max INTEGER,
+                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        # Satu baris per assessment (hot) atau per sel (arsip); agregasi cukup SUM atas kolom ukuran.
+        # Nilai di-CAST ke REAL agar SUM/AVG nilai bulat tidak menjadi pembagian integer.
+        # View dibuat ulang setiap inisialisasi supaya database lama ikut memakai definisi terbaru.
+        cursor.execute("DROP VIEW IF EXISTS assessment_agregat")
+        cursor.execute(f'''
+            CREATE VIEW assessment_agregat AS
+            SELECT kode_mk, kode_clo, tahun, semester, jenis_assessment,
+                   CAST(nilai_rata_rata AS REAL) AS total_nilai,
+                   nilai_rata_rata IS NOT NULL AS jumlah_nilai,
+                   CAST(nilai_rata_rata AS REAL) * nilai_rata_rata AS total_nilai_kuadrat,
+                   jumlah_mahasiswa AS total_mahasiswa,
+                   jumlah_mahasiswa IS NOT NULL AS jumlah_mahasiswa_terisi,
+                   1 AS jumlah_baris
+            FROM assessment
+            UNION ALL
+            SELECT kode_mk, kode_clo, tahun, semester, jenis_assessment, {", ".join(MEASURES)}
+            FROM assessment_archive
+        ''')
+
+    def partitions(self, tahun=None, semester=None):
+        """Partisi arsip yang terdaftar, dipangkas berdasarkan tahun/semester"""
+        query = "SELECT * FROM assessment_archive_partition WHERE 1 = 1"
+        params = []
+        if tahun:
+            query += " AND tahun = ?"
+            params.append(tahun)
+        if semester:
+            query += " AND semester = ?"
+            params.append(semester)
+        conn = self.db.get_connection()
+        df = pd.read_sql(query + " ORDER BY tahun DESC, semester DESC, id", conn, params=params)
+        conn.close()
+        return df
+
+    def read(self, tahun=None, semester=None, columns=None):
+        """Baris assessment dari partisi arsip yang cocok dengan filter"""
+        columns = columns or ASSESSMENT_COLUMNS
+        frames = []
+        for path in self.partitions(tahun, semester)['path']:
+            frames.append(pq.read_table(os.path.join(self.directory, path), columns=columns).to_pandas())
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def iter_partitions(self, conn):
+        """Baris arsip per partisi urut periode, memakai koneksi pemanggil (mis. di dalam transaksi)"""
+        paths = conn.execute("SELECT path FROM assessment_archive_partition ORDER BY tahun, semester, id").fetchall()
+        for (path,) in paths:
+            yield pq.read_table(os.path.join(self.directory, path), columns=ASSESSMENT_COLUMNS).to_pandas()
+
+    def closed_periods(self, hot_years=ARCHIVE_HOT_YEARS):
+        """Periode di tabel hot yang tahunnya sudah tertutup (di luar hot_years tahun terakhir)"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT MAX(tahun) FROM assessment")
+        latest = cursor.fetchone()[0]
+        if latest is None:
+            conn.close()
+            return []
+        cursor.execute("""SELECT DISTINCT tahun, semester FROM assessment
+                          WHERE tahun <= ? AND semester IS NOT NULL ORDER BY tahun, semester""",
+                       (latest - hot_years,))
+        periods = cursor.fetchall()
+        conn.close()
+        return periods
+
+    def archive(self, periods=None, hot_years=ARCHIVE_HOT_YEARS):
+        """Pindahkan periode tertutup ke arsip; mengembalikan daftar partisi yang ditulis"""
+        with self._lock:
+            results = []
+            for tahun, semester in (periods if periods is not None else self.closed_periods(hot_years)):
+                result = self._archive_partition(int(tahun), int(semester))
+                if result:
+                    results.append(result)
+            return results
+
+    def _archive_partition(self, tahun, semester):
+        conn = self.db.get_connection()
+        path = None
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = pd.read_sql(f"SELECT {', '.join(ASSESSMENT_COLUMNS)} FROM assessment "
+                               "WHERE tahun = ? AND semester = ? ORDER BY id", conn, params=(tahun, semester))
+            if rows.empty:
+                conn.rollback()
+                return None
+            id_min, id_max = int(rows['id'].min()), int(rows['id'].max())
+
+            relative = os.path.join(f"tahun={tahun}", f"semester={semester}", f"part-{id_min}-{id_max}.parquet")
+            path = os.path.join(self.directory, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            table = pa.Table.from_pandas(rows.astype({'jumlah_mahasiswa': 'Int64'}), preserve_index=False)
+            pq.write_table(table, f"{path}.tmp", compression=ARCHIVE_COMPRESSION)
+            os.replace(f"{path}.tmp", path)
+
+            conn.execute(f"""
+                INSERT INTO assessment_archive (kode_mk, kode_clo, tahun, semester, jenis_assessment, {", ".join(MEASURES)})
+                SELECT kode_mk, kode_clo, tahun, semester, jenis_assessment, {CELL_MEASURES}
+                FROM assessment WHERE tahun = ? AND semester = ? AND id BETWEEN ? AND ?
+                GROUP BY kode_mk, kode_clo, tahun, semester, jenis_assessment
+            """, (tahun, semester, id_min, id_max))
+            conn.execute("""INSERT INTO assessment_archive_partition
+                            (tahun, semester, path, jumlah_baris, id_min, id_max) VALUES (?, ?, ?, ?, ?, ?)""",
+                         (tahun, semester, relative, len(rows), id_min, id_max))
+            # Anomali tetap di antrean tinjauan (kode_mk, kode_clo dan periode tersimpan di barisnya),
+            # tetapi tidak lagi menunjuk ke baris assessment yang dipindahkan ke arsip
+            detached = conn.execute("""
+                UPDATE assessment_anomaly SET assessment_id = NULL
+                WHERE assessment_id IN (SELECT id FROM assessment
+                                        WHERE tahun = ? AND semester = ? AND id BETWEEN ? AND ?)
+            """, (tahun, semester, id_min, id_max)).rowcount
+            conn.execute("DELETE FROM assessment WHERE tahun = ? AND semester = ? AND id BETWEEN ? AND ?",
+                         (tahun, semester, id_min, id_max))
+            conn.commit()
+            return {'tahun': tahun, 'semester': semester, 'path': path, 'jumlah_baris': len(rows),
+                    'ukuran_byte': os.path.getsize(path), 'anomali_dilepas': detached}
+        except Exception as e:
+            conn.rollback()
+            # File yang belum terdaftar dihapus agar tidak tertinggal
+            if path and os.path.exists(path):
+                os.remove(path)
+            print(f"Error: {e}")
+            return None
+        finally:
+            conn.close()
+
+def main():
+    import argparse
+    from database.database import OBEDatabase
+
+    parser = argparse.ArgumentParser(description="Arsipkan assessment tahun akademik tertutup ke Parquet")
+    parser.add_argument('--db', default="database/obe_database.db")
+    parser.add_argument('--hot-years', type=int, default=ARCHIVE_HOT_YEARS,
+                        help="Jumlah tahun terakhir yang tetap di tabel assessment")
+    parser.add_argument('--dry-run', action='store_true', help="Hanya tampilkan periode yang akan diarsipkan")
+    args = parser.parse_args()
+
+    database = OBEDatabase(args.db)
+    periods = database.archive.closed_periods(args.hot_years)
+    if args.dry_run:
+        for tahun, semester in periods:
+            print(f"{tahun} semester {semester}")
+        return
+    for result in database.archive.archive(periods):
+        print(f"{result['tahun']} semester {result['semester']}: {result['jumlah_baris']} baris, "
+              f"{result['ukuran_byte']} byte -> {result['path']}")
+
+if __name__ == "__main__":
+    main()
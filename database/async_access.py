@@ -0,0 +1,82 @@
+import asyncio
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from utils.config import DB_ASYNC_WORKERS
+
+EXECUTOR_PREFIX = 'obe-db'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_executor():
+    """Thread pool terbatas bersama untuk semua pembacaan database dalam proses"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DB_ASYNC_WORKERS, thread_name_prefix=EXECUTOR_PREFIX)
+        return _executor
+
+def _in_worker_thread():
+    return threading.current_thread().name.startswith(EXECUTOR_PREFIX)
+
+def _as_call(spec):
+    """Menerima callable atau tuple (callable, arg1, arg2, ...)"""
+    if isinstance(spec, tuple):
+        return partial(spec[0], *spec[1:])
+    return spec
+
+class AsyncDataAccess:
+    """Facade async di atas OBEDatabase.
+
+    Setiap method OBEDatabase bisa dipanggil sebagai coroutine
+    (``await adb.get_all_plo()``) dan dijalankan di thread pool terbatas;
+    method sinkron aslinya tetap bisa dipakai seperti biasa. sqlite3
+    melepas GIL selama query berjalan, sehingga query independen untuk satu
+    halaman atau satu laporan benar-benar berjalan bersamaan.
+    """
+
+    def __init__(self, database, executor=None):
+        self.db = database
+        self.executor = executor or get_executor()
+
+    async def call(self, func, *args, **kwargs):
+        """Menjalankan callable sinkron apa pun (mis. method analitik) di executor"""
+        # Panggilan dari dalam worker dijalankan langsung agar pool tidak saling menunggu
+        if _in_worker_thread():
+            return func(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    def __getattr__(self, name):
+        attribute = getattr(self.db, name)
+        if not callable(attribute):
+            return attribute
+
+        async def method(*args, **kwargs):
+            return await self.call(attribute, *args, **kwargs)
+        method.__name__ = name
+        return method
+
+    async def gather(self, **calls):
+        """Menjalankan beberapa pembacaan sekaligus; hasil dikembalikan sebagai dict per nama"""
+        names = list(calls)
+        results = await asyncio.gather(*(self.call(_as_call(calls[name])) for name in names))
+        return dict(zip(names, results))
+
+def load_concurrently(database, **calls):
+    """Versi sinkron dari AsyncDataAccess.gather untuk halaman Streamlit dan laporan.
+
+    Hanya untuk kode sinkron; pemanggil async harus memakai ``await AsyncDataAccess.gather``.
+
+    Contoh: ``load_concurrently(db, plo=db.get_all_plo, risk=(engine.calculate_plo_risk_assessment,))``
+    """
+    if _in_worker_thread():
+        return {name: _as_call(spec)() for name, spec in calls.items()}
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(AsyncDataAccess(database).gather(**calls))
+    # Menunggu hasil di sini akan memblokir event loop pemanggil
+    raise RuntimeError("load_concurrently tidak bisa dipanggil dari event loop; "
+                       "gunakan await AsyncDataAccess(database).gather(...)")
@@ -0,0 +1,282 @@
+import threading
+import pandas as pd
+
+# Dimensi kubus pada tingkat paling detail; kategori mengikuti kode_plo
+DIMENSIONS = ('kode_mk', 'kode_clo', 'kode_plo', 'kategori', 'tahun', 'semester', 'jenis_assessment')
+KEY_DIMENSIONS = ('kode_mk', 'kode_clo', 'kode_plo', 'tahun', 'semester', 'jenis_assessment')
+MEASURES = ('total_nilai', 'jumlah_nilai', 'total_mahasiswa', 'jumlah_baris')
+CURRICULUM_TABLES = ('plo', 'mata_kuliah', 'clo', 'plo_clo_mapping')
+# Thread refresher berhenti setelah menganggur selama ini (detik); dibuat lagi saat diperlukan
+REFRESH_IDLE_TIMEOUT = 30
+
+# Agregasi assessment x pemetaan dengan join yang sama seperti get_plo_clo_matrix
+CELL_QUERY = """
+SELECT a.kode_mk, a.kode_clo, map.kode_plo, plo.kategori, a.tahun, a.semester, a.jenis_assessment,
+       TOTAL(a.nilai_rata_rata) AS total_nilai,
+       COUNT(a.nilai_rata_rata) AS jumlah_nilai,
+       TOTAL(a.jumlah_mahasiswa) AS total_mahasiswa,
+       COUNT(*) AS jumlah_baris
+FROM assessment a
+JOIN plo_clo_mapping map ON a.kode_mk = map.kode_mk AND a.kode_clo = map.kode_clo
+JOIN mata_kuliah mk ON map.kode_mk = mk.kode_mk
+JOIN clo ON map.kode_clo = clo.kode_clo AND map.kode_mk = clo.kode_mk
+JOIN plo ON map.kode_plo = plo.kode_plo
+WHERE a.id > ? AND a.id <= ?
+GROUP BY a.kode_mk, a.kode_clo, map.kode_plo, a.tahun, a.semester, a.jenis_assessment
+"""
+
+# Sel ringkasan assessment yang sudah diarsipkan (lihat AssessmentArchive), hanya untuk build penuh
+ARCHIVE_CELL_QUERY = """
+SELECT a.kode_mk, a.kode_clo, map.kode_plo, plo.kategori, a.tahun, a.semester, a.jenis_assessment,
+       TOTAL(a.total_nilai) AS total_nilai,
+       TOTAL(a.jumlah_nilai) AS jumlah_nilai,
+       TOTAL(a.total_mahasiswa) AS total_mahasiswa,
+       TOTAL(a.jumlah_baris) AS jumlah_baris
+FROM assessment_archive a
+JOIN plo_clo_mapping map ON a.kode_mk = map.kode_mk AND a.kode_clo = map.kode_clo
+JOIN mata_kuliah mk ON map.kode_mk = mk.kode_mk
+JOIN clo ON map.kode_clo = clo.kode_clo AND map.kode_mk = clo.kode_mk
+JOIN plo ON map.kode_plo = plo.kode_plo
+GROUP BY a.kode_mk, a.kode_clo, map.kode_plo, a.tahun, a.semester, a.jenis_assessment
+"""
+
+class AttainmentCube:
+    """Kubus pencapaian CLO -> mata kuliah -> PLO -> kategori per periode dan jenis assessment.
+
+    Tabel attainment_cube menyimpan ukuran aditif (jumlah nilai, banyak nilai,
+    jumlah mahasiswa, banyak baris) per sel, sehingga setiap slice atau
+    roll-up cukup menjumlahkan sel tanpa join ulang ke assessment. Kubus
+    diperbarui saat versi data berubah: jika sejak refresh terakhir assessment
+    hanya bertambah (selisih versi = jumlah baris baru) hanya baris baru yang
+    diagregasi dan ditambahkan; perubahan kurikulum, update atau hapus
+    assessment (termasuk pengarsipan) membuat kubus dibangun ulang penuh dari
+    baris hot dan sel ringkasan arsip.
+
+    Setiap proses menyimpan salinan sel di memori dengan aturan yang sama
+    (baris baru ditambahkan sebagai sel delta), sehingga roll-up hanya
+    berupa groupby pandas atas sel. Pembacaan tidak pernah menulis: kubus
+    tersimpan diperbarui oleh satu thread refresher per proses.
+    """
+
+    def __init__(self, database):
+        self.db = database
+        self._state = None
+        self._frame = None
+        self._frame_state = None
+        self._lock = threading.Lock()
+        self._refresh_pending = threading.Event()
+        self._refresher = None
+
+    @staticmethod
+    def create_tables(cursor):
+        # Sel dengan tahun/semester/jenis NULL bisa muncul lebih dari sekali; ukuran tetap aditif
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS attainment_cube (
+                kode_mk TEXT,
+                kode_clo TEXT,
+                kode_plo TEXT,
+                kategori TEXT,
+                tahun INTEGER,
+                semester INTEGER,
+                jenis_assessment TEXT,
+                total_nilai REAL NOT NULL,
+                jumlah_nilai INTEGER NOT NULL,
+                total_mahasiswa REAL NOT NULL,
+                jumlah_baris INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute(f"""CREATE UNIQUE INDEX IF NOT EXISTS idx_attainment_cube_sel
+                           ON attainment_cube ({', '.join(KEY_DIMENSIONS)})""")
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS attainment_cube_state (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                versi_kurikulum INTEGER,
+                versi_assessment INTEGER,
+                id_terakhir INTEGER,
+                jumlah_assessment INTEGER
+            )
+        ''')
+
+    @staticmethod
+    def _current_versions(conn):
+        placeholders = ", ".join("?" * len(CURRICULUM_TABLES))
+        return conn.execute(
+            f"""SELECT COALESCE(SUM(CASE WHEN nama_tabel IN ({placeholders}) THEN versi END), 0),
+                       COALESCE(SUM(CASE WHEN nama_tabel = 'assessment' THEN versi END), 0)
+                FROM data_version""",
+            CURRICULUM_TABLES
+        ).fetchone()
+
+    def refresh(self):
+        """Simpan kubus ke versi data saat ini; mengembalikan 'tetap', 'inkremental' atau 'penuh'.
+
+        Mengambil kunci tulis, sehingga hanya dipanggil dari thread refresher
+        (lihat _request_refresh) atau proses pemeliharaan, bukan dari jalur baca.
+        """
+        conn = self.db.get_connection()
+        try:
+            versions = tuple(self._current_versions(conn))
+            if self._state is not None and versions == self._state[:2]:
+                return 'tetap'
+            state = self._stored_state(conn)
+            if state is not None and tuple(state[:2]) == versions:
+                self._state = tuple(state)
+                return 'tetap'
+            conn.execute("BEGIN IMMEDIATE")
+            # Dibaca ulang di dalam transaksi tulis agar proses lain tidak menyisip
+            versions = tuple(self._current_versions(conn))
+            state = self._stored_state(conn)
+            last_id, total = conn.execute("SELECT COALESCE(MAX(id), 0), COUNT(*) FROM assessment").fetchone()
+
+            if state is not None and tuple(state[:2]) == versions:
+                mode = 'tetap'
+            elif self._only_inserts(conn, state, versions + (last_id, total)):
+                self._add_cells(conn, state[2], last_id)
+                mode = 'inkremental'
+            else:
+                conn.execute("DELETE FROM attainment_cube")
+                self._add_cells(conn, 0, last_id, ARCHIVE_CELL_QUERY)
+                mode = 'penuh'
+
+            conn.execute(
+                """INSERT OR REPLACE INTO attainment_cube_state
+                (id, versi_kurikulum, versi_assessment, id_terakhir, jumlah_assessment)
+                VALUES (1, ?, ?, ?, ?)""",
+                (versions[0], versions[1], last_id, total)
+            )
+            conn.commit()
+            self._state = versions + (last_id, total)
+            return mode
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _stored_state(conn):
+        return conn.execute("""SELECT versi_kurikulum, versi_assessment, id_terakhir, jumlah_assessment
+                               FROM attainment_cube_state WHERE id = 1""").fetchone()
+
+    def _request_refresh(self):
+        """Minta thread refresher tunggal menyimpan kubus (self._lock harus dipegang pemanggil).
+
+        Jalur baca tidak pernah menunggu kunci tulis.
+        """
+        self._refresh_pending.set()
+        if self._refresher is None or not self._refresher.is_alive():
+            self._refresher = threading.Thread(target=self._refresh_loop, name='obe-cube-refresher',
+                                               daemon=True)
+            self._refresher.start()
+
+    def _refresh_loop(self):
+        while True:
+            if not self._refresh_pending.wait(timeout=REFRESH_IDLE_TIMEOUT):
+                with self._lock:
+                    if not self._refresh_pending.is_set():
+                        self._refresher = None
+                        return
+                continue
+            self._refresh_pending.clear()
+            try:
+                self.refresh()
+            except Exception as e:
+                # Database sibuk atau terkunci: dicoba lagi pada pembacaan berikutnya
+                print(f"Error: {e}")
+
+    @staticmethod
+    def _only_inserts(conn, old, new):
+        """Setiap baris yang berubah menaikkan versi 1; cocok hanya jika semuanya insert baru.
+
+        State berupa (versi_kurikulum, versi_assessment, id_terakhir, jumlah_assessment).
+        """
+        if old is None or old[0] != new[0]:
+            return False
+        new_rows = conn.execute("SELECT COUNT(*) FROM assessment WHERE id > ? AND id <= ?",
+                                (old[2], new[2])).fetchone()[0]
+        return new[1] - old[1] == new_rows and new[3] == old[3] + new_rows
+
+    @staticmethod
+    def _add_cells(conn, after_id, last_id, archive_query=None):
+        upsert = f"""ON CONFLICT ({', '.join(KEY_DIMENSIONS)}) DO UPDATE SET
+            {', '.join(f'{m} = {m} + excluded.{m}' for m in MEASURES)}"""
+        insert = f"INSERT INTO attainment_cube ({', '.join(DIMENSIONS + MEASURES)})"
+        if archive_query:
+            # WHERE true: diperlukan parser SQLite untuk upsert dari SELECT berisi join
+            conn.execute(f"{insert} SELECT * FROM ({archive_query}) WHERE true {upsert}")
+        conn.execute(f"{insert} {CELL_QUERY} {upsert}", (after_id, last_id))
+
+    @staticmethod
+    def _cells(frames):
+        frames = [frame for frame in frames if not frame.empty] or frames[:1]
+        cells = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        return cells.astype({'jumlah_nilai': 'int64', 'jumlah_baris': 'int64', 'total_mahasiswa': 'float64'})
+
+    def frame(self):
+        """Sel kubus untuk versi data saat ini (salinan per proses, jangan diubah).
+
+        Dibaca dalam satu transaksi baca: kubus tersimpan dipakai bila versinya
+        cocok, ditambah sel delta bila sejak itu assessment hanya bertambah, dan
+        dihitung penuh di memori bila tidak. Penyimpanan kubus diserahkan ke
+        thread refresher sehingga pembacaan tidak pernah mengambil kunci tulis.
+        """
+        with self._lock:
+            conn = self.db.get_connection()
+            try:
+                # Transaksi deferred: versi, state dan sel dibaca dari snapshot yang sama
+                conn.execute("BEGIN")
+                versions = tuple(self._current_versions(conn))
+                if self._frame_state is not None and versions == self._frame_state[:2]:
+                    if self._state is None or self._state[:2] != versions:
+                        # Penyimpanan sebelumnya belum berhasil
+                        self._request_refresh()
+                    return self._frame
+                last_id, total = conn.execute("SELECT COALESCE(MAX(id), 0), COUNT(*) FROM assessment").fetchone()
+                current = versions + (last_id, total)
+                stored = self._stored_state(conn)
+                stored = tuple(stored) if stored is not None else None
+
+                if self._frame is not None and self._only_inserts(conn, self._frame_state, current):
+                    frames = [self._frame, pd.read_sql(CELL_QUERY, conn, params=(self._frame_state[2], last_id))]
+                elif stored is not None and stored[:2] == versions:
+                    frames = [pd.read_sql("SELECT * FROM attainment_cube", conn)]
+                elif self._only_inserts(conn, stored, current):
+                    frames = [pd.read_sql("SELECT * FROM attainment_cube", conn),
+                              pd.read_sql(CELL_QUERY, conn, params=(stored[2], last_id))]
+                else:
+                    frames = [pd.read_sql(ARCHIVE_CELL_QUERY, conn),
+                              pd.read_sql(CELL_QUERY, conn, params=(0, last_id))]
+            finally:
+                conn.rollback()
+                conn.close()
+            self._frame, self._frame_state = self._cells(frames), current
+            if stored is not None and stored[:2] == versions:
+                self._state = stored
+            else:
+                self._request_refresh()
+            return self._frame
+
+    def rollup(self, by, filters=None):
+        """Roll-up kubus ke dimensi ``by``; filters berupa {dimensi: nilai atau daftar nilai}.
+
+        Kolom hasil: dimensi, pencapaian (rata-rata nilai), total_nilai, jumlah_nilai,
+        total_mahasiswa dan jumlah_assessment.
+        """
+        by = list(by)
+        filters = filters or {}
+        unknown = [column for column in by + list(filters) if column not in DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Dimensi tidak dikenal: {', '.join(unknown)}")
+        cells = self.frame()
+        for column, value in filters.items():
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            cells = cells[cells[column].isin(values)]
+
+        if by:
+            result = cells.groupby(by, dropna=False)[list(MEASURES)].sum().reset_index()
+        else:
+            result = cells[list(MEASURES)].sum().to_frame().T
+        result['total_mahasiswa'] = result['total_mahasiswa'].astype('int64')
+        result['pencapaian'] = result['total_nilai'] / result['jumlah_nilai'].where(result['jumlah_nilai'] > 0)
+        return result.rename(columns={'jumlah_baris': 'jumlah_assessment'})[
+            by + ['pencapaian', 'total_nilai', 'jumlah_nilai', 'total_mahasiswa', 'jumlah_assessment']]
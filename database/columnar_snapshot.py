@@ -0,0 +1,106 @@
+import os
+import glob
+import threading
+import pandas as pd
+import pyarrow as pa
+from utils.config import SNAPSHOT_DIR
+
+# nama snapshot -> (tabel sumber untuk versi data, method OBEDatabase pengisi data)
+SNAPSHOT_SOURCES = {
+    'assessment': (('assessment',), 'get_assessment_data'),
+    'plo_clo_matrix': (('plo', 'mata_kuliah', 'clo', 'plo_clo_mapping'), 'get_plo_clo_matrix')
+}
+
+def _types_mapper(arrow_type):
+    # String tetap dibungkus array Arrow (tanpa salinan ke objek Python)
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.StringDtype('pyarrow')
+    return None
+
+_mapped = {}
+_mapped_lock = threading.Lock()
+
+class ColumnarSnapshotStore:
+    """Snapshot kolumnar read-only (Arrow IPC) yang dibagi antar proses Streamlit.
+
+    Setiap snapshot ditulis sekali per versi data ke file
+    ``<db>-<nama>-v<versi>.arrow`` lalu di-memory-map oleh setiap proses.
+    Halaman memori file dibagi oleh page cache OS, sehingga RAM tidak lagi
+    bertambah per worker. File ditulis ke file sementara lalu di-rename
+    sehingga proses lain tidak pernah membaca file setengah jadi.
+    """
+
+    def __init__(self, database, directory=SNAPSHOT_DIR):
+        self.db = database
+        self.directory = directory or os.path.join(os.path.dirname(database.db_path) or '.', 'snapshots')
+        self.prefix = os.path.splitext(os.path.basename(database.db_path))[0]
+
+    def _path(self, name, version):
+        return os.path.join(self.directory, f"{self.prefix}-{name}-v{version}.arrow")
+
+    def _path_prefix(self, name):
+        return os.path.join(self.directory, f"{self.prefix}-{name}-v")
+
+    def ensure(self, name):
+        """Path snapshot untuk versi data saat ini; diekspor jika belum ada"""
+        tables, getter = SNAPSHOT_SOURCES[name]
+        version = self.db.get_data_version(tables)
+        path = self._path(name, version)
+        if not os.path.exists(path):
+            self._export(name, getter, path)
+            self._remove_stale(name, path)
+        return path
+
+    def _export(self, name, getter, path):
+        os.makedirs(self.directory, exist_ok=True)
+        table = pa.Table.from_pandas(getattr(self.db, getter)(), preserve_index=False)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        # Tanpa kompresi agar buffer bisa dibaca langsung dari memory map
+        with pa.OSFile(temp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(temp_path, path)
+
+    def _remove_stale(self, name, current_path):
+        """Hapus snapshot lama, kecuali satu versi sebelumnya yang mungkin sedang dibuka proses lain"""
+        prefix = self._path_prefix(name)
+        older = []
+        for path in glob.glob(self._path(name, '*')):
+            version = path[len(prefix):-len('.arrow')]
+            if path != current_path and version.isdigit():
+                older.append((int(version), path))
+        # Proses yang masih memetakan file lama tetap aman (POSIX); di Windows file dilewati
+        for _, path in sorted(older)[:-1]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def table(self, name, retries=3):
+        """pyarrow.Table zero-copy yang dipetakan dari snapshot terbaru"""
+        for attempt in range(retries):
+            path = self.ensure(name)
+            with _mapped_lock:
+                table = _mapped.get(path)
+                if table is not None:
+                    return table
+                try:
+                    with pa.memory_map(path, 'r') as source:
+                        table = pa.ipc.open_file(source).read_all()
+                except FileNotFoundError:
+                    # File dihapus proses lain setelah ensure(); versi data sudah berubah lagi
+                    if attempt == retries - 1:
+                        raise
+                    continue
+                # Hanya simpan satu versi per snapshot di setiap proses
+                for old_path in [p for p in _mapped if p.startswith(self._path_prefix(name))]:
+                    del _mapped[old_path]
+                _mapped[path] = table
+                return table
+
+    def frame(self, name, columns=None):
+        """DataFrame dari snapshot; kolom numerik tanpa null dan string tidak disalin"""
+        table = self.table(name)
+        if columns is not None:
+            table = table.select(columns)
+        return table.to_pandas(split_blocks=True, types_mapper=_types_mapper)
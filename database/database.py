@@ -1,12 +1,41 @@
+import re
+import html
+import json
 import sqlite3
 import pandas as pd
+import numpy as np
 import streamlit as st
 from datetime import datetime
+from database.validation import DataValidator
+from database.anomaly_detection import StreamingAnomalyDetector
+from database.columnar_snapshot import ColumnarSnapshotStore
+from database.write_queue import WriteBehindQueue
+from database.attainment_cube import AttainmentCube
+from database.assessment_archive import AssessmentArchive
+from utils.config import WRITE_QUEUE_ENABLED
 
 class OBEDatabase:
+    # Tabel yang perubahannya dilacak di tabel data_version
+    VERSIONED_TABLES = ('plo', 'mata_kuliah', 'clo', 'plo_clo_mapping', 'assessment',
+                        'ipo', 'course_prerequisites', 'assessment_anomaly')
+    CURRICULUM_TABLES = ('plo', 'mata_kuliah', 'clo', 'plo_clo_mapping', 'course_prerequisites')
+    # Kolom sort tabel berpaginasi (sort_options di halaman) yang diberi index (kolom, id)
+    PAGINATION_INDEXES = {
+        'plo': ('kode_plo', 'kategori'),
+        'assessment': ('tahun', 'kode_mk', 'nilai_rata_rata')
+    }
+    
     def __init__(self, db_path="database/obe_database.db"):
         self.db_path = db_path
+        self.anomaly_detector = StreamingAnomalyDetector()
+        self.archive = AssessmentArchive(self)
         self.init_database()
+        self.validator = DataValidator(self)
+        self.snapshots = ColumnarSnapshotStore(self)
+        self.attainment = AttainmentCube(self)
+        self.write_queue = None
+        if WRITE_QUEUE_ENABLED:
+            self.enable_write_queue()
     
     def get_connection(self):
         """Membuat koneksi database"""
@@ -17,6 +46,9 @@ class OBEDatabase:
         conn = self.get_connection()
         cursor = conn.cursor()
         
+        # Hanya berlaku untuk file database baru; database lama diubah lewat DatabaseMaintenance
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        
         # Tabel PLO (Program Learning Outcomes)
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS plo (
@@ -112,12 +144,261 @@ class OBEDatabase:
             )
         ''')
         
+        # Tabel Prasyarat Mata Kuliah
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS course_prerequisites (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kode_mk TEXT,
+                kode_mk_prasyarat TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (kode_mk) REFERENCES mata_kuliah (kode_mk),
+                FOREIGN KEY (kode_mk_prasyarat) REFERENCES mata_kuliah (kode_mk),
+                UNIQUE(kode_mk, kode_mk_prasyarat)
+            )
+        ''')
+        
+        # Tabel Jadwal Laporan Otomatis
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS report_schedule (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nama TEXT,
+                jenis_laporan TEXT,
+                format_laporan TEXT, -- Excel, PDF
+                frekuensi TEXT, -- Mingguan, Bulanan, Semesteran, Tahunan
+                penerima TEXT,
+                aktif INTEGER DEFAULT 1,
+                jadwal_berikutnya TIMESTAMP,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Tabel Riwayat Eksekusi Laporan
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS report_run (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                schedule_id INTEGER,
+                jenis_laporan TEXT,
+                format_laporan TEXT,
+                data_version INTEGER,
+                status TEXT, -- sukses, dipakai_ulang, gagal
+                artifact_path TEXT,
+                pesan TEXT,
+                waktu_mulai TIMESTAMP,
+                waktu_selesai TIMESTAMP,
+                FOREIGN KEY (schedule_id) REFERENCES report_schedule (id)
+            )
+        ''')
+        
+        # Tabel Riwayat Maintenance Database (lihat DatabaseMaintenance)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS maintenance_run (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tugas TEXT, -- backup, integrity, optimize, vacuum
+                status TEXT, -- sukses, peringatan, dilewati, gagal
+                durasi_detik REAL,
+                ukuran_sebelum INTEGER,
+                ukuran_sesudah INTEGER,
+                detail TEXT,
+                pesan TEXT,
+                waktu_mulai TIMESTAMP,
+                waktu_selesai TIMESTAMP
+            )
+        ''')
+        
+        # Statistik EWMA per mata kuliah/CLO untuk deteksi anomali saat input
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS assessment_stats (
+                tingkat TEXT, -- mk, clo
+                kunci TEXT,
+                metrik TEXT,
+                n INTEGER,
+                mean REAL,
+                var REAL,
+                PRIMARY KEY (tingkat, kunci, metrik)
+            )
+        ''')
+        
+        # Tabel Anomali Assessment
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS assessment_anomaly (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                assessment_id INTEGER,
+                tingkat TEXT,
+                kode_mk TEXT,
+                kode_clo TEXT,
+                tahun INTEGER,
+                semester INTEGER,
+                metrik TEXT,
+                nilai REAL,
+                ekspektasi REAL,
+                z_score REAL,
+                arah TEXT, -- naik, turun
+                status TEXT DEFAULT 'baru', -- baru, ditinjau, diabaikan
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (assessment_id) REFERENCES assessment (id)
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_assessment_anomaly_status ON assessment_anomaly (status, id)")
+        
+        # Kubus pencapaian CLO -> mata kuliah -> PLO -> kategori (lihat AttainmentCube)
+        AttainmentCube.create_tables(cursor)
+        
+        # Arsip assessment tahun tertutup dan view agregasi hot + arsip (lihat AssessmentArchive)
+        AssessmentArchive.create_tables(cursor)
+        
+        # Versi data per tabel, dinaikkan oleh trigger pada setiap perubahan
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS data_version (
+                nama_tabel TEXT PRIMARY KEY,
+                versi INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        for table in self.VERSIONED_TABLES:
+            cursor.execute("INSERT OR IGNORE INTO data_version (nama_tabel, versi) VALUES (?, 0)", (table,))
+            for operation in ('INSERT', 'UPDATE', 'DELETE'):
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS trg_{table}_{operation.lower()}_version
+                    AFTER {operation} ON {table}
+                    BEGIN
+                        UPDATE data_version SET versi = versi + 1 WHERE nama_tabel = '{table}';
+                    END
+                ''')
+        
+        # Hasil terstruktur laporan per versi data (dasar laporan perubahan)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS report_result (
+                data_version INTEGER,
+                bagian TEXT,
+                versi_bagian INTEGER,
+                hasil TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (data_version, bagian)
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_report_result_bagian ON report_result (bagian, versi_bagian)")
+        
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_report_run_artifact ON report_run (jenis_laporan, format_laporan, data_version)")
+        
+        # Index full-text PLO, CLO dan mata kuliah (FTS5), disinkronkan oleh trigger
+        self.search_enabled = self._init_search_index(cursor)
+        
+        # Index untuk agregasi assessment per mata kuliah dan per periode
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_assessment_mk_clo ON assessment (kode_mk, kode_clo)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_assessment_periode ON assessment (tahun, semester)")
+        
+        # Index keyset pagination: ORDER BY kolom, id dibaca langsung dari index
+        for table, sort_columns in self.PAGINATION_INDEXES.items():
+            for column in sort_columns:
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column}_id ON {table} ({column}, id)")
+        
+        # Statistik anomali dibangun dari riwayat assessment yang sudah ada
+        cursor.execute("SELECT EXISTS (SELECT 1 FROM assessment_stats), EXISTS (SELECT 1 FROM assessment)")
+        has_stats, has_assessment = cursor.fetchone()
+        if has_assessment and not has_stats:
+            self.anomaly_detector.replay(conn, archive=self.archive)
+        
         conn.commit()
         conn.close()
         
         # Insert sample data jika tabel kosong
         self.insert_sample_data()
     
+    # rowid index pencarian = id sumber * 4 + kode jenis, agar update/hapus memakai rowid
+    SEARCH_SOURCES = {
+        'PLO': (1, 'plo', "NEW.kode_plo", "NULL", "NEW.kode_plo || ' ' || COALESCE(NEW.kategori, '')", "NEW.deskripsi"),
+        'CLO': (2, 'clo', "NEW.kode_clo", "NEW.kode_mk", "NEW.kode_mk || ' ' || NEW.kode_clo", "NEW.deskripsi_clo"),
+        'MK': (3, 'mata_kuliah', "NEW.kode_mk", "NEW.kode_mk", "NEW.kode_mk || ' ' || COALESCE(NEW.nama_mk, '')", "NEW.deskripsi")
+    }
+    
+    def _init_search_index(self, cursor):
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'curriculum_search'")
+        is_new = cursor.fetchone() is None
+        try:
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS curriculum_search USING fts5(
+                    jenis UNINDEXED,
+                    kode UNINDEXED,
+                    kode_mk UNINDEXED,
+                    judul,
+                    deskripsi,
+                    tokenize = 'unicode61 remove_diacritics 2',
+                    prefix = '2 3'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            print(f"Error: FTS5 tidak tersedia ({e})")
+            return False
+        
+        for jenis, (code, table, kode, kode_mk, judul, deskripsi) in self.SEARCH_SOURCES.items():
+            insert = f'''
+                INSERT INTO curriculum_search (rowid, jenis, kode, kode_mk, judul, deskripsi)
+                VALUES (NEW.id * 4 + {code}, '{jenis}', {kode}, {kode_mk}, {judul}, {deskripsi});
+            '''
+            delete = f"DELETE FROM curriculum_search WHERE rowid = OLD.id * 4 + {code};"
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_search_insert AFTER INSERT ON {table} BEGIN {insert} END")
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_search_update AFTER UPDATE ON {table} BEGIN {delete} {insert} END")
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_search_delete AFTER DELETE ON {table} BEGIN {delete} END")
+        
+        if is_new:
+            self._populate_search_index(cursor)
+        return True
+    
+    def _populate_search_index(self, cursor):
+        cursor.execute("DELETE FROM curriculum_search")
+        for jenis, (code, table, kode, kode_mk, judul, deskripsi) in self.SEARCH_SOURCES.items():
+            columns = [c.replace("NEW.", "") for c in (kode, kode_mk, judul, deskripsi)]
+            cursor.execute(f'''
+                INSERT INTO curriculum_search (rowid, jenis, kode, kode_mk, judul, deskripsi)
+                SELECT id * 4 + {code}, '{jenis}', {", ".join(columns)} FROM {table}
+            ''')
+    
+    def rebuild_search_index(self):
+        """Membangun ulang index pencarian dari tabel sumber"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        self._populate_search_index(cursor)
+        cursor.execute("INSERT INTO curriculum_search (curriculum_search) VALUES ('optimize')")
+        conn.commit()
+        conn.close()
+    
+    def search_curriculum(self, query, jenis=None, limit=20):
+        """Pencarian full-text berperingkat (bm25) dengan prefix matching dan cuplikan.
+        
+        Setiap kata pada ``query`` dicocokkan sebagai prefix dan semua kata harus
+        muncul. Cuplikan deskripsi menandai kata yang cocok dengan <mark>.
+        """
+        columns = ['jenis', 'kode', 'kode_mk', 'judul', 'cuplikan', 'skor']
+        terms = re.findall(r"\w+", query or "")
+        if not self.search_enabled or not terms:
+            return pd.DataFrame(columns=columns)
+        
+        match = " ".join(f'"{term}"*' for term in terms)
+        sql = """
+        SELECT jenis, kode, kode_mk, judul,
+               snippet(curriculum_search, 4, char(2), char(3), '…', 12) AS cuplikan,
+               bm25(curriculum_search, 0, 0, 0, 2.0, 1.0) AS skor
+        FROM curriculum_search
+        WHERE curriculum_search MATCH ?
+        """
+        params = [match]
+        if jenis:
+            sql += " AND jenis = ?"
+            params.append(jenis)
+        sql += " ORDER BY skor LIMIT ?"
+        params.append(limit)
+        
+        conn = self.get_connection()
+        df = pd.read_sql(sql, conn, params=params)
+        conn.close()
+        
+        # Teks sumber di-escape; hanya penanda kecocokan yang menjadi HTML
+        df['cuplikan'] = [
+            html.escape(text or "").replace("\x02", "<mark>").replace("\x03", "</mark>")
+            for text in df['cuplikan']
+        ]
+        df['judul'] = df['judul'].map(lambda text: html.escape(text or ""))
+        return df
+    
     def insert_sample_data(self):
         """Insert sample data untuk testing"""
         conn = self.get_connection()
@@ -157,6 +438,116 @@ class OBEDatabase:
         conn.commit()
         conn.close()
     
+    def get_data_version(self, tables=None):
+        """Versi data gabungan; berubah setiap kali salah satu tabel berubah"""
+        tables = tuple(tables or self.VERSIONED_TABLES)
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT COALESCE(SUM(versi), 0) FROM data_version WHERE nama_tabel IN ({})".format(
+                ", ".join("?" * len(tables))),
+            tables
+        )
+        version = cursor.fetchone()[0]
+        conn.close()
+        return version
+    
+    # Pagination (keyset) untuk tampilan tabel besar
+    FILTER_OPERATORS = ('=', '!=', '<', '<=', '>', '>=', 'LIKE')
+    
+    def get_table_columns(self, table):
+        """Daftar kolom tabel; juga memvalidasi nama tabel"""
+        if table not in self.VERSIONED_TABLES:
+            raise ValueError(f"Tabel tidak didukung: {table}")
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"PRAGMA table_info({table})")
+        columns = [row[1] for row in cursor.fetchall()]
+        conn.close()
+        return columns
+    
+    def _build_filter_clause(self, columns, filters):
+        clauses, params = [], []
+        for column, operator, value in filters or []:
+            if column not in columns or operator not in self.FILTER_OPERATORS:
+                raise ValueError(f"Filter tidak valid: {column} {operator}")
+            clauses.append(f"{column} {operator} ?")
+            params.append(value)
+        return clauses, params
+    
+    def get_page(self, table, columns=None, sort_by='id', descending=False, filters=None,
+                 after=None, page_size=50):
+        """Mengambil satu halaman dengan keyset pagination.
+        
+        ``after`` adalah cursor (nilai kolom sort, id) dari baris terakhir halaman
+        sebelumnya. Sort dan filter dijalankan di SQLite; untuk kolom sort yang memiliki
+        index (kolom, id) di PAGINATION_INDEXES halaman dibaca langsung dari index
+        tanpa mengurutkan seluruh tabel. Baris dengan nilai sort NULL selalu di akhir.
+        Mengembalikan (DataFrame, cursor berikutnya atau None).
+        """
+        table_columns = self.get_table_columns(table)
+        columns = list(columns or table_columns)
+        if sort_by not in table_columns or any(c not in table_columns for c in columns):
+            raise ValueError("Kolom tidak valid")
+        
+        clauses, params = self._build_filter_clause(table_columns, filters)
+        comparison = '<' if descending else '>'
+        direction = 'DESC' if descending else 'ASC'
+        select_columns = list(dict.fromkeys(columns + [sort_by, 'id']))
+        
+        def fetch(extra_clauses, extra_params, order_by, limit):
+            where = clauses + extra_clauses
+            query = f"SELECT {', '.join(select_columns)} FROM {table}"
+            if where:
+                query += " WHERE " + " AND ".join(where)
+            query += f" ORDER BY {order_by} LIMIT ?"
+            return pd.read_sql(query, conn, params=params + extra_params + [limit])
+        
+        conn = self.get_connection()
+        if sort_by == 'id':
+            df = fetch([f"id {comparison} ?"] if after is not None else [],
+                       [after[1]] if after is not None else [], f"id {direction}", page_size + 1)
+        else:
+            # Urutan mengikuti index (kolom sort, id): baris bernilai dulu, lalu blok NULL di akhir
+            frames = []
+            if after is None or after[0] is not None:
+                keyset = [f"({sort_by}, id) {comparison} (?, ?)"] if after is not None else []
+                frames.append(fetch([f"{sort_by} IS NOT NULL"] + keyset, list(after) if after is not None else [],
+                                    f"{sort_by} {direction}, id {direction}", page_size + 1))
+            remaining = page_size + 1 - sum(len(frame) for frame in frames)
+            if remaining > 0:
+                in_nulls = after is not None and after[0] is None
+                frames.append(fetch([f"{sort_by} IS NULL"] + ([f"id {comparison} ?"] if in_nulls else []),
+                                    [after[1]] if in_nulls else [], f"id {direction}", remaining))
+            frames = [frame for frame in frames if not frame.empty]
+            df = pd.concat(frames, ignore_index=True) if frames else fetch(["0"], [], "id", 0)
+        conn.close()
+        
+        next_cursor = None
+        if len(df) > page_size:
+            df = df.iloc[:page_size]
+            last = df.iloc[-1]
+            value = last[sort_by]
+            if pd.isna(value):
+                value = None
+            elif hasattr(value, 'item'):
+                value = value.item()
+            next_cursor = (value, int(last['id']))
+        return df[columns].reset_index(drop=True), next_cursor
+    
+    def count_rows(self, table, filters=None):
+        table_columns = self.get_table_columns(table)
+        clauses, params = self._build_filter_clause(table_columns, filters)
+        query = f"SELECT COUNT(*) FROM {table}"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        count = cursor.fetchone()[0]
+        conn.close()
+        return count
+    
     # CRUD Operations untuk PLO
     def get_all_plo(self):
         conn = self.get_connection()
@@ -201,6 +592,42 @@ class OBEDatabase:
         finally:
             conn.close()
     
+    # Operations untuk Prasyarat Mata Kuliah
+    def get_prerequisites(self):
+        conn = self.get_connection()
+        df = pd.read_sql("SELECT kode_mk, kode_mk_prasyarat FROM course_prerequisites ORDER BY kode_mk", conn)
+        conn.close()
+        return df
+    
+    def add_prerequisite(self, kode_mk, kode_mk_prasyarat):
+        if kode_mk == kode_mk_prasyarat:
+            return False
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "INSERT INTO course_prerequisites (kode_mk, kode_mk_prasyarat) VALUES (?, ?)",
+                (kode_mk, kode_mk_prasyarat)
+            )
+            conn.commit()
+            return True
+        except sqlite3.IntegrityError:
+            return False
+        finally:
+            conn.close()
+    
+    def remove_prerequisite(self, kode_mk, kode_mk_prasyarat):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "DELETE FROM course_prerequisites WHERE kode_mk = ? AND kode_mk_prasyarat = ?",
+            (kode_mk, kode_mk_prasyarat)
+        )
+        conn.commit()
+        deleted = cursor.rowcount > 0
+        conn.close()
+        return deleted
+    
     # Operations untuk PLO-CLO Mapping
     def get_plo_clo_matrix(self):
         conn = self.get_connection()
@@ -220,7 +647,18 @@ class OBEDatabase:
         conn.close()
         return df
     
-    def add_plo_clo_mapping(self, kode_mk, kode_clo, kode_plo, tingkat_penguasaan, bobot=1.0):
+    def add_plo_clo_mapping(self, kode_mk, kode_clo, kode_plo, tingkat_penguasaan, bobot=1.0, wait=True):
+        """Jika antrean tulis aktif dan wait=False, mengembalikan Future hasil commit"""
+        row = {
+            'kode_mk': kode_mk, 'kode_clo': kode_clo, 'kode_plo': kode_plo,
+            'tingkat_penguasaan': tingkat_penguasaan, 'bobot': bobot
+        }
+        if self.write_queue is not None:
+            return self._submit_write('plo_clo_mapping', row, wait)
+        report = self.validator.validate_mappings([row])
+        if not report.is_valid:
+            print(f"Error: {report.message()}")
+            return False
         conn = self.get_connection()
         cursor = conn.cursor()
         try:
@@ -237,8 +675,54 @@ class OBEDatabase:
         finally:
             conn.close()
     
+    def add_plo_clo_mappings(self, mappings, partial=False):
+        """Insert banyak pemetaan PLO-CLO setelah divalidasi sebagai satu batch.
+        
+        Mengembalikan (jumlah baris tersimpan, ValidationReport). Jika partial=False
+        batch ditolak seluruhnya bila ada satu baris tidak valid.
+        """
+        report = self.validator.validate_mappings(mappings)
+        rows = report.valid_rows if partial else (report.data if report.is_valid else report.data.iloc[0:0])
+        if rows.empty:
+            return 0, report
+        rows = rows.assign(bobot=rows['bobot'].fillna(1.0))
+        conn = self.get_connection()
+        try:
+            with conn:
+                cursor = conn.executemany(
+                    """INSERT INTO plo_clo_mapping 
+                    (kode_mk, kode_clo, kode_plo, tingkat_penguasaan, bobot) 
+                    VALUES (?, ?, ?, ?, ?)""",
+                    rows[['kode_mk', 'kode_clo', 'kode_plo', 'tingkat_penguasaan', 'bobot']]
+                    .astype(object).itertuples(index=False, name=None)
+                )
+            return cursor.rowcount, report
+        except Exception as e:
+            print(f"Error: {e}")
+            return 0, report
+        finally:
+            conn.close()
+    
+    # Antrean tulis (group commit)
+    def enable_write_queue(self, **options):
+        """Aktifkan antrean tulis; add_assessment/add_plo_clo_mapping lalu di-commit per batch"""
+        if self.write_queue is None:
+            self.write_queue = WriteBehindQueue(self, **options)
+        return self.write_queue
+    
+    def flush_writes(self, timeout=None):
+        """Tunggu sampai semua tulisan di antrean tersimpan permanen"""
+        if self.write_queue is None:
+            return True
+        return self.write_queue.flush(timeout)
+    
+    def _submit_write(self, kind, row, wait):
+        ticket = self.write_queue.submit(kind, row)
+        return ticket.result() if wait else ticket
+    
     # Operations untuk Assessment
     def get_assessment_data(self, tahun=None, semester=None):
+        """Assessment dari tabel hot digabung dengan partisi arsip yang cocok dengan filter"""
         conn = self.get_connection()
         query = "SELECT * FROM assessment"
         params = []
@@ -252,9 +736,123 @@ class OBEDatabase:
         query += " ORDER BY tahun DESC, semester DESC"
         df = pd.read_sql(query, conn, params=params)
         conn.close()
+        
+        archived = self.archive.read(tahun, semester)
+        if not archived.empty:
+            df = pd.concat([df, archived[df.columns]], ignore_index=True)
+            df = df.sort_values(['tahun', 'semester'], ascending=False, kind='stable').reset_index(drop=True)
         return df
     
-    def add_assessment(self, kode_mk, kode_clo, tahun, semester, jenis_assessment, nilai_rata_rata, jumlah_mahasiswa):
+    def get_assessment_periods(self):
+        """Daftar (tahun, semester) yang memiliki data assessment (hot dan arsip), terbaru dulu"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""SELECT DISTINCT tahun, semester FROM assessment_agregat
+                          WHERE tahun IS NOT NULL AND semester IS NOT NULL
+                          ORDER BY tahun DESC, semester DESC""")
+        periods = cursor.fetchall()
+        conn.close()
+        return periods
+    
+    def iter_course_assessment_aggregates(self, kode_mk_list=None, chunksize=2048):
+        """Agregat assessment per mata kuliah (hot dan arsip) dihitung di SQLite, dibaca per chunk"""
+        query = """
+        SELECT 
+            kode_mk,
+            SUM(total_nilai) / SUM(jumlah_nilai) AS avg_score,
+            CASE WHEN SUM(jumlah_nilai) > 1 THEN
+                (SUM(total_nilai_kuadrat) - SUM(total_nilai) * SUM(total_nilai) / SUM(jumlah_nilai))
+                / (SUM(jumlah_nilai) - 1)
+            END AS score_var,
+            SUM(jumlah_baris) AS assessment_count,
+            SUM(total_mahasiswa) * 1.0 / SUM(jumlah_mahasiswa_terisi) AS avg_students
+        FROM assessment_agregat
+        """
+        params = []
+        if kode_mk_list is not None:
+            query += " WHERE kode_mk IN ({})".format(", ".join("?" * len(kode_mk_list)))
+            params.extend(kode_mk_list)
+        query += " GROUP BY kode_mk ORDER BY kode_mk"
+        
+        conn = self.get_connection()
+        try:
+            for chunk in pd.read_sql(query, conn, params=params, chunksize=chunksize):
+                chunk['score_std'] = np.sqrt(pd.to_numeric(chunk.pop('score_var')).clip(lower=0))
+                yield chunk[['kode_mk', 'avg_score', 'score_std', 'assessment_count', 'avg_students']]
+        finally:
+            conn.close()
+    
+    def get_assessment_summary(self):
+        """Jumlah baris dan rata-rata nilai seluruh assessment (hot dan arsip)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT SUM(jumlah_baris), SUM(total_nilai) / SUM(jumlah_nilai) FROM assessment_agregat")
+        count, average = cursor.fetchone()
+        conn.close()
+        return {'jumlah': count or 0, 'rata_rata': average}
+    
+    def get_recent_assessments(self, limit=10):
+        conn = self.get_connection()
+        df = pd.read_sql(
+            """SELECT kode_mk, kode_clo, tahun, semester, nilai_rata_rata FROM assessment 
+            ORDER BY tahun DESC, semester DESC, id DESC LIMIT ?""",
+            conn, params=[limit]
+        )
+        conn.close()
+        return df
+    
+    def get_plo_achievement(self):
+        """Rata-rata nilai assessment per PLO melalui pemetaan PLO-CLO (dari kubus pencapaian)"""
+        achievement = self.attainment.rollup(['kode_plo'])
+        achievement['pencapaian'] = achievement['pencapaian'].round(2)
+        plo = self.get_all_plo()[['kode_plo', 'deskripsi', 'kategori']]
+        return plo.merge(achievement[['kode_plo', 'pencapaian', 'jumlah_assessment']], on='kode_plo')
+    
+    def get_plo_achievement_by_category(self):
+        """Rata-rata nilai assessment per kategori PLO melalui pemetaan PLO-CLO (dari kubus pencapaian)"""
+        achievement = self.attainment.rollup(['kategori'])
+        return pd.DataFrame({
+            'kategori': achievement['kategori'],
+            'pencapaian_rata_rata': achievement['pencapaian'].round(2)
+        })
+    
+    def get_clo_period_aggregates(self):
+        """Jumlah nilai, jumlah baris dan jumlah mahasiswa per CLO per periode"""
+        conn = self.get_connection()
+        query = """
+        SELECT kode_mk, kode_clo, tahun, semester,
+               SUM(total_nilai) AS total_nilai,
+               SUM(jumlah_nilai) AS jumlah_nilai,
+               SUM(total_mahasiswa) AS total_mahasiswa
+        FROM assessment_agregat
+        GROUP BY kode_mk, kode_clo, tahun, semester
+        """
+        df = pd.read_sql(query, conn)
+        conn.close()
+        return df
+    
+    def count_assessed_courses(self):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(DISTINCT kode_mk) FROM assessment_agregat")
+        count = cursor.fetchone()[0]
+        conn.close()
+        return count
+    
+    def add_assessment(self, kode_mk, kode_clo, tahun, semester, jenis_assessment, nilai_rata_rata, jumlah_mahasiswa,
+                       wait=True):
+        """Jika antrean tulis aktif dan wait=False, mengembalikan Future hasil commit"""
+        row = {
+            'kode_mk': kode_mk, 'kode_clo': kode_clo, 'tahun': tahun, 'semester': semester,
+            'jenis_assessment': jenis_assessment, 'nilai_rata_rata': nilai_rata_rata,
+            'jumlah_mahasiswa': jumlah_mahasiswa
+        }
+        if self.write_queue is not None:
+            return self._submit_write('assessment', row, wait)
+        report = self.validator.validate_assessments([row])
+        if not report.is_valid:
+            print(f"Error: {report.message()}")
+            return False
         conn = self.get_connection()
         cursor = conn.cursor()
         try:
@@ -264,6 +862,8 @@ class OBEDatabase:
                 VALUES (?, ?, ?, ?, ?, ?, ?)""",
                 (kode_mk, kode_clo, tahun, semester, jenis_assessment, nilai_rata_rata, jumlah_mahasiswa)
             )
+            row = report.data.assign(id=cursor.lastrowid)
+            self.anomaly_detector.observe(conn, row)
             conn.commit()
             return True
         except Exception as e:
@@ -272,6 +872,90 @@ class OBEDatabase:
         finally:
             conn.close()
     
+    def add_assessments(self, assessments, partial=False):
+        """Insert banyak assessment setelah divalidasi sebagai satu batch.
+        
+        Mengembalikan (jumlah baris tersimpan, ValidationReport). Jika partial=False
+        batch ditolak seluruhnya bila ada satu baris tidak valid.
+        """
+        report = self.validator.validate_assessments(assessments)
+        rows = report.valid_rows if partial else (report.data if report.is_valid else report.data.iloc[0:0])
+        if rows.empty:
+            return 0, report
+        rows = rows.assign(
+            tahun=rows['tahun'].astype(int),
+            semester=rows['semester'].astype(int),
+            nilai_rata_rata=rows['nilai_rata_rata'].astype(float),
+            jumlah_mahasiswa=pd.to_numeric(rows['jumlah_mahasiswa']).astype('Int64')
+        )
+        conn = self.get_connection()
+        try:
+            with conn:
+                cursor = conn.executemany(
+                    """INSERT INTO assessment 
+                    (kode_mk, kode_clo, tahun, semester, jenis_assessment, nilai_rata_rata, jumlah_mahasiswa) 
+                    VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                    rows[['kode_mk', 'kode_clo', 'tahun', 'semester', 'jenis_assessment',
+                          'nilai_rata_rata', 'jumlah_mahasiswa']]
+                    .astype(object).where(rows.notna(), None).itertuples(index=False, name=None)
+                )
+                inserted = cursor.rowcount
+                # Transaksi masih memegang write lock, jadi id terakhir adalah milik batch ini
+                ids = conn.execute("SELECT id FROM assessment ORDER BY id DESC LIMIT ?", (inserted,)).fetchall()
+                self.anomaly_detector.observe(conn, rows.assign(id=[i for (i,) in reversed(ids)]))
+            return inserted, report
+        except Exception as e:
+            print(f"Error: {e}")
+            return 0, report
+        finally:
+            conn.close()
+    
+    # Operations untuk Anomali Assessment
+    def get_recent_anomalies(self, limit=10, status='baru'):
+        """Anomali terbaru dengan status tertentu (memakai index status, id)"""
+        conn = self.get_connection()
+        df = pd.read_sql(
+            """SELECT id, kode_mk, kode_clo, tahun, semester, tingkat, metrik, nilai, ekspektasi, 
+                   z_score, arah, status, created_at 
+            FROM assessment_anomaly WHERE status = ? ORDER BY id DESC LIMIT ?""",
+            conn, params=[status, limit]
+        )
+        conn.close()
+        return df
+    
+    def count_anomalies(self, status='baru'):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM assessment_anomaly WHERE status = ?", (status,))
+        count = cursor.fetchone()[0]
+        conn.close()
+        return count
+    
+    def set_anomaly_status(self, anomaly_id, status):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("UPDATE assessment_anomaly SET status = ? WHERE id = ?", (status, anomaly_id))
+            conn.commit()
+            return cursor.rowcount > 0
+        except Exception as e:
+            print(f"Error: {e}")
+            return False
+        finally:
+            conn.close()
+    
+    def rebuild_anomaly_statistics(self):
+        """Bangun ulang statistik EWMA dan daftar anomali dari seluruh riwayat assessment"""
+        conn = self.get_connection()
+        try:
+            with conn:
+                return self.anomaly_detector.replay(conn, archive=self.archive)
+        except Exception as e:
+            print(f"Error: {e}")
+            return False
+        finally:
+            conn.close()
+    
     # Operations untuk IPO
     def get_ipo_data(self):
         conn = self.get_connection()
@@ -294,6 +978,230 @@ class OBEDatabase:
             return False
         finally:
             conn.close()
+    
+    def add_ipo_components(self, components):
+        """Insert banyak komponen IPO dalam satu transaksi"""
+        conn = self.get_connection()
+        try:
+            with conn:
+                conn.executemany(
+                    """INSERT INTO ipo 
+                    (komponen, kategori, bobot_lam, target_pencapaian, pencapaian_aktual, status, catatan, tahun, semester) 
+                    VALUES (:komponen, :kategori, :bobot_lam, :target_pencapaian, :pencapaian_aktual, 
+                            :status, :catatan, :tahun, :semester)""",
+                    [dict({'pencapaian_aktual': None, 'status': None, 'catatan': None}, **c) for c in components]
+                )
+            return True
+        except Exception as e:
+            print(f"Error: {e}")
+            return False
+        finally:
+            conn.close()
+    
+    def bulk_update_ipo_pencapaian(self, updates, tahun=None, semester=None):
+        """Update pencapaian banyak komponen IPO dalam satu transaksi.
+        
+        ``updates`` berisi dict dengan kunci komponen, pencapaian_aktual, status dan
+        catatan. Jika tahun/semester diberikan, hanya baris periode tersebut yang
+        diubah. Mengembalikan jumlah baris yang diubah, atau False jika gagal
+        (seluruh transaksi dibatalkan).
+        """
+        query = "UPDATE ipo SET pencapaian_aktual = :pencapaian_aktual, status = :status, catatan = :catatan WHERE komponen = :komponen"
+        if tahun is not None:
+            query += " AND tahun = :tahun"
+        if semester is not None:
+            query += " AND semester = :semester"
+        rows = [dict({'status': None, 'catatan': None}, **u, tahun=tahun, semester=semester) for u in updates]
+        
+        conn = self.get_connection()
+        try:
+            with conn:
+                cursor = conn.executemany(query, rows)
+                return cursor.rowcount
+        except Exception as e:
+            print(f"Error: {e}")
+            return False
+        finally:
+            conn.close()
+    
+    # Operations untuk Jadwal Laporan
+    def add_report_schedule(self, nama, jenis_laporan, format_laporan, frekuensi, penerima, jadwal_berikutnya):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """INSERT INTO report_schedule 
+                (nama, jenis_laporan, format_laporan, frekuensi, penerima, jadwal_berikutnya) 
+                VALUES (?, ?, ?, ?, ?, ?)""",
+                (nama, jenis_laporan, format_laporan, frekuensi, penerima, jadwal_berikutnya)
+            )
+            conn.commit()
+            return cursor.lastrowid
+        except Exception as e:
+            print(f"Error: {e}")
+            return None
+        finally:
+            conn.close()
+    
+    def get_report_schedules(self, only_active=False):
+        conn = self.get_connection()
+        query = "SELECT * FROM report_schedule"
+        if only_active:
+            query += " WHERE aktif = 1"
+        df = pd.read_sql(query + " ORDER BY jadwal_berikutnya", conn)
+        conn.close()
+        return df
+    
+    def get_due_report_schedules(self, now):
+        conn = self.get_connection()
+        df = pd.read_sql(
+            "SELECT * FROM report_schedule WHERE aktif = 1 AND jadwal_berikutnya <= ? ORDER BY jadwal_berikutnya",
+            conn, params=[now]
+        )
+        conn.close()
+        return df
+    
+    def claim_report_schedule(self, schedule_id, jadwal_sekarang, jadwal_berikutnya):
+        """Memajukan jadwal secara atomik; False jika sudah diambil worker lain"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE report_schedule SET jadwal_berikutnya = ? WHERE id = ? AND jadwal_berikutnya = ?",
+            (jadwal_berikutnya, schedule_id, jadwal_sekarang)
+        )
+        conn.commit()
+        claimed = cursor.rowcount == 1
+        conn.close()
+        return claimed
+    
+    def set_report_schedule_active(self, schedule_id, aktif):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("UPDATE report_schedule SET aktif = ? WHERE id = ?", (int(aktif), schedule_id))
+        conn.commit()
+        conn.close()
+    
+    def add_report_run(self, schedule_id, jenis_laporan, format_laporan, data_version, status,
+                       artifact_path, pesan, waktu_mulai, waktu_selesai):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            """INSERT INTO report_run 
+            (schedule_id, jenis_laporan, format_laporan, data_version, status, artifact_path, pesan, waktu_mulai, waktu_selesai) 
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (schedule_id, jenis_laporan, format_laporan, data_version, status, artifact_path, pesan,
+             waktu_mulai, waktu_selesai)
+        )
+        conn.commit()
+        run_id = cursor.lastrowid
+        conn.close()
+        return run_id
+    
+    def get_report_runs(self, schedule_id=None, limit=50):
+        conn = self.get_connection()
+        query = "SELECT * FROM report_run"
+        params = []
+        if schedule_id is not None:
+            query += " WHERE schedule_id = ?"
+            params.append(schedule_id)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        df = pd.read_sql(query, conn, params=params)
+        conn.close()
+        return df
+    
+    def add_maintenance_run(self, tugas, status, durasi_detik, ukuran_sebelum, ukuran_sesudah, detail, pesan,
+                            waktu_mulai, waktu_selesai):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            """INSERT INTO maintenance_run 
+            (tugas, status, durasi_detik, ukuran_sebelum, ukuran_sesudah, detail, pesan, waktu_mulai, waktu_selesai) 
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (tugas, status, durasi_detik, ukuran_sebelum, ukuran_sesudah, detail, pesan, waktu_mulai, waktu_selesai)
+        )
+        conn.commit()
+        run_id = cursor.lastrowid
+        conn.close()
+        return run_id
+    
+    def get_maintenance_runs(self, tugas=None, limit=50):
+        conn = self.get_connection()
+        query = "SELECT * FROM maintenance_run"
+        params = []
+        if tugas is not None:
+            query += " WHERE tugas = ?"
+            params.append(tugas)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        df = pd.read_sql(query, conn, params=params)
+        conn.close()
+        return df
+    
+    def get_last_maintenance_runs(self):
+        """Waktu mulai eksekusi terakhir yang selesai (sukses atau peringatan) per tugas maintenance"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT tugas, MAX(waktu_mulai) FROM maintenance_run WHERE status IN ('sukses', 'peringatan') GROUP BY tugas")
+        last = dict(cursor.fetchall())
+        conn.close()
+        return last
+    
+    def save_report_result(self, data_version, bagian, versi_bagian, hasil):
+        """Simpan hasil satu bagian laporan (DataFrame) untuk versi data tertentu"""
+        conn = self.get_connection()
+        try:
+            conn.execute(
+                """INSERT OR REPLACE INTO report_result (data_version, bagian, versi_bagian, hasil) 
+                VALUES (?, ?, ?, ?)""",
+                (data_version, bagian, versi_bagian, hasil.to_json(orient='split', index=False))
+            )
+            conn.commit()
+            return True
+        except Exception as e:
+            print(f"Error: {e}")
+            return False
+        finally:
+            conn.close()
+    
+    def get_report_result(self, bagian, data_version=None, versi_bagian=None):
+        """Hasil bagian laporan untuk versi data, atau hasil terbaru dengan versi bagian yang sama"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        if data_version is not None:
+            cursor.execute("SELECT hasil FROM report_result WHERE bagian = ? AND data_version = ?",
+                           (bagian, data_version))
+        else:
+            cursor.execute("""SELECT hasil FROM report_result WHERE bagian = ? AND versi_bagian = ?
+                              ORDER BY data_version DESC LIMIT 1""", (bagian, versi_bagian))
+        row = cursor.fetchone()
+        conn.close()
+        if row is None:
+            return None
+        hasil = json.loads(row[0])
+        return pd.DataFrame(hasil['data'], columns=hasil['columns'])
+    
+    def get_report_result_versions(self):
+        """Versi data yang memiliki hasil laporan tersimpan, terbaru dulu"""
+        conn = self.get_connection()
+        df = pd.read_sql("""SELECT data_version, MIN(created_at) AS created_at FROM report_result 
+                            GROUP BY data_version ORDER BY data_version DESC""", conn)
+        conn.close()
+        return df
+    
+    def find_report_artifact(self, jenis_laporan, format_laporan, data_version):
+        """Artifact terakhir untuk laporan identik pada versi data yang sama"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            """SELECT artifact_path FROM report_run 
+            WHERE jenis_laporan = ? AND format_laporan = ? AND data_version = ? AND status = 'sukses'
+            ORDER BY id DESC LIMIT 1""",
+            (jenis_laporan, format_laporan, data_version)
+        )
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else None
 
 # Global database instance
 db = OBEDatabase()
\ No newline at end of file
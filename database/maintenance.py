@@ -0,0 +1,340 @@
+import os
+import json
+import time
+import shutil
+import sqlite3
+import argparse
+import pyarrow.parquet as pq
+from datetime import datetime, timedelta
+from utils.config import (MAINTENANCE_BACKUP_DIR, MAINTENANCE_BACKUP_KEEP, MAINTENANCE_BACKUP_PAGES,
+                          MAINTENANCE_BACKUP_RESTARTS, MAINTENANCE_STEP_PAUSE, MAINTENANCE_VACUUM_PAGES,
+                          MAINTENANCE_ANALYSIS_LIMIT, MAINTENANCE_INTERVALS)
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+TASKS = ('backup', 'integrity', 'optimize', 'vacuum')
+
+class _BackupRestarted(Exception):
+    pass
+
+class DatabaseMaintenance:
+    """Backup online, pemeriksaan integritas, ANALYZE/optimize dan incremental vacuum.
+
+    Semua tugas berjalan bertahap dengan jeda antar langkah sehingga
+    koneksi lain tetap bisa membaca dan menulis: backup memakai API backup
+    sqlite3 per sejumlah halaman, vacuum memakai PRAGMA incremental_vacuum
+    dalam transaksi kecil, dan integrity_check penuh dijalankan pada file
+    backup terbaru, bukan database produksi. Partisi Parquet arsip
+    assessment ikut disimpan di folder ``<backup>.archive``. Setiap
+    eksekusi dicatat di tabel maintenance_run beserta durasi dan dampaknya.
+    """
+
+    def __init__(self, database, backup_dir=MAINTENANCE_BACKUP_DIR):
+        self.db = database
+        prefix = os.path.splitext(os.path.basename(database.db_path))[0]
+        self.prefix = prefix
+        self.backup_dir = backup_dir or os.path.join(os.path.dirname(database.db_path) or '.', 'backups')
+
+    def _file_state(self, conn):
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return {
+            'ukuran_byte': os.path.getsize(self.db.db_path),
+            'halaman': conn.execute("PRAGMA page_count").fetchone()[0],
+            'halaman_bebas': conn.execute("PRAGMA freelist_count").fetchone()[0],
+            'ukuran_halaman': page_size
+        }
+
+    def backups(self):
+        """File backup yang sudah selesai, terbaru dulu"""
+        if not os.path.isdir(self.backup_dir):
+            return []
+        names = sorted((name for name in os.listdir(self.backup_dir)
+                        if name.startswith(f"{self.prefix}-") and name.endswith('.db')), reverse=True)
+        return [os.path.join(self.backup_dir, name) for name in names]
+
+    def backup(self, pages=MAINTENANCE_BACKUP_PAGES, pause=MAINTENANCE_STEP_PAUSE, keep=MAINTENANCE_BACKUP_KEEP,
+               max_restarts=MAINTENANCE_BACKUP_RESTARTS):
+        """Snapshot konsisten lewat API backup sqlite3, disalin per ``pages`` halaman.
+
+        Kunci baca dilepas di antara langkah (jeda ``pause`` detik) sehingga penulis
+        tidak tertahan sepanjang backup. Jika database ditulis koneksi lain, SQLite
+        mengulang penyalinan dari awal; setelah ``max_restarts`` kali sisa halaman
+        disalin dalam satu langkah (kunci baca singkat) agar backup tetap selesai
+        saat penulisan ramai. File baru diverifikasi dengan quick_check sebelum
+        dipakai dan hanya ``keep`` backup terbaru yang disimpan.
+
+        Partisi arsip yang terdaftar di snapshot disalin ke ``<backup>.archive``;
+        partisi yang hilang atau tidak cocok dilaporkan sebagai peringatan.
+        """
+        os.makedirs(self.backup_dir, exist_ok=True)
+        path = os.path.join(self.backup_dir, f"{self.prefix}-{datetime.now().strftime('%Y%m%d%H%M%S%f')}.db")
+        steps = []
+        restarts = 0
+
+        def progress(status, remaining, total):
+            nonlocal restarts
+            if steps and remaining > steps[-1]:
+                restarts += 1
+                if restarts > max_restarts:
+                    raise _BackupRestarted()
+            steps.append(remaining)
+            if pause and remaining:
+                time.sleep(pause)
+
+        source = self.db.get_connection()
+        try:
+            mode = 'bertahap'
+            try:
+                check = self._copy(source, f"{path}.tmp", pages, progress)
+            except _BackupRestarted:
+                mode = 'satu_langkah'
+                check = self._copy(source, f"{path}.tmp", -1, None)
+        finally:
+            source.close()
+        if check != 'ok':
+            os.remove(f"{path}.tmp")
+            raise sqlite3.DatabaseError(f"Backup gagal diverifikasi: {check}")
+        archive_dir = self.archive_dir(path)
+        try:
+            archive = self._copy_archive(f"{path}.tmp", archive_dir)
+        except Exception:
+            os.remove(f"{path}.tmp")
+            shutil.rmtree(f"{archive_dir}.tmp", ignore_errors=True)
+            raise
+        # Folder arsip lebih dulu: file .db yang terlihat di backups() sudah punya folder arsipnya
+        if os.path.isdir(f"{archive_dir}.tmp"):
+            os.replace(f"{archive_dir}.tmp", archive_dir)
+        os.replace(f"{path}.tmp", path)
+
+        removed = []
+        for old in self.backups()[keep:]:
+            os.remove(old)
+            shutil.rmtree(self.archive_dir(old), ignore_errors=True)
+            removed.append(os.path.basename(old))
+        result = {'path': path, 'ukuran_byte': os.path.getsize(path), 'mode': mode, 'langkah': len(steps),
+                  'diulang': restarts, 'backup_dihapus': removed, 'arsip': archive}
+        if archive['hilang'] or archive['tidak_cocok']:
+            result['peringatan'] = "Partisi arsip tidak ikut dibackup: " + ", ".join(
+                archive['hilang'] + archive['tidak_cocok'])
+        return result
+
+    @staticmethod
+    def archive_dir(backup_path):
+        """Folder partisi arsip milik satu file backup"""
+        return f"{os.path.splitext(backup_path)[0]}.archive"
+
+    def _copy_archive(self, snapshot, archive_dir):
+        """Salin partisi arsip yang terdaftar di snapshot backup ke ``<archive_dir>.tmp``, lalu cocokkan
+        ukuran dan jumlah barisnya.
+
+        File partisi tidak pernah diubah setelah ditulis (ditulis ulang lewat os.replace),
+        sehingga hard link cukup; salinan biasa dipakai bila beda sistem file.
+        """
+        conn = sqlite3.connect(f"file:{snapshot}?mode=ro", uri=True)
+        try:
+            partitions = conn.execute("SELECT path, jumlah_baris FROM assessment_archive_partition").fetchall()
+        finally:
+            conn.close()
+        result = {'path': None, 'partisi': 0, 'ukuran_byte': 0,
+                  'hilang': [], 'tidak_cocok': []}
+        for relative, rows in partitions:
+            source = os.path.join(self.db.archive.directory, relative)
+            if not os.path.exists(source):
+                result['hilang'].append(relative)
+                continue
+            target = os.path.join(f"{archive_dir}.tmp", relative)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copy2(source, target)
+            size = os.path.getsize(target)
+            if size != os.path.getsize(source) or pq.read_metadata(target).num_rows != rows:
+                result['tidak_cocok'].append(relative)
+                continue
+            result['partisi'] += 1
+            result['ukuran_byte'] += size
+        if os.path.isdir(f"{archive_dir}.tmp"):
+            result['path'] = archive_dir
+        return result
+
+    @staticmethod
+    def _copy(source, path, pages, progress):
+        target = sqlite3.connect(path)
+        try:
+            source.backup(target, pages=pages, progress=progress)
+            return target.execute("PRAGMA quick_check").fetchone()[0]
+        finally:
+            target.close()
+
+    def integrity(self, full=True):
+        """quick_check pada database produksi; integrity_check penuh pada backup terbaru"""
+        conn = self.db.get_connection()
+        violations, mismatched = {}, {}
+        try:
+            quick = [row[0] for row in conn.execute("PRAGMA quick_check")]
+            tables = [row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+            for table in tables:
+                try:
+                    count = len(conn.execute(f"PRAGMA foreign_key_check({table})").fetchall())
+                except sqlite3.OperationalError as e:
+                    # Foreign key yang induknya tidak UNIQUE tidak bisa dicek
+                    mismatched[table] = str(e)
+                    continue
+                if count:
+                    violations[table] = count
+        finally:
+            conn.close()
+        result = {'quick_check': quick, 'foreign_key_check': violations, 'foreign_key_tidak_dicek': mismatched}
+
+        backups = self.backups()
+        if full and backups:
+            # integrity_check membaca seluruh isi file; dijalankan pada salinan agar pembaca tidak tertahan
+            backup = sqlite3.connect(f"file:{backups[0]}?mode=ro", uri=True)
+            try:
+                result['integrity_check'] = [row[0] for row in backup.execute("PRAGMA integrity_check")]
+            finally:
+                backup.close()
+            result['backup_diperiksa'] = os.path.basename(backups[0])
+        if quick != ['ok'] or result.get('integrity_check', ['ok']) != ['ok']:
+            raise sqlite3.DatabaseError(json.dumps(result))
+        # Foreign key tidak ditegakkan SQLite (PRAGMA foreign_keys mati): baris yatim hanya peringatan
+        if violations:
+            result['peringatan'] = "Baris yatim foreign key: " + ", ".join(
+                f"{table} ({count})" for table, count in violations.items())
+        return result
+
+    def optimize(self, analysis_limit=MAINTENANCE_ANALYSIS_LIMIT, full=False):
+        """PRAGMA optimize (ANALYZE hanya untuk tabel yang statistiknya usang); full=True menjalankan ANALYZE"""
+        conn = self.db.get_connection()
+        try:
+            conn.execute(f"PRAGMA analysis_limit = {int(analysis_limit)}")
+            has_stats = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone() is not None
+            before = conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0] if has_stats else 0
+            # Database yang belum pernah di-ANALYZE tidak punya statistik untuk dibandingkan optimize
+            if full or not has_stats:
+                conn.execute("ANALYZE")
+            else:
+                conn.execute("PRAGMA optimize")
+            conn.commit()
+            after = conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0]
+        finally:
+            conn.close()
+        return {'mode': 'analyze' if full or not has_stats else 'optimize',
+                'statistik_sebelum': before, 'statistik_sesudah': after}
+
+    def vacuum(self, pages=MAINTENANCE_VACUUM_PAGES, pause=MAINTENANCE_STEP_PAUSE):
+        """Kembalikan halaman bebas ke sistem file ``pages`` halaman per transaksi"""
+        conn = self.db.get_connection()
+        try:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                return {'dilewati': "auto_vacuum bukan INCREMENTAL; jalankan enable_incremental_vacuum() sekali",
+                        'halaman_bebas': conn.execute("PRAGMA freelist_count").fetchone()[0]}
+            steps = 0
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            while free > 0:
+                # sqlite3 Python hanya menjalankan satu langkah PRAGMA tanpa kolom hasil: satu halaman per execute
+                conn.execute("BEGIN IMMEDIATE")
+                for _ in range(min(int(pages), free)):
+                    conn.execute("PRAGMA incremental_vacuum(1)")
+                conn.commit()
+                steps += 1
+                free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if pause and free:
+                    time.sleep(pause)
+        finally:
+            conn.close()
+        return {'langkah': steps}
+
+    def enable_incremental_vacuum(self):
+        """Ubah auto_vacuum ke INCREMENTAL; memerlukan VACUUM penuh sekali (memblokir database)"""
+        conn = self.db.get_connection()
+        try:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            return conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        finally:
+            conn.close()
+
+    def run(self, tasks=TASKS, **options):
+        """Jalankan tugas berurutan; setiap tugas dicatat di maintenance_run. Mengembalikan ringkasannya."""
+        results = []
+        for task in tasks:
+            if task not in TASKS:
+                raise ValueError(f"Tugas maintenance tidak dikenal: {task}")
+            conn = self.db.get_connection()
+            before = self._file_state(conn)
+            conn.close()
+            started = datetime.now()
+            clock = time.perf_counter()
+            status, detail, pesan = 'sukses', {}, None
+            try:
+                detail = getattr(self, task)(**options.get(task, {}))
+                if 'dilewati' in detail:
+                    status, pesan = 'dilewati', detail['dilewati']
+                elif 'peringatan' in detail:
+                    status, pesan = 'peringatan', detail['peringatan']
+            except Exception as e:
+                status, pesan = 'gagal', str(e)
+            duration = time.perf_counter() - clock
+            conn = self.db.get_connection()
+            after = self._file_state(conn)
+            conn.close()
+
+            detail = dict(detail, sebelum=before, sesudah=after)
+            run_id = self.db.add_maintenance_run(task, status, round(duration, 3), before['ukuran_byte'],
+                                                 after['ukuran_byte'], json.dumps(detail, default=str), pesan,
+                                                 started.strftime(TIMESTAMP_FORMAT),
+                                                 datetime.now().strftime(TIMESTAMP_FORMAT))
+            results.append({'id': run_id, 'tugas': task, 'status': status, 'durasi_detik': round(duration, 3),
+                            'ukuran_sebelum': before['ukuran_byte'], 'ukuran_sesudah': after['ukuran_byte'],
+                            'detail': detail, 'pesan': pesan})
+        return results
+
+    def due_tasks(self, now=None, intervals=MAINTENANCE_INTERVALS):
+        """Tugas yang eksekusi sukses terakhirnya lebih lama dari intervalnya (jam)"""
+        now = now or datetime.now()
+        last = self.db.get_last_maintenance_runs()
+        due = []
+        for task in TASKS:
+            previous = last.get(task)
+            if previous is None or datetime.strptime(previous, TIMESTAMP_FORMAT) + \
+                    timedelta(hours=intervals[task]) <= now:
+                due.append(task)
+        return due
+
+    def run_due(self, now=None):
+        tasks = self.due_tasks(now)
+        # Backup lebih dulu agar integrity_check penuh memeriksa salinan terbaru
+        return self.run([task for task in TASKS if task in tasks]) if tasks else []
+
+def main():
+    from database.database import OBEDatabase
+
+    parser = argparse.ArgumentParser(description="Backup dan maintenance database Sistem OBE")
+    parser.add_argument('--db', default="database/obe_database.db")
+    parser.add_argument('--tasks', default=None,
+                        help=f"Tugas dipisah koma: {', '.join(TASKS)} (default: yang jatuh tempo)")
+    parser.add_argument('--interval', type=int, default=None,
+                        help="Jalankan terus; jeda antar pengecekan jadwal (detik)")
+    parser.add_argument('--enable-incremental-vacuum', action='store_true',
+                        help="Aktifkan auto_vacuum INCREMENTAL (VACUUM penuh sekali)")
+    args = parser.parse_args()
+
+    maintenance = DatabaseMaintenance(OBEDatabase(args.db))
+    if args.enable_incremental_vacuum:
+        print("auto_vacuum INCREMENTAL aktif" if maintenance.enable_incremental_vacuum()
+              else "Gagal mengaktifkan auto_vacuum INCREMENTAL")
+    while True:
+        results = maintenance.run(args.tasks.split(',')) if args.tasks else maintenance.run_due()
+        for result in results:
+            print(f"[{datetime.now().strftime(TIMESTAMP_FORMAT)}] {result['tugas']}: {result['status']} "
+                  f"{result['durasi_detik']} detik, {result['ukuran_sebelum']} -> {result['ukuran_sesudah']} byte"
+                  f"{' - ' + result['pesan'] if result['pesan'] else ''}")
+        if args.interval is None:
+            break
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import threading
+import pandas as pd
+import numpy as np
+from utils.config import NILAI_RANGE, TAHUN_RANGE, SEMESTER_VALID, TINGKAT_PENGUASAAN_VALID
+
+ASSESSMENT_COLUMNS = ['kode_mk', 'kode_clo', 'tahun', 'semester', 'jenis_assessment',
+                      'nilai_rata_rata', 'jumlah_mahasiswa']
+MAPPING_COLUMNS = ['kode_mk', 'kode_clo', 'kode_plo', 'tingkat_penguasaan', 'bobot']
+
+class ValidationReport:
+    """Hasil validasi satu batch: baris valid dan daftar error terstruktur"""
+
+    def __init__(self, data, errors):
+        self.data = data
+        self.errors = errors.reset_index(drop=True)
+        invalid_rows = set(self.errors['baris'])
+        self.valid_mask = ~data.index.isin(list(invalid_rows))
+
+    @property
+    def is_valid(self):
+        return self.errors.empty
+
+    @property
+    def valid_rows(self):
+        return self.data[self.valid_mask]
+
+    @property
+    def invalid_rows(self):
+        return self.data[~self.valid_mask]
+
+    def summary(self):
+        """Jumlah error per jenis error"""
+        if self.errors.empty:
+            return pd.DataFrame(columns=['kode_error', 'jumlah'])
+        return self.errors.groupby('kode_error').size().reset_index(name='jumlah')
+
+    def message(self, max_errors=5):
+        lines = [f"baris {e.baris}: {e.pesan}" for e in self.errors.head(max_errors).itertuples()]
+        if len(self.errors) > max_errors:
+            lines.append(f"... {len(self.errors) - max_errors} error lainnya")
+        return "; ".join(lines)
+
+    def to_dict(self):
+        return {
+            'jumlah_baris': len(self.data),
+            'jumlah_valid': int(self.valid_mask.sum()),
+            'jumlah_error': len(self.errors),
+            'errors': self.errors.to_dict('records')
+        }
+
+class DataValidator:
+    """Validasi integritas referensial dan rentang nilai untuk batch data masuk.
+
+    Set kunci (mata kuliah, CLO, PLO, pemetaan) dibaca sekali per versi data kurikulum
+    dan disimpan sebagai pandas Index; setiap batch diperiksa dengan anti-join
+    berbasis ``isin`` sehingga tidak ada query per baris.
+    """
+
+    KEY_TABLES = ('mata_kuliah', 'clo', 'plo', 'plo_clo_mapping')
+
+    def __init__(self, database):
+        self.db = database
+        self._keys = None
+        self._keys_version = None
+        self._lock = threading.Lock()
+
+    def key_sets(self):
+        version = self.db.get_data_version(self.KEY_TABLES)
+        with self._lock:
+            if self._keys is None or self._keys_version != version:
+                conn = self.db.get_connection()
+                try:
+                    mk = pd.read_sql("SELECT kode_mk FROM mata_kuliah", conn)
+                    clo = pd.read_sql("SELECT kode_mk, kode_clo FROM clo", conn)
+                    plo = pd.read_sql("SELECT kode_plo FROM plo", conn)
+                    mapping = pd.read_sql("SELECT DISTINCT kode_mk, kode_clo, kode_plo FROM plo_clo_mapping", conn)
+                finally:
+                    conn.close()
+                self._keys = {
+                    'kode_mk': pd.Index(mk['kode_mk']),
+                    'clo': pd.MultiIndex.from_frame(clo[['kode_mk', 'kode_clo']]),
+                    'kode_plo': pd.Index(plo['kode_plo']),
+                    'mapping': pd.MultiIndex.from_frame(mapping[['kode_mk', 'kode_clo', 'kode_plo']])
+                }
+                self._keys_version = version
+            return self._keys
+
+    @staticmethod
+    def _as_frame(rows, columns):
+        data = rows.copy() if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+        for column in columns:
+            if column not in data.columns:
+                data[column] = np.nan
+        return data.reset_index(drop=True)
+
+    @staticmethod
+    def _collect(data, checks):
+        """Menggabungkan hasil mask boolean tiap aturan menjadi tabel error"""
+        errors = []
+        for kode_error, kolom, mask, pesan in checks:
+            mask = np.asarray(mask, dtype=bool)
+            if mask.any():
+                rows = data.index[mask]
+                errors.append(pd.DataFrame({
+                    'baris': rows,
+                    'kolom': kolom,
+                    'kode_error': kode_error,
+                    'nilai': data.loc[rows, kolom].astype(str).values if kolom in data else None,
+                    'pesan': pesan
+                }))
+        if not errors:
+            return pd.DataFrame(columns=['baris', 'kolom', 'kode_error', 'nilai', 'pesan'])
+        return pd.concat(errors, ignore_index=True).sort_values(['baris', 'kolom'], kind='stable')
+
+    def _clo_exists(self, data, keys):
+        pairs = pd.MultiIndex.from_arrays([data['kode_mk'].astype(str), data['kode_clo'].astype(str)])
+        return pairs.isin(keys['clo'])
+
+    def validate_assessments(self, rows):
+        """Validasi batch assessment terhadap katalog mata kuliah/CLO dan rentang nilai"""
+        data = self._as_frame(rows, ASSESSMENT_COLUMNS)
+        keys = self.key_sets()
+
+        nilai = pd.to_numeric(data['nilai_rata_rata'], errors='coerce')
+        jumlah = pd.to_numeric(data['jumlah_mahasiswa'], errors='coerce')
+        tahun = pd.to_numeric(data['tahun'], errors='coerce')
+        semester = pd.to_numeric(data['semester'], errors='coerce')
+        missing_mk = data['kode_mk'].isna()
+        missing_clo = data['kode_clo'].isna()
+        mk_unknown = ~missing_mk & ~data['kode_mk'].isin(keys['kode_mk'])
+
+        checks = [
+            ('wajib_diisi', 'kode_mk', missing_mk, "kode_mk wajib diisi"),
+            ('wajib_diisi', 'kode_clo', missing_clo, "kode_clo wajib diisi"),
+            ('mk_tidak_ada', 'kode_mk', mk_unknown, "Mata kuliah tidak terdaftar"),
+            ('clo_tidak_ada', 'kode_clo',
+             ~missing_mk & ~missing_clo & ~mk_unknown & ~self._clo_exists(data, keys),
+             "CLO tidak terdaftar pada mata kuliah tersebut"),
+            ('nilai_tidak_valid', 'nilai_rata_rata',
+             nilai.isna() | (nilai < NILAI_RANGE[0]) | (nilai > NILAI_RANGE[1]),
+             f"nilai_rata_rata harus angka {NILAI_RANGE[0]}-{NILAI_RANGE[1]}"),
+            ('jumlah_tidak_valid', 'jumlah_mahasiswa',
+             data['jumlah_mahasiswa'].notna() & (jumlah.isna() | (jumlah < 0) | (jumlah % 1 != 0)),
+             "jumlah_mahasiswa harus bilangan bulat >= 0"),
+            ('tahun_tidak_valid', 'tahun',
+             tahun.isna() | (tahun < TAHUN_RANGE[0]) | (tahun > TAHUN_RANGE[1]),
+             f"tahun harus antara {TAHUN_RANGE[0]}-{TAHUN_RANGE[1]}"),
+            ('semester_tidak_valid', 'semester', ~semester.isin(SEMESTER_VALID),
+             f"semester harus salah satu dari {SEMESTER_VALID}")
+        ]
+        return ValidationReport(data, self._collect(data, checks))
+
+    def validate_mappings(self, rows):
+        """Validasi batch pemetaan PLO-CLO terhadap katalog, pemetaan yang sudah ada dan duplikasi dalam batch"""
+        data = self._as_frame(rows, MAPPING_COLUMNS)
+        keys = self.key_sets()
+
+        bobot = pd.to_numeric(data['bobot'], errors='coerce')
+        mk_unknown = ~data['kode_mk'].isin(keys['kode_mk'])
+        existing = pd.MultiIndex.from_arrays([
+            data[column].astype(str) for column in ['kode_mk', 'kode_clo', 'kode_plo']
+        ]).isin(keys['mapping'])
+
+        checks = [
+            ('mk_tidak_ada', 'kode_mk', mk_unknown, "Mata kuliah tidak terdaftar"),
+            ('clo_tidak_ada', 'kode_clo', ~mk_unknown & ~self._clo_exists(data, keys),
+             "CLO tidak terdaftar pada mata kuliah tersebut"),
+            ('plo_tidak_ada', 'kode_plo', ~data['kode_plo'].isin(keys['kode_plo']), "PLO tidak terdaftar"),
+            ('tingkat_tidak_valid', 'tingkat_penguasaan',
+             ~data['tingkat_penguasaan'].isin(TINGKAT_PENGUASAAN_VALID),
+             f"tingkat_penguasaan harus salah satu dari {TINGKAT_PENGUASAAN_VALID}"),
+            ('bobot_tidak_valid', 'bobot', data['bobot'].notna() & ~(bobot > 0), "bobot harus angka > 0"),
+            ('duplikat', 'kode_plo', data.duplicated(['kode_mk', 'kode_clo', 'kode_plo']),
+             "Pemetaan duplikat dalam batch"),
+            ('sudah_ada', 'kode_plo', existing, "Pemetaan sudah ada di database")
+        ]
+        return ValidationReport(data, self._collect(data, checks))
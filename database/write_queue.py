@@ -0,0 +1,129 @@
+import time
+import queue
+import atexit
+import threading
+from concurrent.futures import Future
+from utils.config import WRITE_QUEUE_MAX, WRITE_QUEUE_PUT_TIMEOUT, WRITE_BATCH_SIZE, WRITE_BATCH_DELAY
+
+# jenis tulisan -> method batch OBEDatabase yang menyimpannya dalam satu transaksi
+WRITE_KINDS = {
+    'assessment': 'add_assessments',
+    'plo_clo_mapping': 'add_plo_clo_mappings'
+}
+
+_STOP = object()
+
+def _completed(result):
+    ticket = Future()
+    ticket.set_result(result)
+    return ticket
+
+class WriteBehindQueue:
+    """Antrean tulis di belakang layar dengan satu thread penulis (group commit).
+
+    Setiap ``submit`` mengembalikan Future yang selesai (True/False) setelah
+    baris benar-benar di-commit. Thread penulis mengambil semua tulisan yang
+    menunggu, mengelompokkannya per jenis lalu menyimpannya lewat method
+    batch OBEDatabase, sehingga banyak pengguna yang menulis bersamaan hanya
+    membayar satu commit (fsync) per batch. Antrean dibatasi WRITE_QUEUE_MAX;
+    jika penuh pemanggil menunggu (backpressure) paling lama
+    WRITE_QUEUE_PUT_TIMEOUT detik.
+    """
+
+    def __init__(self, database, max_pending=WRITE_QUEUE_MAX, batch_size=WRITE_BATCH_SIZE,
+                 batch_delay=WRITE_BATCH_DELAY, put_timeout=WRITE_QUEUE_PUT_TIMEOUT):
+        self.db = database
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._pending = 0
+        self._idle = threading.Condition()
+        self.stats = {'batch': 0, 'baris': 0, 'batch_terbesar': 0, 'ditolak_penuh': 0}
+        self._thread = threading.Thread(target=self._run, name='obe-db-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, kind, row):
+        """Masukkan satu baris ke antrean; Future berisi True jika baris tersimpan"""
+        if kind not in WRITE_KINDS:
+            raise ValueError(f"Jenis tulisan tidak dikenal: {kind}")
+        if not self._thread.is_alive():
+            print("Error: antrean tulis sudah ditutup")
+            return _completed(False)
+        ticket = Future()
+        with self._idle:
+            self._pending += 1
+        try:
+            self._queue.put((kind, row, ticket), timeout=self.put_timeout)
+        except queue.Full:
+            self._done(1)
+            self.stats['ditolak_penuh'] += 1
+            print("Error: antrean tulis penuh, coba lagi nanti")
+            return _completed(False)
+        return ticket
+
+    def flush(self, timeout=None):
+        """Tunggu sampai semua tulisan yang sudah masuk antrean di-commit"""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def close(self, timeout=None):
+        """Commit sisa antrean lalu hentikan thread penulis"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def _done(self, count):
+        with self._idle:
+            self._pending -= count
+            if self._pending == 0:
+                self._idle.notify_all()
+
+    def _next_batch(self):
+        """Satu item diblokir, sisanya diambil selama tersedia (maks batch_size)"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_delay
+        while len(batch) < self.batch_size and batch[-1] is not _STOP:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            stop = batch[-1] is _STOP
+            items = batch[:-1] if stop else batch
+            if items:
+                self._commit(items)
+            if stop:
+                return
+
+    def _commit(self, items):
+        for kind, method in WRITE_KINDS.items():
+            group = [item for item in items if item[0] == kind]
+            if not group:
+                continue
+            results = [False] * len(group)
+            try:
+                count, report = getattr(self.db, method)([row for _, row, _ in group], partial=True)
+                # Batch yang gagal di tengah transaksi di-rollback seluruhnya
+                if count == int(report.valid_mask.sum()):
+                    results = report.valid_mask.tolist()
+                if not report.is_valid:
+                    print(f"Error: {report.message()}")
+            except Exception as e:
+                print(f"Error: {e}")
+            for (_, _, ticket), result in zip(group, results):
+                ticket.set_result(bool(result))
+            self.stats['batch'] += 1
+            self.stats['baris'] += sum(results)
+            self.stats['batch_terbesar'] = max(self.stats['batch_terbesar'], len(group))
+        self._done(len(items))
@@ -0,0 +1,173 @@
+import pandas as pd
+import numpy as np
+import joblib
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+from sklearn.metrics import silhouette_score
+from utils.config import (CLUSTER_K_RANGE, CLUSTER_SILHOUETTE_SAMPLE,
+                          CLUSTER_BATCH_SIZE, CLUSTER_RANDOM_STATE)
+
+FEATURE_COLUMNS = ['avg_score', 'score_std', 'assessment_count', 'avg_students']
+
+class CourseClusteringEngine:
+    """Clustering performa mata kuliah untuk katalog besar.
+
+    Fitur dihitung sebagai agregat SQL per mata kuliah dan dibaca per chunk,
+    scaler dan MiniBatchKMeans dilatih dengan partial_fit sehingga memori
+    tidak bergantung pada jumlah mata kuliah. Model yang sudah dilatih dapat
+    dipakai ulang untuk mengelompokkan mata kuliah baru tanpa refit.
+    """
+
+    def __init__(self, database, n_clusters=None, k_range=CLUSTER_K_RANGE,
+                 sample_size=CLUSTER_SILHOUETTE_SAMPLE, batch_size=CLUSTER_BATCH_SIZE,
+                 random_state=CLUSTER_RANDOM_STATE, n_epochs=3):
+        self.db = database
+        self.n_clusters = n_clusters
+        self.k_range = k_range
+        self.sample_size = sample_size
+        self.batch_size = batch_size
+        self.random_state = random_state
+        self.n_epochs = n_epochs
+
+        self.scaler = None
+        self.kmeans = None
+        self.cluster_labels = {}
+        self.silhouette_scores = {}
+
+    @property
+    def is_fitted(self):
+        return self.kmeans is not None
+
+    def fit(self):
+        """Melatih scaler dan k-means secara bertahap dari agregat SQL"""
+        total_courses = self.db.count_assessed_courses()
+        if total_courses < 2:
+            return None
+
+        rng = np.random.default_rng(self.random_state)
+        sample_fraction = min(1.0, self.sample_size / total_courses)
+
+        # Pass 1: statistik scaler dan sampel untuk pemilihan k
+        scaler = StandardScaler()
+        sample_chunks = []
+        for chunk in self.db.iter_course_assessment_aggregates(chunksize=self.batch_size):
+            values = chunk[FEATURE_COLUMNS].values.astype(float)
+            scaler.partial_fit(values)
+            sample_chunks.append(values[rng.random(len(values)) < sample_fraction])
+        self.scaler = scaler
+
+        sample = self._transform(np.vstack(sample_chunks))
+        n_clusters = self.n_clusters or self._select_k(sample)
+        n_clusters = max(1, min(n_clusters, total_courses))
+
+        # Pass 2: mini-batch k-means, chunk pertama harus memuat minimal k baris
+        kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=self.batch_size,
+                                 random_state=self.random_state, n_init=3)
+        chunksize = max(self.batch_size, n_clusters)
+        for _ in range(self.n_epochs):
+            for chunk in self.db.iter_course_assessment_aggregates(chunksize=chunksize):
+                values = self._transform(chunk[FEATURE_COLUMNS].values.astype(float))
+                if kmeans_ready(kmeans) or len(values) >= n_clusters:
+                    kmeans.partial_fit(values)
+        self.kmeans = kmeans
+        self.cluster_labels = self._label_clusters()
+        return self
+
+    def predict(self, features):
+        """Menentukan cluster untuk DataFrame fitur mata kuliah (tanpa refit)"""
+        if not self.is_fitted:
+            raise ValueError("Model clustering belum dilatih")
+
+        result = features.copy()
+        clusters = self.kmeans.predict(self._transform(result[FEATURE_COLUMNS].values.astype(float)))
+        result['cluster'] = clusters
+        result['cluster_label'] = result['cluster'].map(self.cluster_labels)
+        return result
+
+    def assign_courses(self, kode_mk_list):
+        """Mengelompokkan mata kuliah tertentu, misalnya mata kuliah baru"""
+        chunks = list(self.db.iter_course_assessment_aggregates(kode_mk_list=list(kode_mk_list)))
+        if not chunks:
+            return pd.DataFrame()
+        return self.predict(pd.concat(chunks, ignore_index=True))
+
+    def cluster_catalog(self):
+        """Mengelompokkan seluruh katalog mata kuliah, chunk demi chunk"""
+        if not self.is_fitted and self.fit() is None:
+            return None
+
+        results = [self.predict(chunk) for chunk in
+                   self.db.iter_course_assessment_aggregates(chunksize=self.batch_size)]
+        return pd.concat(results, ignore_index=True)
+
+    def cluster_summary(self):
+        """Centroid tiap cluster dalam skala fitur asli"""
+        if not self.is_fitted:
+            return pd.DataFrame()
+
+        centroids = self.scaler.inverse_transform(self.kmeans.cluster_centers_)
+        summary = pd.DataFrame(centroids, columns=FEATURE_COLUMNS).round(2)
+        summary.insert(0, 'cluster', range(len(summary)))
+        summary['cluster_label'] = summary['cluster'].map(self.cluster_labels)
+        return summary.sort_values('avg_score', ascending=False).reset_index(drop=True)
+
+    def save(self, path):
+        joblib.dump({
+            'scaler': self.scaler,
+            'kmeans': self.kmeans,
+            'cluster_labels': self.cluster_labels,
+            'silhouette_scores': self.silhouette_scores
+        }, path)
+
+    def load(self, path):
+        state = joblib.load(path)
+        self.scaler = state['scaler']
+        self.kmeans = state['kmeans']
+        self.cluster_labels = state['cluster_labels']
+        self.silhouette_scores = state['silhouette_scores']
+        self.n_clusters = self.kmeans.n_clusters
+        return self
+
+    def _transform(self, values):
+        # Nilai kosong (mis. std untuk satu assessment) diisi rata-rata fitur
+        values = np.where(np.isnan(values), self.scaler.mean_, values)
+        return self.scaler.transform(values)
+
+    def _select_k(self, sample):
+        """Memilih k dengan silhouette score tertinggi pada sampel"""
+        k_min, k_max = self.k_range
+        k_max = min(k_max, len(sample) - 1)
+        if k_max < k_min:
+            return min(3, len(sample))
+
+        self.silhouette_scores = {}
+        for k in range(k_min, k_max + 1):
+            labels = MiniBatchKMeans(n_clusters=k, batch_size=self.batch_size,
+                                     random_state=self.random_state, n_init=3).fit_predict(sample)
+            if len(np.unique(labels)) < 2:
+                continue
+            self.silhouette_scores[k] = silhouette_score(sample, labels)
+
+        if not self.silhouette_scores:
+            return k_min
+        return max(self.silhouette_scores, key=self.silhouette_scores.get)
+
+    def _label_clusters(self):
+        """Label cluster berdasarkan urutan skor rata-rata centroid"""
+        centroids = self.scaler.inverse_transform(self.kmeans.cluster_centers_)
+        order = np.argsort(-centroids[:, FEATURE_COLUMNS.index('avg_score')])
+        return {int(cluster): label for cluster, label in zip(order, rank_labels(len(order)))}
+
+def kmeans_ready(kmeans):
+    return hasattr(kmeans, 'cluster_centers_')
+
+def rank_labels(n_clusters):
+    """Nama label performa dari tertinggi ke terendah"""
+    if n_clusters == 1:
+        return ['Performa Sedang']
+    if n_clusters == 2:
+        return ['Performa Tinggi', 'Performa Rendah']
+    if n_clusters == 3:
+        return ['Performa Tinggi', 'Performa Sedang', 'Performa Rendah']
+    middle = [f'Performa Sedang {i}' for i in range(1, n_clusters - 1)]
+    return ['Performa Tinggi'] + middle + ['Performa Rendah']
@@ -0,0 +1,234 @@
+import threading
+import numpy as np
+
+class PrerequisiteGraph:
+    """Graf prasyarat mata kuliah dengan adjacency array (format CSR).
+
+    Edge mengarah dari mata kuliah prasyarat ke mata kuliah yang
+    membutuhkannya. Semua analitik struktural dihitung sekali saat
+    konstruksi: urutan topologi, siklus, rantai prasyarat terpanjang dan
+    PLO hilir yang dicapai tiap mata kuliah melalui pemetaan PLO-CLO.
+    """
+
+    def __init__(self, courses, prerequisites, plo_mapping):
+        self.courses = courses.reset_index(drop=True)
+        self.codes = self.courses['kode_mk'].tolist()
+        self.index = {kode: i for i, kode in enumerate(self.codes)}
+
+        # Edge ke mata kuliah yang tidak ada di katalog diabaikan
+        edges = prerequisites[prerequisites['kode_mk'].isin(self.index) &
+                              prerequisites['kode_mk_prasyarat'].isin(self.index)]
+        sources = edges['kode_mk_prasyarat'].map(self.index).values.astype(np.int64)
+        targets = edges['kode_mk'].map(self.index).values.astype(np.int64)
+
+        n = len(self.codes)
+        self.successor_ptr, self.successors = self._csr(sources, targets, n)
+        self.predecessor_ptr, self.predecessors = self._csr(targets, sources, n)
+
+        self.plo_codes = sorted(plo_mapping['kode_plo'].dropna().unique())
+        plo_index = {kode: i for i, kode in enumerate(self.plo_codes)}
+        self.own_plo = np.zeros((n, len(self.plo_codes)), dtype=bool)
+        mapped = plo_mapping[plo_mapping['kode_mk'].isin(self.index) & plo_mapping['kode_plo'].notna()]
+        if not mapped.empty:
+            self.own_plo[mapped['kode_mk'].map(self.index).values.astype(np.int64),
+                         mapped['kode_plo'].map(plo_index).values.astype(np.int64)] = True
+
+        self.topological_order, self.in_cycle = self._topological_sort()
+        self.cycles = self._find_cycles()
+        self.depth, self.chain_parent = self._longest_chains()
+        self.downstream_plo = self._downstream_plo()
+
+    @staticmethod
+    def _csr(sources, targets, n):
+        order = np.argsort(sources, kind='stable')
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.add.at(indptr, sources + 1, 1)
+        return np.cumsum(indptr), targets[order]
+
+    def neighbours(self, node, reverse=False):
+        if reverse:
+            return self.predecessors[self.predecessor_ptr[node]:self.predecessor_ptr[node + 1]]
+        return self.successors[self.successor_ptr[node]:self.successor_ptr[node + 1]]
+
+    def _topological_sort(self):
+        """Algoritma Kahn; node yang tersisa berada pada atau setelah siklus"""
+        in_degree = np.diff(self.predecessor_ptr).copy()
+        queue = list(np.flatnonzero(in_degree == 0))
+        order = []
+        while queue:
+            node = queue.pop()
+            order.append(node)
+            for succ in self.neighbours(node):
+                in_degree[succ] -= 1
+                if in_degree[succ] == 0:
+                    queue.append(succ)
+        blocked = np.ones(len(self.codes), dtype=bool)
+        blocked[order] = False
+        return np.array(order, dtype=np.int64), blocked
+
+    def _find_cycles(self):
+        """Komponen terhubung kuat (Tarjan iteratif) yang membentuk siklus"""
+        n = len(self.codes)
+        index_of = np.full(n, -1)
+        lowlink = np.zeros(n, dtype=np.int64)
+        on_stack = np.zeros(n, dtype=bool)
+        stack, cycles, counter = [], [], 0
+
+        # Hanya node yang tidak lolos Kahn yang mungkin berada dalam siklus
+        for root in np.flatnonzero(self.in_cycle):
+            if index_of[root] >= 0:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, position = work.pop()
+                if position == 0:
+                    index_of[node] = lowlink[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack[node] = True
+                successors = self.neighbours(node)
+                if position < len(successors):
+                    work.append((node, position + 1))
+                    succ = successors[position]
+                    if index_of[succ] < 0:
+                        work.append((succ, 0))
+                    elif on_stack[succ]:
+                        lowlink[node] = min(lowlink[node], index_of[succ])
+                    continue
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1:
+                        cycles.append(sorted(self.codes[m] for m in component))
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+        in_cycle = np.zeros(n, dtype=bool)
+        for component in cycles:
+            in_cycle[[self.index[kode] for kode in component]] = True
+        self.in_cycle = in_cycle
+        return cycles
+
+    def _longest_chains(self):
+        """Panjang rantai prasyarat terpanjang yang berakhir di tiap mata kuliah"""
+        depth = np.full(len(self.codes), -1, dtype=np.int64)
+        parent = np.full(len(self.codes), -1, dtype=np.int64)
+        for node in self.topological_order:
+            preds = self.neighbours(node, reverse=True)
+            preds = preds[depth[preds] >= 0]
+            if len(preds) == 0:
+                depth[node] = 1
+            else:
+                best = preds[np.argmax(depth[preds])]
+                depth[node] = depth[best] + 1
+                parent[node] = best
+        return depth, parent
+
+    def _downstream_plo(self):
+        """PLO yang dicapai mata kuliah itu sendiri dan semua mata kuliah sesudahnya.
+
+        Dihitung pada graf kondensasi (setiap siklus diringkas menjadi satu
+        node) sehingga mata kuliah sebelum siklus tetap mewarisi PLO dari
+        mata kuliah di dalam dan sesudah siklus.
+        """
+        n = len(self.codes)
+        component = np.arange(n, dtype=np.int64)
+        for cycle in self.cycles:
+            members = [self.index[kode] for kode in cycle]
+            component[members] = members[0]
+        _, component = np.unique(component, return_inverse=True)
+        n_components = component.max() + 1 if n else 0
+
+        reach = np.zeros((n_components, len(self.plo_codes)), dtype=bool)
+        np.logical_or.at(reach, component, self.own_plo)
+
+        sources = component[np.repeat(np.arange(n), np.diff(self.successor_ptr))]
+        targets = component[self.successors]
+        keep = sources != targets
+        edges = np.unique(np.stack([sources[keep], targets[keep]], axis=1), axis=0)
+        succ_ptr, succ = self._csr(edges[:, 0], edges[:, 1], n_components)
+
+        # Urutan topologi graf kondensasi (selalu asiklik), lalu propagasi mundur
+        in_degree = np.bincount(edges[:, 1], minlength=n_components)
+        queue = list(np.flatnonzero(in_degree == 0))
+        order = []
+        while queue:
+            node = queue.pop()
+            order.append(node)
+            for nxt in succ[succ_ptr[node]:succ_ptr[node + 1]]:
+                in_degree[nxt] -= 1
+                if in_degree[nxt] == 0:
+                    queue.append(nxt)
+        for node in order[::-1]:
+            nxt = succ[succ_ptr[node]:succ_ptr[node + 1]]
+            if len(nxt):
+                reach[node] |= reach[nxt].any(axis=0)
+        return reach[component]
+
+    def longest_chain(self):
+        """Rantai prasyarat terpanjang sebagai daftar kode mata kuliah"""
+        if not len(self.topological_order):
+            return []
+        node = int(np.argmax(self.depth))
+        chain = []
+        while node >= 0:
+            chain.append(self.codes[node])
+            node = self.chain_parent[node]
+        return chain[::-1]
+
+    def prerequisite_chain(self, kode_mk):
+        """Semua prasyarat (langsung dan tidak langsung) dari sebuah mata kuliah"""
+        start = self.index[kode_mk]
+        seen = np.zeros(len(self.codes), dtype=bool)
+        queue = [start]
+        while queue:
+            node = queue.pop()
+            for pred in self.neighbours(node, reverse=True):
+                if not seen[pred]:
+                    seen[pred] = True
+                    queue.append(pred)
+        return [self.codes[i] for i in np.flatnonzero(seen)]
+
+    def summary(self):
+        """Ringkasan struktural per mata kuliah"""
+        topo_rank = np.full(len(self.codes), -1, dtype=np.int64)
+        topo_rank[self.topological_order] = np.arange(len(self.topological_order))
+        plo_codes = np.array(self.plo_codes, dtype=object)
+
+        result = self.courses[['kode_mk', 'nama_mk', 'semester']].copy()
+        result['urutan_topologi'] = np.where(topo_rank >= 0, topo_rank + 1, np.nan)
+        result['panjang_rantai'] = np.where(self.depth > 0, self.depth, np.nan)
+        result['jumlah_prasyarat'] = np.diff(self.predecessor_ptr)
+        result['jumlah_dependen'] = np.diff(self.successor_ptr)
+        result['dalam_siklus'] = self.in_cycle
+        result['plo_hilir'] = [", ".join(plo_codes[row]) for row in self.downstream_plo]
+        result['jumlah_plo_hilir'] = self.downstream_plo.sum(axis=1)
+        return result
+
+_graph_cache = {}
+_graph_lock = threading.Lock()
+
+def get_prerequisite_graph(database):
+    """Graf prasyarat yang di-cache per proses sampai data kurikulum berubah"""
+    version = database.get_data_version(database.CURRICULUM_TABLES)
+    cached = _graph_cache.get(database.db_path)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    with _graph_lock:
+        cached = _graph_cache.get(database.db_path)
+        if cached and cached[0] == version:
+            return cached[1]
+        graph = PrerequisiteGraph(
+            database.get_all_mata_kuliah(),
+            database.get_prerequisites(),
+            database.get_plo_clo_matrix()[['kode_mk', 'kode_plo']]
+        )
+        _graph_cache[database.db_path] = (version, graph)
+        return graph
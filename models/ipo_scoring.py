@@ -0,0 +1,110 @@
+import pandas as pd
+import numpy as np
+from utils.config import LAM_SKOR_MAKSIMUM, LAM_PERINGKAT
+
+KATEGORI_IPO = ['Input', 'Process', 'Output']
+
+def normalize_kategori(kategori):
+    """Menyeragamkan label kategori IPO (mis. 'Output/Outcome' -> 'Output')"""
+    kategori = kategori.fillna('').str.strip().str.lower()
+    return np.select(
+        [kategori.str.startswith('input'), kategori.str.startswith('process') | kategori.str.startswith('proses'),
+         kategori.str.startswith('output') | kategori.str.startswith('outcome')],
+        KATEGORI_IPO, 'Lainnya'
+    )
+
+def peringkat_akreditasi(nilai):
+    """Peringkat akreditasi dari nilai 0-400; menerima skalar maupun array"""
+    nilai = np.asarray(nilai, dtype=float)
+    thresholds = [t for t, _ in LAM_PERINGKAT]
+    labels = [label for _, label in LAM_PERINGKAT]
+    result = np.select([nilai >= t for t in thresholds], labels, labels[-1])
+    result = np.where(np.isnan(nilai), None, result)
+    return result.item() if result.ndim == 0 else result
+
+class IPOScoringEngine:
+    """Penilaian akreditasi tertimbang dari matriks IPO.
+
+    Skor butir = skor maksimum x min(pencapaian / target, 1). Skor kategori
+    Input/Process/Output dan nilai akreditasi (0-400) adalah rata-rata skor
+    tertimbang bobot_lam. Semua periode (tahun, semester) dihitung dalam
+    satu kali operasi kolom dan groupby, tanpa loop per komponen.
+    """
+
+    def __init__(self, database):
+        self.db = database
+
+    def score_components(self, ipo_data=None):
+        """Skor dan gap per komponen IPO untuk semua periode"""
+        data = self.db.get_ipo_data() if ipo_data is None else ipo_data.copy()
+        if data.empty:
+            return data
+
+        target = pd.to_numeric(data['target_pencapaian'], errors='coerce')
+        aktual = pd.to_numeric(data['pencapaian_aktual'], errors='coerce')
+        bobot = pd.to_numeric(data['bobot_lam'], errors='coerce').fillna(0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rasio = np.where(target > 0, aktual / target, np.nan)
+
+        data['kategori_ipo'] = normalize_kategori(data['kategori'])
+        data['rasio_capaian'] = np.round(rasio, 4)
+        data['skor'] = np.round(LAM_SKOR_MAKSIMUM * np.clip(rasio, 0, 1), 3)
+        data['gap'] = np.round(target - aktual, 2)
+        data['gap_positif'] = data['gap'].clip(lower=0)
+        data['gap_persen'] = np.round(np.where(target > 0, (target - aktual) / target * 100, np.nan), 2)
+        data['bobot_efektif'] = np.where(np.isnan(data['skor']), 0.0, bobot)
+        data['skor_tertimbang'] = np.nan_to_num(data['skor']) * data['bobot_efektif']
+        data['memenuhi_target'] = aktual >= target
+        return data
+
+    def score_periods(self, ipo_data=None):
+        """Skor Input/Process/Output dan nilai akreditasi per tahun dan semester"""
+        components = self.score_components(ipo_data)
+        if components.empty:
+            return pd.DataFrame()
+
+        keys = ['tahun', 'semester']
+        per_kategori = components.groupby(keys + ['kategori_ipo'], dropna=False)[
+            ['skor_tertimbang', 'bobot_efektif']].sum()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            per_kategori['skor'] = per_kategori['skor_tertimbang'] / per_kategori['bobot_efektif']
+        skor_kategori = per_kategori['skor'].unstack('kategori_ipo').reindex(columns=KATEGORI_IPO)
+        skor_kategori.columns = [f"skor_{k.lower()}" for k in skor_kategori.columns]
+
+        totals = components.groupby(keys, dropna=False).agg(
+            skor_tertimbang=('skor_tertimbang', 'sum'),
+            bobot_efektif=('bobot_efektif', 'sum'),
+            jumlah_komponen=('komponen', 'size'),
+            komponen_memenuhi=('memenuhi_target', 'sum'),
+            total_gap=('gap_positif', 'sum')
+        )
+        with np.errstate(divide='ignore', invalid='ignore'):
+            nilai = 100 * totals['skor_tertimbang'] / totals['bobot_efektif']
+
+        result = skor_kategori.join(totals[['jumlah_komponen', 'komponen_memenuhi', 'total_gap']])
+        result['nilai_akreditasi'] = nilai
+        result = result.round(2).reset_index()
+        result['peringkat'] = peringkat_akreditasi(result['nilai_akreditasi'].values)
+        return result.sort_values(keys, ascending=False).reset_index(drop=True)
+
+    def gap_analysis(self, ipo_data=None, top_n=None):
+        """Komponen dengan kesenjangan target terbesar, diurutkan menurut dampak tertimbang"""
+        components = self.score_components(ipo_data)
+        if components.empty:
+            return components
+
+        gaps = components[~components['memenuhi_target'].fillna(False)].copy()
+        gaps['dampak_skor'] = np.round((LAM_SKOR_MAKSIMUM - gaps['skor'].fillna(0)) * gaps['bobot_efektif'], 3)
+        gaps = gaps.sort_values(['tahun', 'semester', 'dampak_skor'], ascending=[False, False, False])
+        columns = ['tahun', 'semester', 'kategori_ipo', 'komponen', 'bobot_lam', 'target_pencapaian',
+                   'pencapaian_aktual', 'gap', 'gap_persen', 'skor', 'dampak_skor']
+        gaps = gaps[columns].reset_index(drop=True)
+        return gaps.head(top_n) if top_n else gaps
+
+    def latest_accreditation(self, ipo_data=None):
+        """Nilai dan peringkat akreditasi untuk periode terbaru (dari ipo_data bila diberikan), atau None"""
+        periods = self.score_periods(ipo_data)
+        if periods.empty or periods['nilai_akreditasi'].isna().all():
+            return None
+        return periods.dropna(subset=['nilai_akreditasi']).iloc[0].to_dict()
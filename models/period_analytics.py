@@ -0,0 +1,117 @@
+import pandas as pd
+
+# assessment_agregat: baris hot dan sel ringkasan arsip (lihat AssessmentArchive)
+PLO_SOURCE = """
+    assessment_agregat a
+    JOIN plo_clo_mapping map ON a.kode_mk = map.kode_mk AND a.kode_clo = map.kode_clo
+    JOIN plo ON map.kode_plo = plo.kode_plo
+"""
+
+# level -> (nama kolom kunci, ekspresi kunci, ekspresi label, sumber data)
+LEVELS = {
+    'plo': ('kode_plo', 'plo.kode_plo', 'plo.deskripsi', PLO_SOURCE),
+    'kategori': ('kategori', 'plo.kategori', 'plo.kategori', PLO_SOURCE),
+    'mk': ('kode_mk', 'a.kode_mk', 'mk.nama_mk',
+           "assessment_agregat a JOIN mata_kuliah mk ON a.kode_mk = mk.kode_mk")
+}
+
+def period_index(tahun, semester):
+    """Nomor urut periode: semester berurutan selisih 1, tahun berurutan selisih 2"""
+    return int(tahun) * 2 + int(semester) - 1
+
+class PeriodAnalytics:
+    """Perbandingan antar periode dengan window function SQLite.
+
+    Agregasi per (kunci, tahun, semester), selisih terhadap semester sebelumnya
+    (LAG), selisih year-over-year pada semester yang sama, dan rata-rata
+    bergulir (SUM/COUNT ... OVER RANGE) semuanya dihitung di database.
+    Filter rentang periode diterapkan setelah window dihitung sehingga periode
+    pertama dalam rentang tetap dibandingkan dengan periode sebelumnya.
+    """
+
+    def __init__(self, database):
+        self.db = database
+
+    def _query(self, level, rolling_years, keys, latest_only):
+        if level not in LEVELS:
+            raise ValueError(f"Level tidak dikenal: {level}")
+        key_name, key_expr, label_expr, source = LEVELS[level]
+        key_filter = ""
+        if keys:
+            key_filter = "WHERE {} IN ({})".format(key_expr, ", ".join("?" * len(keys)))
+        rolling_span = max(1, int(rolling_years)) * 2 - 1
+        latest_filter = "AND periode = periode_terakhir" if latest_only else ""
+
+        return f"""
+        WITH per_periode AS (
+            SELECT {key_expr} AS kunci, MAX({label_expr}) AS label,
+                   a.tahun, a.semester, a.tahun * 2 + a.semester - 1 AS periode,
+                   SUM(a.total_nilai) AS total_nilai,
+                   SUM(a.jumlah_nilai) AS jumlah_assessment
+            FROM {source}
+            {key_filter}
+            GROUP BY kunci, a.tahun, a.semester
+        ),
+        windowed AS (
+            SELECT kunci, label, tahun, semester, periode, jumlah_assessment,
+                   total_nilai * 1.0 / jumlah_assessment AS pencapaian,
+                   LAG(periode) OVER urut AS periode_lalu,
+                   LAG(total_nilai * 1.0 / jumlah_assessment) OVER urut AS pencapaian_lalu,
+                   LAG(tahun) OVER semester_sama AS tahun_lalu,
+                   LAG(total_nilai * 1.0 / jumlah_assessment) OVER semester_sama AS pencapaian_tahun_lalu,
+                   SUM(total_nilai) OVER bergulir * 1.0 / SUM(jumlah_assessment) OVER bergulir AS rata_rata_bergulir,
+                   COUNT(*) OVER bergulir AS periode_bergulir,
+                   MAX(periode) OVER (PARTITION BY kunci) AS periode_terakhir
+            FROM per_periode
+            WINDOW urut AS (PARTITION BY kunci ORDER BY periode),
+                   semester_sama AS (PARTITION BY kunci, semester ORDER BY tahun),
+                   bergulir AS (PARTITION BY kunci ORDER BY periode
+                                RANGE BETWEEN {rolling_span} PRECEDING AND CURRENT ROW)
+        )
+        SELECT kunci AS {key_name}, label, tahun, semester,
+               ROUND(pencapaian, 2) AS pencapaian, jumlah_assessment,
+               ROUND(CASE WHEN periode_lalu = periode - 1 THEN pencapaian - pencapaian_lalu END, 2)
+                   AS delta_semester,
+               ROUND(CASE WHEN tahun_lalu = tahun - 1 THEN pencapaian - pencapaian_tahun_lalu END, 2)
+                   AS delta_tahunan,
+               ROUND(CASE WHEN tahun_lalu = tahun - 1 AND pencapaian_tahun_lalu <> 0
+                          THEN (pencapaian - pencapaian_tahun_lalu) * 100.0 / pencapaian_tahun_lalu END, 2)
+                   AS perubahan_tahunan_persen,
+               ROUND(rata_rata_bergulir, 2) AS rata_rata_bergulir,
+               periode_bergulir
+        FROM windowed
+        WHERE periode BETWEEN ? AND ? {latest_filter}
+        ORDER BY kunci, periode
+        """
+
+    def compare_periods(self, level='plo', dari=None, sampai=None, keys=None, rolling_years=2,
+                        latest_only=False):
+        """Pencapaian per periode beserta delta semester, delta tahunan dan rata-rata bergulir.
+
+        level: 'plo', 'kategori' atau 'mk'. dari/sampai: tuple (tahun, semester)
+        inklusif; None berarti tanpa batas.
+        """
+        query = self._query(level, rolling_years, keys, latest_only)
+        start = period_index(*dari) if dari else -1
+        end = period_index(*sampai) if sampai else 2 ** 31
+        params = list(keys or []) + [start, end]
+
+        conn = self.db.get_connection()
+        try:
+            return pd.read_sql(query, conn, params=params)
+        finally:
+            conn.close()
+
+    def latest_changes(self, level='plo', keys=None, rolling_years=2):
+        """Baris periode terakhir untuk setiap kunci, diurutkan dari penurunan terbesar"""
+        result = self.compare_periods(level, keys=keys, rolling_years=rolling_years, latest_only=True)
+        return result.sort_values('delta_semester', na_position='last').reset_index(drop=True)
+
+    def period_matrix(self, level='plo', value='pencapaian', dari=None, sampai=None, keys=None):
+        """Tabel kunci x periode untuk salah satu kolom hasil compare_periods"""
+        result = self.compare_periods(level, dari, sampai, keys)
+        key_name = LEVELS[level][0]
+        if result.empty:
+            return pd.DataFrame()
+        result['periode'] = result['tahun'].astype(str) + '/' + result['semester'].astype(str)
+        return result.pivot(index=key_name, columns='periode', values=value)
@@ -4,31 +4,46 @@ from sklearn.linear_model import LinearRegression
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, r2_score
+from utils.config import (BOOTSTRAP_REPLICATES, BOOTSTRAP_SEED,
+                          BOOTSTRAP_CONFIDENCE_LEVEL, BOOTSTRAP_CHUNK_SIZE)
 import warnings
 warnings.filterwarnings('ignore')
 
+def calculate_risk_score(current_score, trend, volatility):
+    """Skor risiko PLO; menerima skalar maupun array NumPy"""
+    current_score = np.asarray(current_score, dtype=float)
+    trend = np.asarray(trend, dtype=float)
+    volatility = np.asarray(volatility, dtype=float)
+    
+    score_points = np.select(
+        [current_score < 70, current_score < 75, current_score < 80], [3, 2, 1], 0)
+    trend_points = np.select([trend < -1, trend < 0, trend < 0.5], [3, 2, 1], 0)
+    volatility_points = np.select([volatility > 10, volatility > 5], [2, 1], 0)
+    return score_points + trend_points + volatility_points
+
+def risk_level_from_score(risk_score):
+    """Tingkat risiko dari skor risiko; menerima skalar maupun array NumPy"""
+    levels = np.select([np.asarray(risk_score) >= 5, np.asarray(risk_score) >= 3],
+                       ["Tinggi", "Sedang"], "Rendah")
+    return str(levels) if levels.ndim == 0 else levels
+
 class PredictiveAnalytics:
     def __init__(self, database):
         self.db = database
     
     def prepare_plo_timeseries_data(self):
         """Mempersiapkan data time series untuk analisis PLO"""
-        assessment_data = self.db.get_assessment_data()
+        # Roll-up per PLO per periode dari kubus pencapaian (diperbarui inkremental)
+        plo_timeseries = self.db.attainment.rollup(['kode_plo', 'tahun', 'semester'])
+        plo_timeseries = plo_timeseries.dropna(subset=['kode_plo', 'tahun', 'semester'])
         
-        if assessment_data.empty:
+        if plo_timeseries.empty:
             return pd.DataFrame()
         
-        # Agregasi data per PLO per periode
-        plo_matrix = self.db.get_plo_clo_matrix()
-        
-        merged_data = pd.merge(assessment_data, plo_matrix, 
-                             on=['kode_mk', 'kode_clo'], how='left')
-        
-        # Group by PLO dan periode
-        plo_timeseries = merged_data.groupby(['kode_plo', 'tahun', 'semester']).agg({
-            'nilai_rata_rata': 'mean',
-            'jumlah_mahasiswa': 'sum'
-        }).reset_index()
+        plo_timeseries = plo_timeseries.rename(columns={
+            'pencapaian': 'nilai_rata_rata',
+            'total_mahasiswa': 'jumlah_mahasiswa'
+        })[['kode_plo', 'tahun', 'semester', 'nilai_rata_rata', 'jumlah_mahasiswa']]
         
         # Create time index
         plo_timeseries['periode'] = plo_timeseries['tahun'] + (plo_timeseries['semester'] - 1) / 2
@@ -36,9 +51,12 @@ class PredictiveAnalytics:
         
         return plo_timeseries
     
-    def predict_plo_trend(self, kode_plo, periods=2):
-        """Memprediksi trend PLO untuk periode mendatang"""
+    def predict_plo_trend(self, kode_plo, periods=2, n_bootstrap=BOOTSTRAP_REPLICATES,
+                          confidence_level=BOOTSTRAP_CONFIDENCE_LEVEL, random_state=BOOTSTRAP_SEED):
+        """Memprediksi trend PLO untuk periode mendatang beserta prediction interval"""
         data = self.prepare_plo_timeseries_data()
+        if data.empty:
+            return {"error": "Data tidak cukup untuk prediksi"}
         plo_data = data[data['kode_plo'] == kode_plo]
         
         if len(plo_data) < 3:
@@ -61,6 +79,14 @@ class PredictiveAnalytics:
         # Ensure predictions are within reasonable bounds
         predictions = np.clip(predictions, 0, 100)
         
+        # Prediction interval dari residual bootstrap
+        intervals = self.bootstrap_prediction_intervals(
+            plo_data, periods=periods, n_bootstrap=n_bootstrap,
+            confidence_level=confidence_level, random_state=random_state
+        )
+        lower = intervals['lower_bound'].values
+        upper = intervals['upper_bound'].values
+        
         result = {
             'plo': kode_plo,
             'current_performance': y[-1],
@@ -70,18 +96,141 @@ class PredictiveAnalytics:
                     'tahun': int(future_periods[i]),
                     'semester': 1 if (future_periods[i] % 1) < 0.5 else 2,
                     'predicted_score': round(float(predictions[i]), 2),
-                    'trend': 'naik' if predictions[i] > y[-1] else 'turun'
+                    'lower_bound': round(float(lower[i]), 2),
+                    'upper_bound': round(float(upper[i]), 2),
+                    'trend': self._interval_trend(lower[i], upper[i], y[-1])
                 }
                 for i in range(len(predictions))
             ],
-            'confidence': round(r2_score(y, model.predict(X)), 3)
+            'confidence': round(r2_score(y, model.predict(X)), 3),
+            'interval_level': confidence_level,
+            'n_bootstrap': n_bootstrap
         }
         
         return result
     
-    def calculate_plo_risk_assessment(self):
-        """Menilai risiko pencapaian PLO"""
+    def predict_all_plo_trends(self, periods=2, n_bootstrap=BOOTSTRAP_REPLICATES,
+                               confidence_level=BOOTSTRAP_CONFIDENCE_LEVEL, random_state=BOOTSTRAP_SEED):
+        """Prediksi trend dan prediction interval untuk semua PLO sekaligus"""
         data = self.prepare_plo_timeseries_data()
+        if data.empty:
+            return pd.DataFrame()
+        
+        intervals = self.bootstrap_prediction_intervals(
+            data, periods=periods, n_bootstrap=n_bootstrap,
+            confidence_level=confidence_level, random_state=random_state
+        )
+        if intervals.empty:
+            return intervals
+        
+        last_scores = data.groupby('kode_plo')['nilai_rata_rata'].last()
+        intervals['current_performance'] = intervals['kode_plo'].map(last_scores).round(2)
+        intervals['trend'] = [
+            self._interval_trend(lo, hi, cur)
+            for lo, hi, cur in zip(intervals['lower_bound'], intervals['upper_bound'],
+                                   intervals['current_performance'])
+        ]
+        return intervals
+    
+    def bootstrap_prediction_intervals(self, timeseries, periods=2, n_bootstrap=BOOTSTRAP_REPLICATES,
+                                       confidence_level=BOOTSTRAP_CONFIDENCE_LEVEL,
+                                       random_state=BOOTSTRAP_SEED, min_points=3):
+        """Residual bootstrap prediction interval untuk trend linear semua PLO.
+        
+        Semua replikasi dan semua PLO dihitung sebagai operasi matriks NumPy:
+        deret waktu tiap PLO di-pad menjadi array (P, T) dengan mask, OLS
+        diselesaikan dalam bentuk tertutup, lalu residual di-resample untuk
+        B replikasi per batch berukuran (B, P, T).
+        """
+        columns = ['kode_plo', 'periode', 'tahun', 'semester',
+                   'predicted_score', 'lower_bound', 'upper_bound']
+        
+        counts = timeseries.groupby('kode_plo')['periode'].transform('size')
+        ts = timeseries[counts >= min_points].sort_values(['kode_plo', 'periode'])
+        if ts.empty:
+            return pd.DataFrame(columns=columns)
+        
+        # Pad deret waktu ke array (P, T) dengan mask untuk titik yang valid
+        plo_codes, plo_idx = np.unique(ts['kode_plo'].values, return_inverse=True)
+        position = ts.groupby('kode_plo').cumcount().values
+        n_plo, max_len = len(plo_codes), position.max() + 1
+        
+        t = np.zeros((n_plo, max_len))
+        y = np.zeros((n_plo, max_len))
+        mask = np.zeros((n_plo, max_len))
+        t[plo_idx, position] = ts['periode'].values
+        y[plo_idx, position] = ts['nilai_rata_rata'].values
+        mask[plo_idx, position] = 1.0
+        n_obs = mask.sum(axis=1)
+        
+        # OLS tertutup per PLO: slope = Sxy / Sxx
+        t_mean = (t * mask).sum(axis=1) / n_obs
+        t_centered = (t - t_mean[:, None]) * mask
+        sxx = (t_centered ** 2).sum(axis=1)
+        sxx = np.where(sxx > 0, sxx, 1.0)
+        y_mean = (y * mask).sum(axis=1) / n_obs
+        slope = (t_centered * y).sum(axis=1) / sxx
+        intercept = y_mean - slope * t_mean
+        fitted = (intercept[:, None] + slope[:, None] * t) * mask
+        
+        # Residual dipusatkan dan dikoreksi derajat kebebasannya
+        residuals = (y - fitted) * mask
+        residuals -= (residuals.sum(axis=1) / n_obs)[:, None] * mask
+        residuals *= np.sqrt(n_obs / np.maximum(n_obs - 2, 1))[:, None]
+        
+        last_period = (t * mask).max(axis=1)
+        horizon = last_period[:, None] + 0.5 * np.arange(1, periods + 1)[None, :]
+        point = np.clip(intercept[:, None] + slope[:, None] * horizon, 0, 100)
+        
+        rng = np.random.default_rng(random_state)
+        row_idx = np.arange(n_plo)[None, :, None]
+        alpha = (1 - confidence_level) / 2
+        simulated = []
+        
+        for start in range(0, n_bootstrap, BOOTSTRAP_CHUNK_SIZE):
+            b = min(BOOTSTRAP_CHUNK_SIZE, n_bootstrap - start)
+            
+            # Resample residual hanya dari posisi valid setiap PLO
+            draw = (rng.random((b, n_plo, max_len)) * n_obs[None, :, None]).astype(np.int64)
+            y_star = fitted[None] + residuals[row_idx, draw] * mask[None]
+            
+            slope_star = np.einsum('bpt,pt->bp', y_star, t_centered) / sxx
+            intercept_star = (y_star.sum(axis=2) / n_obs) - slope_star * t_mean
+            
+            # Prediksi + residual baru untuk prediction interval (bukan confidence interval)
+            future_draw = (rng.random((b, n_plo, periods)) * n_obs[None, :, None]).astype(np.int64)
+            future_noise = residuals[np.arange(n_plo)[None, :, None], future_draw]
+            simulated.append(intercept_star[:, :, None] + slope_star[:, :, None] * horizon[None]
+                             + future_noise)
+        
+        simulated = np.clip(np.concatenate(simulated, axis=0), 0, 100)
+        lower, upper = np.quantile(simulated, [alpha, 1 - alpha], axis=0)
+        
+        result = pd.DataFrame({
+            'kode_plo': np.repeat(plo_codes, periods),
+            'periode': horizon.ravel(),
+            'predicted_score': point.ravel().round(2),
+            'lower_bound': lower.ravel().round(2),
+            'upper_bound': upper.ravel().round(2)
+        })
+        result['tahun'] = result['periode'].astype(int)
+        result['semester'] = np.where((result['periode'] % 1) < 0.5, 1, 2)
+        return result[columns]
+    
+    @staticmethod
+    def _interval_trend(lower, upper, current):
+        """Label trend hanya jika prediction interval tidak mencakup nilai terkini"""
+        if lower > current:
+            return 'naik'
+        if upper < current:
+            return 'turun'
+        return 'stabil'
+    
+    def calculate_plo_risk_assessment(self, sampai=None):
+        """Menilai risiko pencapaian PLO; sampai=(tahun, semester) membatasi riwayat yang dipakai"""
+        data = self.prepare_plo_timeseries_data()
+        if sampai is not None and not data.empty:
+            data = data[data['periode'] <= sampai[0] + (sampai[1] - 1) / 2]
         
         if data.empty:
             return pd.DataFrame()
@@ -101,33 +250,8 @@ class PredictiveAnalytics:
             participation_rate = plo_data['jumlah_mahasiswa'].mean()
             
             # Risk score calculation
-            risk_score = 0
-            if current_score < 70:
-                risk_score += 3
-            elif current_score < 75:
-                risk_score += 2
-            elif current_score < 80:
-                risk_score += 1
-            
-            if trend < -1:
-                risk_score += 3
-            elif trend < 0:
-                risk_score += 2
-            elif trend < 0.5:
-                risk_score += 1
-            
-            if volatility > 10:
-                risk_score += 2
-            elif volatility > 5:
-                risk_score += 1
-            
-            # Risk level
-            if risk_score >= 5:
-                risk_level = "Tinggi"
-            elif risk_score >= 3:
-                risk_level = "Sedang"
-            else:
-                risk_level = "Rendah"
+            risk_score = int(calculate_risk_score(current_score, trend, volatility))
+            risk_level = risk_level_from_score(risk_score)
             
             # Recommendations
             recommendations = []
@@ -175,39 +299,9 @@ class AdvancedAnalytics:
     def __init__(self, database):
         self.db = database
     
-    def cluster_program_performance(self):
+    def cluster_program_performance(self, n_clusters=None):
         """Clustering performa program berdasarkan berbagai metrik"""
-        from sklearn.cluster import KMeans
-        from sklearn.preprocessing import StandardScaler
-        
-        data = self.db.get_assessment_data()
-        if data.empty:
-            return None
-        
-        # Prepare features for clustering
-        features = data.groupby('kode_mk').agg({
-            'nilai_rata_rata': ['mean', 'std', 'count'],
-            'jumlah_mahasiswa': 'mean'
-        }).reset_index()
-        
-        features.columns = ['kode_mk', 'avg_score', 'score_std', 'assessment_count', 'avg_students']
-        
-        # Handle missing values
-        features = features.fillna(features.mean())
-        
-        # Scale features
-        scaler = StandardScaler()
-        scaled_features = scaler.fit_transform(features[['avg_score', 'score_std', 'assessment_count', 'avg_students']])
-        
-        # Apply K-means clustering
-        kmeans = KMeans(n_clusters=3, random_state=42)
-        clusters = kmeans.fit_predict(scaled_features)
-        
-        features['cluster'] = clusters
-        features['cluster_label'] = features['cluster'].map({
-            0: 'Performa Tinggi',
-            1: 'Performa Sedang', 
-            2: 'Performa Rendah'
-        })
+        from models.clustering import CourseClusteringEngine
         
-        return features
\ No newline at end of file
+        engine = CourseClusteringEngine(self.db, n_clusters=n_clusters)
+        return engine.cluster_catalog()
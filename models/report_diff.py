@@ -0,0 +1,138 @@
+import pandas as pd
+from models.predictive_models import PredictiveAnalytics
+
+ACHIEVEMENT_TABLES = ('assessment', 'plo', 'mata_kuliah', 'clo', 'plo_clo_mapping')
+
+# bagian -> (tabel sumber untuk versi bagian, kolom kunci, kolom yang dibandingkan)
+SECTIONS = {
+    'pencapaian_plo': (ACHIEVEMENT_TABLES, ['kode_plo'], ['pencapaian']),
+    'risiko': (ACHIEVEMENT_TABLES, ['kode_plo'], ['tingkat_risiko']),
+    'pemetaan': (('plo', 'mata_kuliah', 'clo', 'plo_clo_mapping'), ['kode_mk', 'kode_clo', 'kode_plo'],
+                 ['tingkat_penguasaan', 'bobot']),
+    'ipo': (('ipo',), ['komponen', 'tahun', 'semester'], ['target_pencapaian', 'pencapaian_aktual', 'status'])
+}
+
+# Perubahan pencapaian di bawah ambang ini dianggap pembulatan
+ACHIEVEMENT_TOLERANCE = 0.005
+
+class ReportDiff:
+    """Laporan perubahan antara dua periode atau dua versi data.
+
+    Hasil setiap bagian laporan (pencapaian PLO, tingkat risiko, pemetaan
+    PLO-CLO, komponen IPO) disimpan per versi data di tabel report_result.
+    Bagian yang tabel sumbernya tidak berubah sejak hasil tersimpan terakhir
+    dipakai ulang tanpa dihitung ulang, dan perbandingan hanya mengeluarkan
+    baris yang berubah.
+    """
+
+    def __init__(self, database):
+        self.db = database
+        self.predictive = PredictiveAnalytics(database)
+
+    # Pembentuk hasil per bagian untuk versi data saat ini
+    def _build(self, bagian):
+        if bagian == 'pencapaian_plo':
+            return self.db.get_plo_achievement()[['kode_plo', 'pencapaian']]
+        if bagian == 'risiko':
+            return self._risk_levels(self.predictive.calculate_plo_risk_assessment())
+        if bagian == 'pemetaan':
+            return self.db.get_plo_clo_matrix()[['kode_mk', 'kode_clo', 'kode_plo', 'tingkat_penguasaan', 'bobot']]
+        return self.db.get_ipo_data()[['komponen', 'kategori', 'tahun', 'semester', 'target_pencapaian',
+                                        'pencapaian_aktual', 'status']]
+
+    @staticmethod
+    def _risk_levels(risk):
+        if risk.empty:
+            return pd.DataFrame(columns=['kode_plo', 'skor_risiko', 'tingkat_risiko'])
+        return risk[['kode_plo', 'skor_risiko', 'tingkat_risiko']]
+
+    def capture(self):
+        """Simpan hasil semua bagian untuk versi data saat ini; mengembalikan (versi, hasil per bagian)"""
+        version = self.db.get_data_version()
+        state = {}
+        for bagian, (tables, _, _) in SECTIONS.items():
+            stored = self.db.get_report_result(bagian, data_version=version)
+            if stored is None:
+                section_version = self.db.get_data_version(tables)
+                # Tabel sumber tidak berubah sejak hasil tersimpan terakhir: pakai ulang
+                stored = self.db.get_report_result(bagian, versi_bagian=section_version)
+                if stored is None:
+                    stored = self._build(bagian)
+                self.db.save_report_result(version, bagian, section_version, stored)
+            state[bagian] = stored
+        return version, state
+
+    def load(self, data_version):
+        """Hasil tersimpan untuk satu versi data (bagian yang tidak tersimpan dilewati)"""
+        state = {}
+        for bagian in SECTIONS:
+            stored = self.db.get_report_result(bagian, data_version=data_version)
+            if stored is not None:
+                state[bagian] = stored
+        return state
+
+    def period_state(self, tahun, semester):
+        """Hasil bagian yang bergantung periode: pencapaian periode, risiko sampai periode, IPO periode"""
+        achievement = self.db.attainment.rollup(['kode_plo'], {'tahun': tahun, 'semester': semester})
+        ipo = self.db.get_ipo_data()
+        ipo = ipo[(ipo['tahun'] == tahun) & (ipo['semester'] == semester)]
+        return {
+            'pencapaian_plo': pd.DataFrame({'kode_plo': achievement['kode_plo'],
+                                            'pencapaian': achievement['pencapaian'].round(2)}),
+            'risiko': self._risk_levels(self.predictive.calculate_plo_risk_assessment(sampai=(tahun, semester))),
+            'ipo': ipo[['komponen', 'kategori', 'target_pencapaian', 'pencapaian_aktual', 'status']]
+        }
+
+    def compare_versions(self, dari_versi, sampai_versi=None):
+        """Perubahan sejak laporan pada versi data dari_versi sampai versi lain (default: data saat ini)"""
+        before = self.load(dari_versi)
+        if not before:
+            raise ValueError(f"Tidak ada hasil laporan tersimpan untuk versi data {dari_versi}")
+        if sampai_versi is None:
+            sampai_versi, after = self.capture()
+        else:
+            after = self.load(sampai_versi)
+        return self.compare(before, after, f"Versi data {dari_versi}", f"Versi data {sampai_versi}")
+
+    def compare_periods(self, dari, sampai):
+        """Perubahan antara dua periode (tahun, semester)"""
+        return self.compare(self.period_state(*dari), self.period_state(*sampai),
+                            f"{dari[0]} Semester {dari[1]}", f"{sampai[0]} Semester {sampai[1]}")
+
+    @staticmethod
+    def _changes(before, after, keys, columns):
+        """Outer join per kunci; hanya baris baru, dihapus atau yang kolom pembandingnya berubah"""
+        keys = [key for key in keys if key in before.columns and key in after.columns]
+        merged = pd.merge(before, after, on=keys, how='outer', suffixes=('_sebelum', '_sesudah'),
+                          indicator=True)
+        changed = pd.Series(False, index=merged.index)
+        for column in columns:
+            old, new = merged[f"{column}_sebelum"], merged[f"{column}_sesudah"]
+            if pd.api.types.is_numeric_dtype(old) and pd.api.types.is_numeric_dtype(new):
+                differs = (new - old).abs() > ACHIEVEMENT_TOLERANCE
+            else:
+                differs = old.astype(str) != new.astype(str)
+            changed |= differs & old.notna() & new.notna() | (old.isna() != new.isna())
+        merged['perubahan'] = merged['_merge'].map({'left_only': 'dihapus', 'right_only': 'baru',
+                                                    'both': 'berubah'}).astype(str)
+        merged = merged[(merged['_merge'] != 'both') | changed].drop(columns='_merge')
+        ordered = keys + ['perubahan'] + [f"{column}_{side}" for column in columns
+                                          for side in ('sebelum', 'sesudah')]
+        return merged[ordered].sort_values(keys).reset_index(drop=True)
+
+    def compare(self, before, after, label_dari, label_sampai):
+        """Bandingkan dua kumpulan hasil; bagian yang tidak ada di salah satu sisi dilewati"""
+        sections = {}
+        for bagian, (_, keys, columns) in SECTIONS.items():
+            if bagian not in before or bagian not in after:
+                continue
+            changes = self._changes(before[bagian], after[bagian], keys, columns)
+            if bagian == 'pencapaian_plo':
+                changes['selisih'] = (changes['pencapaian_sesudah'] - changes['pencapaian_sebelum']).round(2)
+            sections[bagian] = changes
+        return {
+            'dari': label_dari,
+            'sampai': label_sampai,
+            'bagian': sections,
+            'ringkasan': {bagian: len(changes) for bagian, changes in sections.items()}
+        }
@@ -0,0 +1,241 @@
+import pandas as pd
+import numpy as np
+from models.predictive_models import calculate_risk_score, risk_level_from_score
+from utils.config import TINGKAT_PENGUASAAN_FAKTOR
+
+class CurriculumSimulator:
+    """Simulasi what-if perubahan pemetaan PLO-CLO tanpa menulis ke database.
+
+    Basis pencapaian dihitung sekali: matriks jumlah nilai dan jumlah baris
+    assessment per CLO per periode (C x T) serta bobot pemetaan PLO x CLO.
+    Pencapaian PLO per periode adalah (W @ total_nilai) / (W @ jumlah_nilai).
+    Secara default W = jumlah baris pemetaan, sama dengan rata-rata per
+    periode pada calculate_plo_risk_assessment; dengan weighted=True
+    W = bobot * faktor tingkat penguasaan (update bobot/tingkat hanya bisa
+    disimulasikan dalam mode ini). Setiap delta pemetaan hanya
+    mengubah satu baris pembilang dan penyebut, sehingga sebuah skenario
+    dihitung ulang dalam orde milidetik.
+    """
+
+    ACTIONS = ('add', 'remove', 'update')
+
+    def __init__(self, database, weighted=False, mastery_factors=None):
+        self.db = database
+        self.weighted = weighted
+        self.mastery_factors = mastery_factors or TINGKAT_PENGUASAAN_FAKTOR
+        self._basis = None
+        self._baseline = None
+
+    def refresh(self):
+        """Membangun ulang basis pencapaian dari database"""
+        aggregates = self.db.get_clo_period_aggregates()
+        matrix = self.db.snapshots.frame('plo_clo_matrix')
+        plo_codes = self.db.get_all_plo()['kode_plo'].tolist()
+
+        clo_keys = sorted(set(zip(aggregates['kode_mk'], aggregates['kode_clo'])) |
+                          set(zip(matrix['kode_mk'], matrix['kode_clo'])))
+        clo_index = {key: i for i, key in enumerate(clo_keys)}
+        plo_index = {kode: i for i, kode in enumerate(plo_codes)}
+
+        periods = np.sort((aggregates['tahun'] + (aggregates['semester'] - 1) / 2).unique()).astype(float)
+        period_index = {p: i for i, p in enumerate(periods)}
+
+        n_clo, n_period = len(clo_keys), len(periods)
+        score_total = np.zeros((n_clo, n_period))
+        score_count = np.zeros((n_clo, n_period))
+        students = np.zeros((n_clo, n_period))
+        if not aggregates.empty:
+            rows = [clo_index[key] for key in zip(aggregates['kode_mk'], aggregates['kode_clo'])]
+            cols = [period_index[p] for p in aggregates['tahun'] + (aggregates['semester'] - 1) / 2]
+            score_total[rows, cols] = aggregates['total_nilai'].fillna(0).values
+            score_count[rows, cols] = aggregates['jumlah_nilai'].values
+            students[rows, cols] = aggregates['total_mahasiswa'].fillna(0).values
+
+        # Bobot pemetaan; baris duplikat dijumlahkan seperti pada merge biasa
+        links = {}
+        weights = np.zeros((len(plo_codes), n_clo))
+        linked = np.zeros((len(plo_codes), n_clo))
+        for row in matrix.itertuples(index=False):
+            if row.kode_plo not in plo_index:
+                continue
+            key = (row.kode_plo, row.kode_mk, row.kode_clo)
+            weight = self._link_weight(row.bobot, row.tingkat_penguasaan)
+            previous = links.get(key)
+            links[key] = {
+                'bobot': row.bobot,
+                'tingkat_penguasaan': row.tingkat_penguasaan,
+                'weight': weight + (previous['weight'] if previous else 0.0),
+                'rows': 1 + (previous['rows'] if previous else 0)
+            }
+            p, c = plo_index[row.kode_plo], clo_index[(row.kode_mk, row.kode_clo)]
+            weights[p, c] += weight
+            linked[p, c] += 1.0
+
+        self._basis = {
+            'plo_codes': plo_codes,
+            'plo_index': plo_index,
+            'clo_index': clo_index,
+            'periods': periods,
+            'score_total': score_total,
+            'score_count': score_count,
+            'students': students,
+            'links': links,
+            'numerator': weights @ score_total,
+            'denominator': weights @ score_count,
+            'participation': linked @ students
+        }
+        self._baseline = self._summarize(self._basis['numerator'],
+                                         self._basis['denominator'],
+                                         self._basis['participation'])
+        return self
+
+    @property
+    def basis(self):
+        if self._basis is None:
+            self.refresh()
+        return self._basis
+
+    def baseline(self):
+        """Pencapaian dan risiko PLO dengan pemetaan saat ini"""
+        self.basis
+        return self._baseline.copy()
+
+    def simulate(self, deltas):
+        """Menerapkan daftar delta pemetaan di memori dan membandingkan dengan baseline.
+
+        Setiap delta berupa dict dengan kunci ``action`` ('add', 'remove',
+        'update'), ``kode_mk``, ``kode_clo``, ``kode_plo`` dan opsional
+        ``bobot`` serta ``tingkat_penguasaan``.
+        """
+        basis = self.basis
+        numerator = basis['numerator'].copy()
+        denominator = basis['denominator'].copy()
+        participation = basis['participation'].copy()
+        links = dict(basis['links'])
+
+        for delta in deltas:
+            action = delta.get('action')
+            if action not in self.ACTIONS:
+                raise ValueError(f"Aksi tidak dikenal: {action}")
+            if delta['kode_plo'] not in basis['plo_index']:
+                raise ValueError(f"PLO tidak ditemukan: {delta['kode_plo']}")
+
+            key = (delta['kode_plo'], delta['kode_mk'], delta['kode_clo'])
+            current = links.get(key)
+            if action == 'add' and current is not None:
+                raise ValueError(f"Pemetaan sudah ada: {key}")
+            if action in ('remove', 'update') and current is None:
+                raise ValueError(f"Pemetaan tidak ditemukan: {key}")
+
+            if action == 'remove':
+                new_link = None
+            else:
+                base = current or {'bobot': 1.0, 'tingkat_penguasaan': 'I'}
+                bobot = delta.get('bobot', base['bobot'])
+                tingkat = delta.get('tingkat_penguasaan', base['tingkat_penguasaan'])
+                # Tanpa pembobotan bobot/tingkat tidak memengaruhi pencapaian; jangan laporkan nol perubahan diam-diam
+                if action == 'update' and not self.weighted and (
+                        bobot != current['bobot'] or tingkat != current['tingkat_penguasaan']):
+                    raise ValueError(f"Perubahan bobot/tingkat penguasaan {key} hanya bisa disimulasikan "
+                                     "dengan weighted=True")
+                # Update berlaku untuk semua baris pemetaan duplikat dari kunci yang sama
+                rows = current['rows'] if current else 1
+                new_link = {'bobot': bobot, 'tingkat_penguasaan': tingkat,
+                            'weight': rows * self._link_weight(bobot, tingkat), 'rows': rows}
+
+            old_weight = current['weight'] if current else 0.0
+            new_weight = new_link['weight'] if new_link else 0.0
+            if new_link is None:
+                links.pop(key)
+            else:
+                links[key] = new_link
+
+            # CLO tanpa data assessment tidak mengubah pencapaian
+            c = basis['clo_index'].get((delta['kode_mk'], delta['kode_clo']))
+            if c is None:
+                continue
+            p = basis['plo_index'][delta['kode_plo']]
+            weight_change = new_weight - old_weight
+            numerator[p] += weight_change * basis['score_total'][c]
+            denominator[p] += weight_change * basis['score_count'][c]
+            row_change = (new_link['rows'] if new_link else 0) - (current['rows'] if current else 0)
+            participation[p] += row_change * basis['students'][c]
+
+        scenario = self._summarize(numerator, denominator, participation)
+        return self._compare(self._baseline, scenario)
+
+    def compare_scenarios(self, scenarios):
+        """Menjalankan beberapa skenario {nama: deltas} dan menggabungkan hasilnya"""
+        results = []
+        for name, deltas in scenarios.items():
+            result = self.simulate(deltas)
+            result.insert(0, 'skenario', name)
+            results.append(result)
+        if not results:
+            return pd.DataFrame()
+        return pd.concat(results, ignore_index=True)
+
+    def _link_weight(self, bobot, tingkat_penguasaan):
+        if not self.weighted:
+            return 1.0
+        bobot = 1.0 if bobot is None or pd.isna(bobot) else float(bobot)
+        return bobot * self.mastery_factors.get(tingkat_penguasaan, 1.0)
+
+    def _summarize(self, numerator, denominator, participation):
+        """Pencapaian dan risiko untuk semua PLO dalam operasi array"""
+        periods = self._basis['periods']
+        valid = denominator > 0
+        n_valid = valid.sum(axis=1)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            achievement = np.where(valid, numerator / np.where(valid, denominator, 1), np.nan)
+            overall = numerator.sum(axis=1) / denominator.sum(axis=1)
+
+            # Regresi linear per PLO hanya pada periode yang memiliki data
+            t_mean = (valid * periods).sum(axis=1) / n_valid
+            t_centered = np.where(valid, periods - t_mean[:, None], 0.0)
+            y_filled = np.where(valid, achievement, 0.0)
+            y_mean = y_filled.sum(axis=1) / n_valid
+            trend = (t_centered * y_filled).sum(axis=1) / (t_centered ** 2).sum(axis=1)
+
+            # Simpangan baku sampel (ddof=1) seperti pandas
+            deviation = np.where(valid, achievement - y_mean[:, None], 0.0)
+            volatility = np.sqrt((deviation ** 2).sum(axis=1) / (n_valid - 1))
+            participation_rate = np.where(valid, participation, 0.0).sum(axis=1) / n_valid
+
+        if len(periods):
+            last_valid = len(periods) - 1 - np.argmax(valid[:, ::-1], axis=1)
+            current = achievement[np.arange(len(achievement)), last_valid]
+        else:
+            current = np.full(len(achievement), np.nan)
+
+        risk_score = calculate_risk_score(current, trend, volatility)
+        enough_data = n_valid >= 2
+
+        return pd.DataFrame({
+            'kode_plo': self._basis['plo_codes'],
+            'pencapaian': np.round(overall, 2),
+            'skor_terkini': np.round(current, 2),
+            'trend': np.round(trend, 3),
+            'volatilitas': np.round(volatility, 2),
+            'partisipasi_rata': np.round(participation_rate, 0),
+            'skor_risiko': np.where(enough_data, risk_score, np.nan),
+            'tingkat_risiko': np.where(enough_data, risk_level_from_score(risk_score), None)
+        })
+
+    @staticmethod
+    def _compare(baseline, scenario):
+        result = pd.DataFrame({
+            'kode_plo': baseline['kode_plo'],
+            'pencapaian_awal': baseline['pencapaian'],
+            'pencapaian_simulasi': scenario['pencapaian'],
+            'selisih_pencapaian': (scenario['pencapaian'] - baseline['pencapaian']).round(2),
+            'skor_risiko_awal': baseline['skor_risiko'],
+            'skor_risiko_simulasi': scenario['skor_risiko'],
+            'tingkat_risiko_awal': baseline['tingkat_risiko'],
+            'tingkat_risiko_simulasi': scenario['tingkat_risiko']
+        })
+        result['berubah'] = ~np.isclose(result['pencapaian_awal'], result['pencapaian_simulasi'],
+                                        equal_nan=True) | \
+                            (result['tingkat_risiko_awal'].fillna('') != result['tingkat_risiko_simulasi'].fillna(''))
+        return result
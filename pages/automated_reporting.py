@@ -1,9 +1,17 @@
+import io
 import streamlit as st
 import pandas as pd
 from datetime import datetime
 from database.database import db
 from utils.reporting import ReportGenerator
+from utils.scheduler import ReportScheduler
+from utils.bulk_reporting import report_matrix, generate_bundle
+from models.report_diff import ReportDiff
+from utils.config import REPORT_TYPES, REPORT_FORMATS
+from utils.tables import paginated_table
+from utils.profiling import profiled_page
 
+@profiled_page("Automated Reporting")
 def show_automated_reporting():
     st.title("📑 Automated Reporting System")
     
@@ -73,35 +81,40 @@ def show_automated_reporting():
                         use_container_width=True
                     )
                 
-                # Preview informasi laporan
-                st.header("5. Preview Laporan")
-                
-                # Show summary statistics
-                plo_data = db.get_all_plo()
-                mk_data = db.get_all_mata_kuliah()
-                assessment_data = db.get_assessment_data()
-                
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    st.metric("Jumlah PLO", len(plo_data))
-                with col2:
-                    st.metric("Jumlah Mata Kuliah", len(mk_data))
-                with col3:
-                    st.metric("Data Assessment", len(assessment_data))
-                
-                # Show sample data
-                if st.checkbox("Tampilkan Sample Data"):
-                    st.subheader("Sample Data PLO")
-                    st.dataframe(plo_data.head(), use_container_width=True)
-                    
-                    if not assessment_data.empty:
-                        st.subheader("Sample Data Assessment")
-                        st.dataframe(assessment_data.head(), use_container_width=True)
+                # Hasil terstruktur disimpan sebagai dasar laporan perubahan
+                ReportDiff(db).capture()
+                st.session_state['report_preview'] = True
             
             except Exception as e:
                 st.error(f"❌ Error dalam membuat laporan: {str(e)}")
     
+    # Preview informasi laporan
+    if st.session_state.get('report_preview'):
+        st.header("5. Preview Laporan")
+        
+        # Show summary statistics
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric("Jumlah PLO", db.count_rows('plo'))
+        with col2:
+            st.metric("Jumlah Mata Kuliah", db.count_rows('mata_kuliah'))
+        with col3:
+            st.metric("Data Assessment", db.count_rows('assessment'))
+        
+        # Show sample data
+        if st.checkbox("Tampilkan Sample Data"):
+            st.subheader("Sample Data PLO")
+            paginated_table(db, 'plo', key="preview_plo", sort_options=['kode_plo', 'kategori'],
+                            page_size=10)
+            
+            st.subheader("Sample Data Assessment")
+            paginated_table(db, 'assessment', key="preview_assessment",
+                            columns=['kode_mk', 'kode_clo', 'tahun', 'semester', 'jenis_assessment',
+                                     'nilai_rata_rata', 'jumlah_mahasiswa'],
+                            sort_options=['tahun', 'kode_mk', 'nilai_rata_rata'],
+                            filter_columns=['kode_mk', 'tahun'], page_size=25)
+    
     # Template Laporan LAM INFOKOM
     st.header("🎯 Template Khusus LAM INFOKOM")
     
@@ -132,25 +145,139 @@ def show_automated_reporting():
             except Exception as e:
                 st.error(f"❌ Error: {str(e)}")
     
+    # Laporan massal semua periode
+    st.header("📦 Generate Laporan Massal")
+    
+    periods = db.get_assessment_periods()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        batch_types = st.multiselect("Jenis Laporan Massal:", REPORT_TYPES, default=REPORT_TYPES)
+    with col2:
+        batch_formats = st.multiselect("Format Laporan Massal:", REPORT_FORMATS, default=REPORT_FORMATS)
+    with col3:
+        batch_periods = st.multiselect(
+            "Periode:", periods, default=periods,
+            format_func=lambda period: f"{period[0]} Semester {period[1]}"
+        )
+    
+    if st.button("📦 Generate Bundle Laporan", use_container_width=True):
+        specs = report_matrix(db, batch_types, batch_formats, batch_periods)
+        if not specs:
+            st.warning("Pilih minimal satu jenis, format dan periode")
+        else:
+            with st.spinner(f"Membuat {len(specs)} laporan..."):
+                bundle = io.BytesIO()
+                manifest = generate_bundle(db, specs, bundle)
+            st.success(f"✅ {manifest['jumlah_laporan']} laporan dibuat dalam "
+                       f"{manifest['durasi_total_detik']} detik ({manifest['workers']} worker)")
+            if manifest['jumlah_gagal']:
+                st.error(f"❌ {manifest['jumlah_gagal']} laporan gagal dibuat")
+            st.download_button(
+                label="📥 Download Bundle (ZIP)",
+                data=bundle.getvalue(),
+                file_name=f"bundle_laporan_{datetime.now().strftime('%Y%m%d')}.zip",
+                mime="application/zip",
+                use_container_width=True
+            )
+            st.dataframe(pd.DataFrame(manifest['laporan'])[
+                ['periode', 'jenis_laporan', 'format_laporan', 'status', 'durasi_detik', 'ukuran_byte']
+            ], use_container_width=True)
+    
+    # Laporan perubahan
+    st.header("🔀 Laporan Perubahan")
+    
+    diff_mode = st.radio("Bandingkan:", ["Antar Periode", "Sejak Laporan Sebelumnya"], horizontal=True)
+    diff_engine = ReportDiff(db)
+    col1, col2, col3 = st.columns(3)
+    if diff_mode == "Antar Periode":
+        if len(periods) < 2:
+            st.info("Minimal dua periode assessment diperlukan")
+        with col1:
+            diff_dari = st.selectbox("Dari Periode:", periods, index=min(1, max(len(periods) - 1, 0)),
+                                     format_func=lambda period: f"{period[0]} Semester {period[1]}")
+        with col2:
+            diff_sampai = st.selectbox("Sampai Periode:", periods, index=0,
+                                       format_func=lambda period: f"{period[0]} Semester {period[1]}")
+    else:
+        versions = db.get_report_result_versions()
+        if versions.empty:
+            st.info("Belum ada hasil laporan tersimpan; generate laporan terlebih dahulu")
+        with col1:
+            diff_versi = st.selectbox(
+                "Laporan Sebelumnya:", versions['data_version'].tolist(),
+                format_func=lambda versi: f"Versi data {versi} ({versions.set_index('data_version').loc[versi, 'created_at']})"
+            )
+    with col3:
+        diff_format = st.selectbox("Format Laporan Perubahan:", REPORT_FORMATS)
+    
+    if st.button("🔀 Generate Laporan Perubahan", use_container_width=True):
+        try:
+            with st.spinner("Menghitung perubahan..."):
+                if diff_mode == "Antar Periode":
+                    diff = diff_engine.compare_periods(diff_dari, diff_sampai)
+                else:
+                    diff = diff_engine.compare_versions(diff_versi)
+                diff_report = report_generator.generate_diff_report(diff, diff_format)
+            
+            st.success(f"✅ Perubahan {diff['dari']} → {diff['sampai']}")
+            cols = st.columns(len(diff['ringkasan']) or 1)
+            for col, (bagian, jumlah) in zip(cols, diff['ringkasan'].items()):
+                col.metric(bagian.replace('_', ' ').title(), jumlah)
+            extension, mime = (('xlsx', "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+                               if diff_format == "Excel" else ('pdf', "application/pdf"))
+            st.download_button(
+                label="📥 Download Laporan Perubahan",
+                data=diff_report,
+                file_name=f"laporan_perubahan_{datetime.now().strftime('%Y%m%d')}.{extension}",
+                mime=mime,
+                use_container_width=True
+            )
+        except Exception as e:
+            st.error(f"❌ Error: {str(e)}")
+    
     # Automated Scheduling
     st.header("🕐 Automated Reporting Schedule")
     
-    st.warning("Fitur automated scheduling membutuhkan integrasi dengan sistem scheduling")
+    scheduler = ReportScheduler(db)
+    
+    st.info("Jadwal dijalankan oleh worker terpisah: `python -m utils.scheduler`")
     
     col1, col2 = st.columns(2)
     
     with col1:
+        schedule_name = st.text_input("Nama Jadwal:", "Laporan Rutin Prodi SI")
         schedule_frequency = st.selectbox(
             "Frekuensi Laporan:",
             ["Mingguan", "Bulanan", "Semesteran", "Tahunan"]
         )
     
     with col2:
+        schedule_format = st.selectbox("Format Laporan Terjadwal:", ["Excel", "PDF"])
         auto_recipients = st.text_input(
             "Email Penerima (pisahkan dengan koma):",
             "admin@universitas.edu,kaprodi@si.universitas.edu"
         )
     
     if st.button("💾 Set Automated Schedule", use_container_width=True):
-        st.success(f"✅ Schedule laporan {schedule_frequency} berhasil disimpan!")
-        st.info(f"Laporan akan dikirim ke: {auto_recipients}")
+        schedule_id = scheduler.add_schedule(schedule_name, report_type, schedule_format,
+                                             schedule_frequency, auto_recipients)
+        if schedule_id:
+            st.success(f"✅ Schedule laporan {schedule_frequency} berhasil disimpan!")
+            st.info(f"Laporan akan dikirim ke: {auto_recipients}")
+        else:
+            st.error("❌ Gagal menyimpan jadwal")
+    
+    schedules = db.get_report_schedules()
+    if not schedules.empty:
+        st.subheader("📅 Jadwal Tersimpan")
+        st.dataframe(schedules, use_container_width=True)
+        
+        if st.button("▶️ Jalankan Jadwal Jatuh Tempo Sekarang", use_container_width=True):
+            with st.spinner("Menjalankan jadwal..."):
+                results = scheduler.run_due()
+            st.success(f"✅ {len(results)} jadwal dijalankan")
+        
+        runs = db.get_report_runs(limit=20)
+        if not runs.empty:
+            st.subheader("🧾 Riwayat Eksekusi")
+            st.dataframe(runs, use_container_width=True)
@@ -0,0 +1,81 @@
+import streamlit as st
+from database.database import db
+from models.curriculum_graph import get_prerequisite_graph
+from utils.profiling import profiled_page
+
+@profiled_page("Manajemen Kurikulum")
+def show_curriculum_management():
+    st.title("📚 Manajemen Kurikulum")
+
+    mk_data = db.get_all_mata_kuliah()
+    graph = get_prerequisite_graph(db)
+
+    # Pencarian Kurikulum
+    st.header("🔍 Pencarian PLO, CLO dan Mata Kuliah")
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        search_query = st.text_input("Kata kunci:", placeholder="mis. analisis data")
+    with col2:
+        search_type = st.selectbox("Jenis:", ["Semua", "PLO", "CLO", "MK"])
+
+    if search_query:
+        results = db.search_curriculum(search_query, jenis=None if search_type == "Semua" else search_type,
+                                       limit=50)
+        if results.empty:
+            st.info("Tidak ada hasil")
+        else:
+            for row in results.itertuples(index=False):
+                st.markdown(f"**[{row.jenis}] {row.judul}** — {row.cuplikan}", unsafe_allow_html=True)
+
+    # Prasyarat Mata Kuliah
+    st.header("1. Prasyarat Mata Kuliah")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        kode_mk = st.selectbox("Mata Kuliah:", mk_data['kode_mk'].tolist())
+    with col2:
+        kode_mk_prasyarat = st.selectbox("Prasyarat:", mk_data['kode_mk'].tolist(), key="prasyarat")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("➕ Tambah Prasyarat", use_container_width=True):
+            if db.add_prerequisite(kode_mk, kode_mk_prasyarat):
+                st.success(f"✅ {kode_mk_prasyarat} ditambahkan sebagai prasyarat {kode_mk}")
+                st.rerun()
+            else:
+                st.error("❌ Prasyarat tidak valid atau sudah ada")
+    with col2:
+        if st.button("🗑️ Hapus Prasyarat", use_container_width=True):
+            if db.remove_prerequisite(kode_mk, kode_mk_prasyarat):
+                st.success("✅ Prasyarat dihapus")
+                st.rerun()
+            else:
+                st.warning("Prasyarat tidak ditemukan")
+
+    # Analisis Struktur Kurikulum
+    st.header("2. Analisis Struktur Kurikulum")
+
+    if graph.cycles:
+        st.error(f"❌ Ditemukan {len(graph.cycles)} siklus prasyarat")
+        for cycle in graph.cycles:
+            st.write(" → ".join(cycle))
+    else:
+        st.success("✅ Tidak ada siklus prasyarat")
+
+    chain = graph.longest_chain()
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Rantai Prasyarat Terpanjang", len(chain))
+    with col2:
+        st.metric("Mata Kuliah Dalam Siklus", int(graph.in_cycle.sum()))
+    if chain:
+        st.info(" → ".join(chain))
+
+    st.subheader("📋 Struktur per Mata Kuliah")
+    st.dataframe(graph.summary(), use_container_width=True)
+
+    st.subheader("🔗 Prasyarat Lengkap")
+    selected = st.selectbox("Pilih Mata Kuliah:", mk_data['kode_mk'].tolist(), key="rantai")
+    prerequisites = graph.prerequisite_chain(selected) if selected in graph.index else []
+    st.write(", ".join(prerequisites) if prerequisites else "Tidak ada prasyarat")
@@ -0,0 +1,72 @@
+import streamlit as st
+import plotly.express as px
+from database.database import db
+from models.ipo_scoring import IPOScoringEngine
+from utils.profiling import profiled_page
+
+@profiled_page("Matriks IPO")
+def show_ipo_matrix():
+    st.title("🏛️ Matriks IPO (Input-Process-Output)")
+
+    scoring_engine = IPOScoringEngine(db)
+    ipo_data = db.get_ipo_data()
+
+    if ipo_data.empty:
+        st.info("Belum ada data IPO")
+        return
+
+    # Skor akreditasi per periode
+    st.header("1. Skor Akreditasi LAM INFOKOM")
+    period_scores = scoring_engine.score_periods(ipo_data)
+
+    latest = period_scores.dropna(subset=['nilai_akreditasi'])
+    if not latest.empty:
+        latest = latest.iloc[0]
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Nilai Akreditasi", f"{latest['nilai_akreditasi']:.2f}")
+        with col2:
+            st.metric("Peringkat", latest['peringkat'])
+        with col3:
+            st.metric("Komponen Memenuhi Target",
+                      f"{int(latest['komponen_memenuhi'])}/{int(latest['jumlah_komponen'])}")
+        with col4:
+            st.metric("Periode", f"{int(latest['tahun'])}/{int(latest['semester'])}")
+
+    chart_data = period_scores.melt(id_vars=['tahun', 'semester'],
+                                    value_vars=['skor_input', 'skor_process', 'skor_output'],
+                                    var_name='kategori', value_name='skor')
+    chart_data['periode'] = chart_data['tahun'].astype(str) + '/' + chart_data['semester'].astype(str)
+    fig = px.bar(chart_data.sort_values('periode'), x='periode', y='skor', color='kategori',
+                 barmode='group', title='Skor Input-Process-Output per Periode')
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe(period_scores, use_container_width=True)
+
+    # Gap analysis
+    st.header("2. Gap Analysis")
+    st.dataframe(scoring_engine.gap_analysis(ipo_data, top_n=20), use_container_width=True)
+
+    # Update pencapaian secara massal
+    st.header("3. Update Pencapaian")
+    periods = ipo_data[['tahun', 'semester']].drop_duplicates().sort_values(['tahun', 'semester'],
+                                                                           ascending=False)
+    period_labels = [f"{int(t)}/{int(s)}" for t, s in periods.itertuples(index=False)]
+    selected = st.selectbox("Periode:", period_labels)
+    tahun, semester = (int(v) for v in selected.split('/'))
+
+    period_data = ipo_data[(ipo_data['tahun'] == tahun) & (ipo_data['semester'] == semester)]
+    edited = st.data_editor(
+        period_data[['komponen', 'kategori', 'bobot_lam', 'target_pencapaian',
+                     'pencapaian_aktual', 'status', 'catatan']],
+        disabled=['komponen', 'kategori', 'bobot_lam', 'target_pencapaian'],
+        use_container_width=True, hide_index=True, key=f"ipo_editor_{selected}"
+    )
+
+    if st.button("💾 Simpan Semua Perubahan", type="primary", use_container_width=True):
+        updates = edited[['komponen', 'pencapaian_aktual', 'status', 'catatan']].to_dict('records')
+        updated = db.bulk_update_ipo_pencapaian(updates, tahun=tahun, semester=semester)
+        if updated is False:
+            st.error("❌ Gagal menyimpan perubahan")
+        else:
+            st.success(f"✅ {updated} komponen diperbarui")
+            st.rerun()
@@ -4,7 +4,12 @@ import plotly.express as px
 import plotly.graph_objects as go
 from database.database import db
 from models.predictive_models import PredictiveAnalytics, AdvancedAnalytics
+from utils.config import BOOTSTRAP_REPLICATES, BOOTSTRAP_SEED
+from utils.tables import paginated_dataframe
+from utils.chart_data import plo_trend_chart_data, reduce_scatter
+from utils.profiling import profiled_page
 
+@profiled_page("Predictive Analytics")
 def show_predictive_analytics():
     st.title("🤖 Predictive Analytics")
     
@@ -27,9 +32,19 @@ def show_predictive_analytics():
         
         periods = st.slider("Jumlah Periode Prediksi:", 1, 4, 2)
         
+        col1, col2 = st.columns(2)
+        with col1:
+            n_bootstrap = st.select_slider("Jumlah Replikasi Bootstrap:",
+                                           options=[500, 1000, 2000, 5000, 10000],
+                                           value=BOOTSTRAP_REPLICATES)
+        with col2:
+            seed = st.number_input("Seed Bootstrap:", min_value=0, value=BOOTSTRAP_SEED)
+        
         if st.button("Lakukan Prediksi", type="primary"):
             with st.spinner("Menganalisis data dan membuat prediksi..."):
-                prediction = predictive_engine.predict_plo_trend(selected_plo, periods)
+                prediction = predictive_engine.predict_plo_trend(selected_plo, periods,
+                                                                 n_bootstrap=n_bootstrap,
+                                                                 random_state=int(seed))
                 
                 if "error" in prediction:
                     st.error(prediction["error"])
@@ -48,9 +63,8 @@ def show_predictive_analytics():
                     # Visualisasi prediksi
                     st.subheader("📊 Visualisasi Trend dan Prediksi")
                     
-                    # Prepare data for visualization
-                    historical_data = predictive_engine.prepare_plo_timeseries_data()
-                    plo_historical = historical_data[historical_data['kode_plo'] == selected_plo]
+                    # Data historis yang sudah di-downsample dan di-cache per versi data
+                    plo_historical = plo_trend_chart_data(db, predictive_engine, selected_plo)
                     
                     # Create figure
                     fig = go.Figure()
@@ -67,6 +81,18 @@ def show_predictive_analytics():
                     # Predictions
                     pred_periods = [p['periode'] for p in prediction['predictions']]
                     pred_scores = [p['predicted_score'] for p in prediction['predictions']]
+                    pred_lower = [p['lower_bound'] for p in prediction['predictions']]
+                    pred_upper = [p['upper_bound'] for p in prediction['predictions']]
+                    
+                    # Prediction interval sebagai pita
+                    fig.add_trace(go.Scatter(
+                        x=pred_periods + pred_periods[::-1],
+                        y=pred_upper + pred_lower[::-1],
+                        fill='toself',
+                        fillcolor='rgba(255, 0, 0, 0.15)',
+                        line=dict(color='rgba(255, 0, 0, 0)'),
+                        name=f"Interval Prediksi {prediction['interval_level']:.0%}"
+                    ))
                     
                     fig.add_trace(go.Scatter(
                         x=pred_periods,
@@ -95,44 +121,47 @@ def show_predictive_analytics():
         
         if st.button("Hitung Risk Assessment", type="primary"):
             with st.spinner("Menganalisis risiko PLO..."):
-                risk_data = predictive_engine.calculate_plo_risk_assessment()
+                st.session_state['risk_data'] = predictive_engine.calculate_plo_risk_assessment()
+        
+        if 'risk_data' in st.session_state:
+            risk_data = st.session_state['risk_data']
+            
+            if risk_data.empty:
+                st.warning("Data tidak cukup untuk analisis risiko")
+            else:
+                # Display risk summary
+                col1, col2, col3 = st.columns(3)
+                high_risk = len(risk_data[risk_data['tingkat_risiko'] == 'Tinggi'])
+                medium_risk = len(risk_data[risk_data['tingkat_risiko'] == 'Sedang'])
+                low_risk = len(risk_data[risk_data['tingkat_risiko'] == 'Rendah'])
                 
-                if risk_data.empty:
-                    st.warning("Data tidak cukup untuk analisis risiko")
-                else:
-                    # Display risk summary
-                    col1, col2, col3 = st.columns(3)
-                    high_risk = len(risk_data[risk_data['tingkat_risiko'] == 'Tinggi'])
-                    medium_risk = len(risk_data[risk_data['tingkat_risiko'] == 'Sedang'])
-                    low_risk = len(risk_data[risk_data['tingkat_risiko'] == 'Rendah'])
-                    
-                    with col1:
-                        st.metric("PLO Berisiko Tinggi", high_risk)
-                    with col2:
-                        st.metric("PLO Berisiko Sedang", medium_risk)
-                    with col3:
-                        st.metric("PLO Berisiko Rendah", low_risk)
-                    
-                    # Risk visualization
-                    st.subheader("📊 Distribusi Tingkat Risiko")
-                    fig = px.pie(risk_data, names='tingkat_risiko', 
-                                title='Distribusi Tingkat Risiko PLO')
-                    st.plotly_chart(fig, use_container_width=True)
-                    
-                    # Detailed risk table
-                    st.subheader("📋 Detail Risk Assessment")
-                    
-                    # Style the dataframe based on risk level
-                    def color_risk_level(val):
-                        if val == 'Tinggi':
-                            return 'background-color: #ffcccc'
-                        elif val == 'Sedang':
-                            return 'background-color: #fff4cc'
-                        else:
-                            return 'background-color: #ccffcc'
-                    
-                    styled_risk_data = risk_data.style.applymap(color_risk_level, subset=['tingkat_risiko'])
-                    st.dataframe(styled_risk_data, use_container_width=True)
+                with col1:
+                    st.metric("PLO Berisiko Tinggi", high_risk)
+                with col2:
+                    st.metric("PLO Berisiko Sedang", medium_risk)
+                with col3:
+                    st.metric("PLO Berisiko Rendah", low_risk)
+                
+                # Risk visualization
+                st.subheader("📊 Distribusi Tingkat Risiko")
+                fig = px.pie(risk_data, names='tingkat_risiko', 
+                            title='Distribusi Tingkat Risiko PLO')
+                st.plotly_chart(fig, use_container_width=True)
+                
+                # Detailed risk table
+                st.subheader("📋 Detail Risk Assessment")
+                
+                # Style the dataframe based on risk level
+                def color_risk_level(val):
+                    if val == 'Tinggi':
+                        return 'background-color: #ffcccc'
+                    elif val == 'Sedang':
+                        return 'background-color: #fff4cc'
+                    else:
+                        return 'background-color: #ccffcc'
+                
+                paginated_dataframe(risk_data, key="risk_table", page_size=25,
+                                    style_func=color_risk_level, style_subset=['tingkat_risiko'])
     
     with tab3:
         st.header("Kesiapan Kelulusan")
@@ -165,21 +194,29 @@ def show_predictive_analytics():
     with tab4:
         st.header("Advanced Analytics")
         
+        k_option = st.selectbox("Jumlah Cluster:", ["Otomatis (silhouette)", 2, 3, 4, 5, 6], index=0)
+        n_clusters = None if isinstance(k_option, str) else k_option
+        
         if st.button("Jalankan Cluster Analysis", type="primary"):
             with st.spinner("Melakukan analisis clustering..."):
-                cluster_results = advanced_engine.cluster_program_performance()
+                st.session_state['cluster_results'] = advanced_engine.cluster_program_performance(n_clusters)
+        
+        if 'cluster_results' in st.session_state:
+            cluster_results = st.session_state['cluster_results']
+            
+            if cluster_results is not None:
+                st.subheader("📊 Hasil Clustering Mata Kuliah")
                 
-                if cluster_results is not None:
-                    st.subheader("📊 Hasil Clustering Mata Kuliah")
-                    
-                    # Visualize clusters
-                    fig = px.scatter(cluster_results, x='avg_score', y='score_std',
-                                    color='cluster_label', size='avg_students',
-                                    hover_data=['kode_mk'],
-                                    title='Cluster Analysis Mata Kuliah')
-                    st.plotly_chart(fig, use_container_width=True)
-                    
-                    st.subheader("📋 Detail Cluster")
-                    st.dataframe(cluster_results, use_container_width=True)
-                else:
-                    st.warning("Data tidak cukup untuk clustering analysis")
\ No newline at end of file
+                # Visualize clusters; katalog besar diringkas ke grid agregat
+                scatter_data = reduce_scatter(cluster_results, 'avg_score', 'score_std',
+                                              color='cluster_label', size='avg_students')
+                fig = px.scatter(scatter_data, x='avg_score', y='score_std',
+                                color='cluster_label', size='avg_students',
+                                hover_data=['kode_mk'] if 'kode_mk' in scatter_data else ['jumlah_titik'],
+                                title='Cluster Analysis Mata Kuliah')
+                st.plotly_chart(fig, use_container_width=True)
+                
+                st.subheader("📋 Detail Cluster")
+                paginated_dataframe(cluster_results, key="cluster_table", page_size=50)
+            else:
+                st.warning("Data tidak cukup untuk clustering analysis")
\ No newline at end of file
@@ -0,0 +1,138 @@
+import os
+import json
+import time
+import zipfile
+import argparse
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from utils.reporting import ReportGenerator, period_label
+from utils.config import REPORT_BATCH_WORKERS, REPORT_TYPES, REPORT_FORMATS, REPORT_OUTPUT_DIR
+
+EXTENSIONS = {'Excel': 'xlsx', 'PDF': 'pdf'}
+
+def report_matrix(database, jenis_laporan=None, formats=None, periods=None):
+    """Semua kombinasi jenis x format x periode; periode default = semua periode assessment"""
+    periods = database.get_assessment_periods() if periods is None else periods
+    return [
+        {'jenis_laporan': jenis, 'format_laporan': format_laporan, 'tahun': tahun, 'semester': semester}
+        for tahun, semester in periods
+        for jenis in (jenis_laporan or REPORT_TYPES)
+        for format_laporan in (formats or REPORT_FORMATS)
+    ]
+
+def report_filename(spec):
+    slug = spec['jenis_laporan'].lower().replace(' ', '_')
+    period = "_".join(str(spec[key]) for key in ('tahun', 'semester') if spec.get(key)) or 'semua'
+    return f"{period}/{slug}_{period}.{EXTENSIONS[spec['format_laporan']]}"
+
+# ReportGenerator per proses worker, dengan data bersama yang sudah dimuat
+_generator = None
+
+def _preloaded_generator(db_path):
+    from database.database import OBEDatabase
+    generator = ReportGenerator(OBEDatabase(db_path))
+    generator.preload()
+    return generator
+
+def _init_worker(db_path):
+    global _generator
+    _generator = _preloaded_generator(db_path)
+
+def _render(renderer, tahun, semester, generator=None):
+    started = time.perf_counter()
+    try:
+        report, error = getattr(generator or _generator, renderer)(tahun, semester).getvalue(), None
+    except Exception as e:
+        report, error = None, str(e)
+    return report, time.perf_counter() - started, error, os.getpid()
+
+def generate_bundle(database, specs, output, workers=REPORT_BATCH_WORKERS):
+    """Render laporan secara paralel lalu tulis ZIP berisi laporan dan manifest.json.
+
+    Setiap proses worker (start method spawn, tanpa mewarisi koneksi atau
+    thread proses pemanggil) membuka database sendiri dan memuat data bersama
+    sekali (ReportGenerator.preload). Spesifikasi yang menghasilkan laporan
+    identik (method pembuat dan periode sama) hanya dirender sekali.
+    ``output`` boleh berupa path atau file object. Mengembalikan manifest.
+    """
+    started = time.perf_counter()
+    workers = min(workers, os.cpu_count() or 1)
+    groups = {}
+    for spec in specs:
+        key = (ReportGenerator.renderer(spec['jenis_laporan'], spec['format_laporan']),
+               spec.get('tahun'), spec.get('semester'))
+        groups.setdefault(key, []).append(spec)
+
+    entries = []
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as bundle:
+        def collect(key, result):
+            report, seconds, error, pid = result
+            for i, spec in enumerate(groups[key]):
+                name = report_filename(spec)
+                if report is not None:
+                    bundle.writestr(name, report)
+                entries.append(dict(
+                    spec, periode=period_label(spec.get('tahun'), spec.get('semester')),
+                    file=name if report is not None else None,
+                    status='sukses' if error is None else 'gagal', pesan=error,
+                    durasi_detik=round(seconds, 3) if i == 0 else 0.0,
+                    dipakai_ulang=i > 0, ukuran_byte=len(report) if report is not None else 0,
+                    worker=pid
+                ))
+
+        if workers <= 1 or len(groups) <= 1:
+            generator = _preloaded_generator(database.db_path)
+            for key in groups:
+                collect(key, _render(*key, generator=generator))
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(groups)), initializer=_init_worker,
+                                     initargs=(database.db_path,),
+                                     mp_context=multiprocessing.get_context('spawn')) as pool:
+                futures = {pool.submit(_render, *key): key for key in groups}
+                for future in as_completed(futures):
+                    collect(futures[future], future.result())
+
+        entries.sort(key=lambda entry: report_filename(entry))
+        manifest = {
+            'dibuat': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'data_version': database.get_data_version(),
+            'jumlah_laporan': len(specs),
+            'jumlah_dirender': len(groups),
+            'jumlah_gagal': sum(entry['status'] == 'gagal' for entry in entries),
+            'workers': max(1, min(workers, len(groups))),
+            'durasi_total_detik': round(time.perf_counter() - started, 3),
+            'laporan': entries
+        }
+        bundle.writestr('manifest.json', json.dumps(manifest, indent=2, default=str))
+    return manifest
+
+def main():
+    from database.database import OBEDatabase
+
+    parser = argparse.ArgumentParser(description="Pembuatan laporan massal Sistem OBE (ZIP + manifest)")
+    parser.add_argument('--db', default="database/obe_database.db")
+    parser.add_argument('--output', default=None, help="Path file ZIP (default: folder laporan)")
+    parser.add_argument('--jenis', default=None, help="Jenis laporan dipisah koma (default: semua)")
+    parser.add_argument('--formats', default=None, help="Format dipisah koma: Excel,PDF (default: semua)")
+    parser.add_argument('--tahun', default=None, help="Tahun dipisah koma (default: semua periode assessment)")
+    parser.add_argument('--workers', type=int, default=REPORT_BATCH_WORKERS)
+    args = parser.parse_args()
+
+    database = OBEDatabase(args.db)
+    periods = database.get_assessment_periods()
+    if args.tahun:
+        years = {int(tahun) for tahun in args.tahun.split(',')}
+        periods = [period for period in periods if period[0] in years]
+    specs = report_matrix(database, args.jenis.split(',') if args.jenis else None,
+                          args.formats.split(',') if args.formats else None, periods)
+
+    output = args.output or os.path.join(
+        REPORT_OUTPUT_DIR, f"bundle_laporan_{datetime.now().strftime('%Y%m%d%H%M%S')}.zip")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    manifest = generate_bundle(database, specs, output, workers=args.workers)
+    print(f"{manifest['jumlah_laporan']} laporan ({manifest['jumlah_dirender']} dirender, "
+          f"{manifest['jumlah_gagal']} gagal) dalam {manifest['durasi_total_detik']} detik -> {output}")
+
+if __name__ == "__main__":
+    main()
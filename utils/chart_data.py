@@ -0,0 +1,114 @@
+import threading
+from collections import OrderedDict
+import pandas as pd
+import numpy as np
+from utils.config import CHART_MAX_POINTS, CHART_SCATTER_BINS, CHART_CACHE_SIZE
+
+def lttb_indices(x, y, max_points):
+    """Indeks titik hasil downsampling Largest-Triangle-Three-Buckets.
+
+    Titik pertama dan terakhir selalu dipertahankan; dari setiap bucket
+    dipilih titik yang membentuk segitiga terbesar dengan titik terpilih
+    sebelumnya dan rata-rata bucket berikutnya, sehingga bentuk garis
+    (puncak dan lembah) tetap terjaga.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (max_points - 2)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    anchor = 0
+
+    for i in range(max_points - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_start = end
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        areas = np.abs((x[anchor] - avg_x) * (y[start:end] - y[anchor]) -
+                       (x[anchor] - x[start:end]) * (avg_y - y[anchor]))
+        anchor = start + int(np.argmax(areas))
+        selected[i + 1] = anchor
+
+    return selected
+
+def downsample_series(df, x, y, max_points=CHART_MAX_POINTS, group=None):
+    """Downsampling LTTB per seri (opsional per kolom grup) ke anggaran titik"""
+    if df.empty:
+        return df
+    if group is None:
+        df = df.sort_values(x)
+        return df.iloc[lttb_indices(df[x].values, df[y].values, max_points)].reset_index(drop=True)
+
+    n_groups = df[group].nunique()
+    budget = max(3, max_points // max(n_groups, 1))
+    parts = [downsample_series(part, x, y, budget) for _, part in df.groupby(group, sort=False)]
+    return pd.concat(parts, ignore_index=True)
+
+def binned_scatter(df, x, y, bins=CHART_SCATTER_BINS, color=None, size=None):
+    """Agregasi scatter ke grid bins x bins; satu titik per sel (dan per warna).
+
+    Setiap titik hasil membawa jumlah titik asli (``jumlah_titik``) dan
+    rata-rata kolom ukuran, sehingga kepadatan tetap terlihat.
+    """
+    if df.empty:
+        return df
+
+    x_edges = np.linspace(df[x].min(), df[x].max(), bins + 1)
+    y_edges = np.linspace(df[y].min(), df[y].max(), bins + 1)
+    binned = df.assign(
+        _bin_x=np.clip(np.searchsorted(x_edges, df[x], side='right') - 1, 0, bins - 1),
+        _bin_y=np.clip(np.searchsorted(y_edges, df[y], side='right') - 1, 0, bins - 1)
+    )
+
+    keys = ['_bin_x', '_bin_y'] + ([color] if color else [])
+    aggregations = {x: (x, 'mean'), y: (y, 'mean'), 'jumlah_titik': (x, 'size')}
+    if size:
+        aggregations[size] = (size, 'mean')
+    result = binned.groupby(keys, observed=True).agg(**aggregations).reset_index()
+    return result.drop(columns=['_bin_x', '_bin_y'])
+
+def reduce_scatter(df, x, y, max_points=CHART_MAX_POINTS, color=None, size=None):
+    """Scatter asli bila kecil, agregat grid bila melebihi anggaran titik"""
+    if len(df) <= max_points:
+        return df.assign(jumlah_titik=1)
+    n_colors = df[color].nunique() if color else 1
+    bins = max(2, int(np.sqrt(max_points / n_colors)))
+    return binned_scatter(df, x, y, bins=bins, color=color, size=size)
+
+_chart_cache = OrderedDict()
+_chart_lock = threading.Lock()
+
+def cached_chart_data(database, chart_name, builder, **params):
+    """Data grafik yang sudah disiapkan, di-cache per versi data dan parameter"""
+    key = (database.db_path, database.get_data_version(), chart_name,
+           tuple(sorted(params.items())))
+    with _chart_lock:
+        if key in _chart_cache:
+            _chart_cache.move_to_end(key)
+            return _chart_cache[key]
+
+    data = builder(**params)
+
+    with _chart_lock:
+        _chart_cache[key] = data
+        while len(_chart_cache) > CHART_CACHE_SIZE:
+            _chart_cache.popitem(last=False)
+    return data
+
+def plo_trend_chart_data(database, predictive_engine, kode_plo, max_points=CHART_MAX_POINTS):
+    """Deret waktu historis satu PLO yang sudah di-downsample untuk grafik trend"""
+    def build(kode_plo, max_points):
+        timeseries = predictive_engine.prepare_plo_timeseries_data()
+        if timeseries.empty:
+            return timeseries
+        series = timeseries.loc[timeseries['kode_plo'] == kode_plo, ['periode', 'nilai_rata_rata']]
+        return downsample_series(series, 'periode', 'nilai_rata_rata', max_points)
+
+    return cached_chart_data(database, 'plo_trend', build, kode_plo=kode_plo, max_points=max_points)
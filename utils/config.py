@@ -0,0 +1,102 @@
+# Konfigurasi parameter analitik sistem OBE
+
+# Bootstrap prediction interval untuk prediksi trend PLO
+BOOTSTRAP_REPLICATES = 2000
+BOOTSTRAP_SEED = 42
+BOOTSTRAP_CONFIDENCE_LEVEL = 0.95
+# Jumlah replikasi yang diproses per batch matriks (membatasi pemakaian memori)
+BOOTSTRAP_CHUNK_SIZE = 500
+
+# Clustering performa mata kuliah
+CLUSTER_K_RANGE = (2, 6)
+CLUSTER_SILHOUETTE_SAMPLE = 5000
+CLUSTER_BATCH_SIZE = 1024
+CLUSTER_RANDOM_STATE = 42
+
+# Faktor bobot tingkat penguasaan (Introduced, Reinforced, Mastered) untuk
+# pencapaian PLO tertimbang pada simulasi kurikulum
+TINGKAT_PENGUASAAN_FAKTOR = {'I': 1.0, 'R': 2.0, 'M': 3.0}
+
+# Automated reporting
+REPORT_OUTPUT_DIR = 'reports'
+REPORT_OUTBOX_DIR = 'reports/outbox'
+REPORT_SENDER = 'obe-system@universitas.edu'
+SCHEDULER_POLL_INTERVAL = 60
+
+# Chart data
+CHART_MAX_POINTS = 500
+CHART_SCATTER_BINS = 40
+CHART_CACHE_SIZE = 128
+
+# Local JSON analytics API
+API_HOST = '127.0.0.1'
+API_PORT = 8502
+API_CACHE_SIZE = 256
+API_WORKERS = 4
+API_GZIP_MIN_SIZE = 1024
+
+# Penilaian akreditasi LAM INFOKOM (skala nilai 0-400)
+LAM_SKOR_MAKSIMUM = 4
+LAM_PERINGKAT = [
+    (361, 'Unggul'),
+    (301, 'Baik Sekali'),
+    (200, 'Baik'),
+    (0, 'Tidak Memenuhi Syarat Peringkat')
+]
+
+# Validasi data masuk
+NILAI_RANGE = (0, 100)
+TAHUN_RANGE = (2000, 2100)
+SEMESTER_VALID = (1, 2)
+TINGKAT_PENGUASAAN_VALID = ('I', 'R', 'M')
+
+# Deteksi anomali assessment (EWMA online)
+ANOMALY_EWMA_ALPHA = 0.2
+ANOMALY_Z_THRESHOLD = 3.0
+ANOMALY_MIN_OBSERVASI = 4
+ANOMALY_MIN_STD = {'nilai_rata_rata': 2.0, 'jumlah_mahasiswa': 2.0}
+
+# Snapshot kolumnar (Arrow IPC); None = folder "snapshots" di samping file database
+SNAPSHOT_DIR = None
+
+# Thread pool untuk pembacaan database secara bersamaan
+DB_ASYNC_WORKERS = 4
+
+# Antrean tulis di belakang layar (group commit) untuk add_assessment/add_plo_clo_mapping
+WRITE_QUEUE_ENABLED = False
+WRITE_QUEUE_MAX = 1000
+WRITE_QUEUE_PUT_TIMEOUT = 5.0
+WRITE_BATCH_SIZE = 500
+WRITE_BATCH_DELAY = 0.002
+
+# Load test sesi bersamaan (python -m utils.load_test)
+LOAD_TEST_SESSIONS = 8
+LOAD_TEST_ITERATIONS = 10
+LOAD_TEST_THINK_TIME = 0.0
+
+# Pembuatan laporan massal (python -m utils.bulk_reporting)
+REPORT_BATCH_WORKERS = 4
+REPORT_TYPES = ['Laporan Lengkap OBE', 'Laporan Akreditasi LAM INFOKOM', 'Laporan Pencapaian PLO',
+                'Laporan Risk Assessment']
+REPORT_FORMATS = ['Excel', 'PDF']
+
+# Arsip assessment tahun tertutup (Parquet per tahun/semester); None = folder "archive" di samping database
+ARCHIVE_DIR = None
+ARCHIVE_HOT_YEARS = 2
+ARCHIVE_COMPRESSION = 'zstd'
+
+# Profiling per rerun halaman (aktif lewat env var atau toggle admin di sidebar)
+PROFILE_ENV_VAR = 'OBE_PROFILE'
+PROFILE_DIR = 'profiles'
+PROFILE_KEEP = 200
+PROFILE_TOP_FUNCTIONS = 30
+
+# Maintenance database (python -m database.maintenance); interval dalam jam
+MAINTENANCE_BACKUP_DIR = None
+MAINTENANCE_BACKUP_KEEP = 7
+MAINTENANCE_BACKUP_PAGES = 256
+MAINTENANCE_BACKUP_RESTARTS = 3
+MAINTENANCE_VACUUM_PAGES = 256
+MAINTENANCE_STEP_PAUSE = 0.005
+MAINTENANCE_ANALYSIS_LIMIT = 1000
+MAINTENANCE_INTERVALS = {'backup': 24, 'integrity': 168, 'optimize': 24, 'vacuum': 168}
@@ -0,0 +1,74 @@
+import threading
+from types import MappingProxyType
+from datetime import datetime
+from models.predictive_models import PredictiveAnalytics
+from database.async_access import load_concurrently
+
+class DashboardSnapshot:
+    """Data dashboard yang sudah dihitung untuk satu versi data (read-only).
+
+    Satu snapshot dipakai bersama oleh semua sesi Streamlit dalam proses
+    yang sama, sehingga rerun dashboard tidak lagi membaca ulang SQLite
+    maupun menghitung ulang agregat selama versi data tidak berubah.
+    """
+
+    def __init__(self, data_version, metrics, achievement_by_category, risk_distribution,
+                 recent_assessments, recent_anomalies):
+        self.data_version = data_version
+        self.metrics = MappingProxyType(dict(metrics))
+        self.achievement_by_category = achievement_by_category
+        self.risk_distribution = risk_distribution
+        self.recent_assessments = recent_assessments
+        self.recent_anomalies = recent_anomalies
+        self.created_at = datetime.now()
+
+    @classmethod
+    def build(cls, database, data_version):
+        # Query independen dijalankan bersamaan di thread pool database
+        data = load_concurrently(
+            database,
+            summary=database.get_assessment_summary,
+            risk=PredictiveAnalytics(database).calculate_plo_risk_assessment,
+            plo=database.get_all_plo,
+            mk=database.get_all_mata_kuliah,
+            anomali_baru=(database.count_anomalies, 'baru'),
+            achievement_by_category=database.get_plo_achievement_by_category,
+            recent_assessments=(database.get_recent_assessments, 10),
+            recent_anomalies=(database.get_recent_anomalies, 10)
+        )
+        average = data['summary']['rata_rata']
+
+        risk_data = data['risk']
+        if risk_data.empty:
+            risk_distribution = {}
+        else:
+            risk_distribution = risk_data['tingkat_risiko'].value_counts().to_dict()
+
+        metrics = {
+            'total_plo': len(data['plo']),
+            'total_mk': len(data['mk']),
+            'jumlah_assessment': data['summary']['jumlah'],
+            'avg_plo_achievement': round(average, 2) if average is not None else 0,
+            'anomali_baru': data['anomali_baru']
+        }
+        return cls(data_version, metrics, data['achievement_by_category'],
+                   MappingProxyType(risk_distribution), data['recent_assessments'],
+                   data['recent_anomalies'])
+
+_snapshots = {}
+_snapshot_lock = threading.Lock()
+
+def get_dashboard_snapshot(database):
+    """Snapshot dashboard per proses; dibangun ulang hanya saat versi data berubah"""
+    version = database.get_data_version()
+    snapshot = _snapshots.get(database.db_path)
+    if snapshot is not None and snapshot.data_version == version:
+        return snapshot
+
+    # Hanya satu sesi yang membangun ulang, sesi lain menunggu hasilnya
+    with _snapshot_lock:
+        snapshot = _snapshots.get(database.db_path)
+        if snapshot is None or snapshot.data_version != version:
+            snapshot = DashboardSnapshot.build(database, version)
+            _snapshots[database.db_path] = snapshot
+        return snapshot
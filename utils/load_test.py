@@ -0,0 +1,245 @@
+import sys
+import time
+import json
+import random
+import sqlite3
+import argparse
+import threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from utils.config import LOAD_TEST_SESSIONS, LOAD_TEST_ITERATIONS, LOAD_TEST_THINK_TIME
+
+# Modul yang lock tingkat modulnya (cache per proses) diinstrumentasi
+LOCK_MODULES = ['utils.dashboard_snapshot', 'utils.chart_data', 'models.curriculum_graph',
+                'database.columnar_snapshot', 'database.async_access']
+
+_current = threading.local()
+
+class InstrumentedLock:
+    """Pembungkus threading.Lock yang mencatat berapa kali dan berapa lama sesi harus menunggu"""
+
+    def __init__(self, name, lock, waits):
+        self.name = name
+        self._lock = lock
+        self._waits = waits
+        self._waits_lock = threading.Lock()
+
+    def acquire(self, blocking=True, timeout=-1):
+        if self._lock.acquire(blocking=False):
+            return True
+        if not blocking:
+            return False
+        started = time.perf_counter()
+        acquired = self._lock.acquire(timeout=timeout)
+        waited = time.perf_counter() - started
+        operation = getattr(_current, 'operation', None)
+        with self._waits_lock:
+            count, total = self._waits.get((operation, self.name), (0, 0.0))
+            self._waits[(operation, self.name)] = (count + 1, total + waited)
+        return acquired
+
+    def release(self):
+        self._lock.release()
+
+    def locked(self):
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+def instrument_locks(waits):
+    """Ganti lock tingkat modul dengan InstrumentedLock (hanya untuk proses load test)"""
+    lock_type = type(threading.Lock())
+    for module_name in LOCK_MODULES:
+        module = __import__(module_name, fromlist=['_'])
+        for attribute, value in list(vars(module).items()):
+            if isinstance(value, lock_type):
+                setattr(module, attribute, InstrumentedLock(f"{module_name}.{attribute}", value, waits))
+
+class SessionContext:
+    """Objek yang dipakai bersama oleh sesi seperti st.cache_resource di app.py"""
+
+    def __init__(self, database):
+        from models.predictive_models import PredictiveAnalytics
+        from utils.reporting import ReportGenerator
+        self.db = database
+        self.predictive = PredictiveAnalytics(database)
+        self.reports = ReportGenerator(database)
+        self.clo = database.get_plo_clo_matrix()[['kode_mk', 'kode_clo']].drop_duplicates().values.tolist()
+
+def _dashboard(ctx):
+    from utils.dashboard_snapshot import get_dashboard_snapshot
+    return get_dashboard_snapshot(ctx.db)
+
+def _dashboard_cold(ctx):
+    from utils.dashboard_snapshot import DashboardSnapshot
+    return DashboardSnapshot.build(ctx.db, ctx.db.get_data_version())
+
+def _write_assessment(ctx):
+    if not ctx.clo:
+        return False
+    kode_mk, kode_clo = random.choice(ctx.clo)
+    return ctx.db.add_assessment(kode_mk, kode_clo, 2025, random.choice([1, 2]), 'Load Test',
+                                 round(random.uniform(60, 95), 2), random.randint(20, 40))
+
+# nama operasi -> fungsi(ctx); jalur data yang sama dengan halaman Streamlit
+OPERATIONS = {
+    'dashboard': _dashboard,
+    'dashboard_dingin': _dashboard_cold,
+    'risiko': lambda ctx: ctx.predictive.calculate_plo_risk_assessment(),
+    'prediksi': lambda ctx: ctx.predictive.predict_all_plo_trends(),
+    'excel': lambda ctx: ctx.reports.generate_excel_report(),
+    'pdf': lambda ctx: ctx.reports.generate_pdf_report(),
+    'tulis_assessment': _write_assessment
+}
+
+def run_session(ctx, operations, iterations, think_time, seed):
+    """Satu sesi pengguna: menjalankan operasi secara acak dan mencatat latensinya"""
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(iterations):
+        operation = rng.choice(operations)
+        _current.operation = operation
+        started = time.perf_counter()
+        error = None
+        try:
+            ok = OPERATIONS[operation](ctx) is not False
+        except sqlite3.OperationalError as e:
+            ok, error = False, str(e)
+        except Exception as e:
+            ok, error = False, f"{type(e).__name__}: {e}"
+        samples.append({
+            'operasi': operation,
+            'latensi': time.perf_counter() - started,
+            'sukses': ok,
+            'db_locked': bool(error and 'locked' in error),
+            'error': error
+        })
+        _current.operation = None
+        if think_time:
+            time.sleep(rng.uniform(0, 2 * think_time))
+    return samples
+
+def _run_sessions(db_path, sessions, operations, iterations, think_time, seed, write_queue):
+    """Menjalankan beberapa sesi sebagai thread dalam satu proses (seperti satu server Streamlit)"""
+    from database.database import OBEDatabase
+    waits = {}
+    instrument_locks(waits)
+    database = OBEDatabase(db_path)
+    if write_queue:
+        database.enable_write_queue()
+    ctx = SessionContext(database)
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        futures = [pool.submit(run_session, ctx, operations, iterations, think_time, seed + i)
+                   for i in range(sessions)]
+        samples = [sample for future in futures for sample in future.result()]
+    database.flush_writes()
+    return samples, waits
+
+def run_load_test(db_path, sessions=LOAD_TEST_SESSIONS, operations=None, iterations=LOAD_TEST_ITERATIONS,
+                  think_time=LOAD_TEST_THINK_TIME, processes=1, seed=0, write_queue=False):
+    """Menjalankan load test; sesi dibagi rata ke sejumlah proses (masing-masing dengan thread per sesi).
+
+    Mengembalikan (ringkasan per operasi, detail lock wait, durasi total).
+    """
+    operations = operations or ['dashboard', 'risiko', 'prediksi', 'excel', 'pdf']
+    unknown = set(operations) - set(OPERATIONS)
+    if unknown:
+        raise ValueError(f"Operasi tidak dikenal: {', '.join(sorted(unknown))}")
+
+    per_process = [sessions // processes + (1 if i < sessions % processes else 0) for i in range(processes)]
+    per_process = [n for n in per_process if n > 0]
+    started = time.perf_counter()
+    if len(per_process) == 1:
+        results = [_run_sessions(db_path, per_process[0], operations, iterations, think_time, seed, write_queue)]
+    else:
+        with ProcessPoolExecutor(max_workers=len(per_process)) as pool:
+            futures = [pool.submit(_run_sessions, db_path, n, operations, iterations, think_time,
+                                   seed + 1000 * i, write_queue) for i, n in enumerate(per_process)]
+            results = [future.result() for future in futures]
+    duration = time.perf_counter() - started
+
+    samples = pd.DataFrame([sample for result, _ in results for sample in result])
+    waits = {}
+    for _, process_waits in results:
+        for key, (count, total) in process_waits.items():
+            previous = waits.get(key, (0, 0.0))
+            waits[key] = (previous[0] + count, previous[1] + total)
+    return summarize(samples, waits, duration), lock_wait_table(waits), duration
+
+def lock_wait_table(waits):
+    # Lock yang diambil thread pool database atau thread penulis tidak terikat ke satu sesi
+    rows = [{'operasi': operation or 'thread latar', 'lock': lock, 'jumlah_tunggu': count, 'total_tunggu_ms': total * 1000}
+            for (operation, lock), (count, total) in waits.items()]
+    if not rows:
+        return pd.DataFrame(columns=['operasi', 'lock', 'jumlah_tunggu', 'total_tunggu_ms'])
+    return pd.DataFrame(rows).sort_values('total_tunggu_ms', ascending=False).round(2).reset_index(drop=True)
+
+def summarize(samples, waits, duration):
+    """Persentil latensi (ms), throughput dan jumlah lock wait per operasi"""
+    if samples.empty:
+        return pd.DataFrame()
+    latency = samples.groupby('operasi')['latensi']
+    summary = pd.DataFrame({
+        'jumlah': latency.size(),
+        'gagal': (~samples['sukses']).groupby(samples['operasi']).sum(),
+        'db_locked': samples.groupby('operasi')['db_locked'].sum(),
+        'p50_ms': latency.quantile(0.50) * 1000,
+        'p95_ms': latency.quantile(0.95) * 1000,
+        'p99_ms': latency.quantile(0.99) * 1000,
+        'max_ms': latency.max() * 1000,
+        'throughput_per_s': latency.size() / duration
+    })
+    lock_waits = pd.Series({operation: count for (operation, _), (count, _) in waits.items()}, dtype=float)
+    lock_waits = lock_waits.groupby(level=0).sum() if not lock_waits.empty else lock_waits
+    summary['lock_wait'] = lock_waits.reindex(summary.index).fillna(0).astype(int)
+    total = samples['latensi']
+    summary.loc['TOTAL'] = [
+        len(samples), int((~samples['sukses']).sum()), int(samples['db_locked'].sum()),
+        total.quantile(0.50) * 1000, total.quantile(0.95) * 1000, total.quantile(0.99) * 1000,
+        total.max() * 1000, len(samples) / duration, int(summary['lock_wait'].sum())
+    ]
+    counts = ['jumlah', 'gagal', 'db_locked', 'lock_wait']
+    summary[counts] = summary[counts].astype(int)
+    return summary.round(2)
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test sesi bersamaan untuk Sistem OBE")
+    parser.add_argument('--db', default="database/obe_database.db",
+                        help="Database yang diuji (gunakan salinan jika menyertakan tulis_assessment)")
+    parser.add_argument('--sessions', type=int, default=LOAD_TEST_SESSIONS, help="Jumlah sesi bersamaan")
+    parser.add_argument('--iterations', type=int, default=LOAD_TEST_ITERATIONS, help="Operasi per sesi")
+    parser.add_argument('--processes', type=int, default=1, help="Jumlah proses server (sesi dibagi rata)")
+    parser.add_argument('--think-time', type=float, default=LOAD_TEST_THINK_TIME,
+                        help="Rata-rata jeda antar operasi per sesi (detik)")
+    parser.add_argument('--operations', default='dashboard,risiko,prediksi,excel,pdf',
+                        help=f"Daftar operasi dipisah koma: {', '.join(OPERATIONS)}")
+    parser.add_argument('--write-queue', action='store_true', help="Aktifkan antrean tulis (group commit)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="Cetak hasil sebagai JSON")
+    args = parser.parse_args()
+
+    summary, waits, duration = run_load_test(
+        args.db, sessions=args.sessions, operations=args.operations.split(','),
+        iterations=args.iterations, think_time=args.think_time, processes=args.processes,
+        seed=args.seed, write_queue=args.write_queue
+    )
+    if args.json:
+        json.dump({'durasi_s': round(duration, 3),
+                   'ringkasan': summary.reset_index().to_dict('records'),
+                   'lock_wait': waits.to_dict('records')}, sys.stdout, indent=2, default=float)
+        print()
+        return
+    print(f"{args.sessions} sesi x {args.iterations} operasi dalam {duration:.2f} detik "
+          f"({args.processes} proses)\n")
+    print(summary.to_string())
+    if not waits.empty:
+        print("\nLock wait per operasi:")
+        print(waits.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+import os
+import json
+import time
+import pstats
+import cProfile
+import argparse
+import threading
+import functools
+from datetime import datetime
+import pandas as pd
+import streamlit as st
+from utils.config import PROFILE_ENV_VAR, PROFILE_DIR, PROFILE_KEEP, PROFILE_TOP_FUNCTIONS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Profiling aktif untuk seluruh proses bila env var diset (mis. OBE_PROFILE=1)
+ENABLED = os.environ.get(PROFILE_ENV_VAR, '').lower() in ('1', 'true', 'yes', 'on')
+STATE_KEY = '_profiling'
+
+# span -> penanda nama paket pada path file atau nama fungsi builtin
+SPANS = [
+    ('sqlite', ('sqlite3',)),
+    ('pandas', ('pandas',)),
+    ('numpy', ('numpy',)),
+    ('sklearn', ('sklearn', 'scipy', 'joblib')),
+    ('plotly', ('plotly',)),
+    ('reportlab', ('reportlab',)),
+    ('excel', ('openpyxl', 'xlsxwriter')),
+    ('pyarrow', ('pyarrow',)),
+    ('streamlit', ('streamlit',)),
+]
+# Builtin yang berarti thread sesi menunggu (lock, thread pool database, sleep)
+WAIT_FUNCTIONS = ("'acquire' of '_thread", 'time.sleep', "'wait' of")
+
+# cProfile hanya bisa aktif satu per thread; halaman bersarang tidak diprofil ulang
+_active = threading.local()
+
+def profiling_enabled():
+    return ENABLED or bool(st.session_state.get(STATE_KEY, False))
+
+def _span(func):
+    """Subsistem satu fungsi pstats; None untuk builtin dan pustaka standar yang tidak dikenali"""
+    filename, _, name = func
+    builtin = filename == '~'
+    if builtin and any(marker in name for marker in WAIT_FUNCTIONS):
+        return 'tunggu'
+    if filename.startswith('<frozen importlib'):
+        return 'import'
+    for span, packages in SPANS:
+        for package in packages:
+            if (package in name) if builtin else (f"{os.sep}{package}{os.sep}" in filename):
+                return span
+    if filename.startswith(ROOT) and f"{os.sep}site-packages{os.sep}" not in filename:
+        return 'aplikasi'
+    return None
+
+def _owner(func, stats, memo, seen=frozenset()):
+    """Subsistem fungsi; yang tidak dikenali mengikuti pemanggil dengan waktu kumulatif terbesar"""
+    span = _span(func)
+    if span:
+        return span
+    if func not in memo:
+        callers = stats.stats[func][4] if func in stats.stats else {}
+        memo[func] = 'lainnya'
+        if callers and func not in seen:
+            caller = max(callers, key=lambda key: callers[key][3])
+            memo[func] = _owner(caller, stats, memo, seen | {func})
+    return memo[func]
+
+def span_breakdown(stats):
+    """Waktu eksklusif (ms) per subsistem; builtin dan pustaka standar dihitung ke pemanggilnya"""
+    spans = {}
+    memo = {}
+    for func, (_, _, tottime, _, callers) in stats.stats.items():
+        if _span(func) is None and callers:
+            for caller, caller_stats in callers.items():
+                span = _owner(caller, stats, memo)
+                spans[span] = spans.get(span, 0.0) + caller_stats[2]
+            continue
+        span = _span(func) or 'lainnya'
+        spans[span] = spans.get(span, 0.0) + tottime
+    return {span: round(seconds * 1000, 2) for span, seconds in
+            sorted(spans.items(), key=lambda item: item[1], reverse=True)}
+
+def _location(func):
+    filename, line, name = func
+    if filename == '~':
+        return name
+    if f"{os.sep}site-packages{os.sep}" in filename:
+        filename = filename.split(f"{os.sep}site-packages{os.sep}", 1)[1]
+    elif filename.startswith(ROOT):
+        filename = os.path.relpath(filename, ROOT)
+    return f"{filename}:{line}({name})"
+
+def top_functions(stats, limit=PROFILE_TOP_FUNCTIONS):
+    rows = []
+    memo = {}
+    for func, (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({'fungsi': _location(func), 'subsistem': _owner(func, stats, memo), 'panggilan': ncalls,
+                     'total_ms': round(tottime * 1000, 2), 'kumulatif_ms': round(cumtime * 1000, 2)})
+    rows.sort(key=lambda row: row['kumulatif_ms'], reverse=True)
+    return rows[:limit]
+
+class TraceStore:
+    """Trace per rerun di folder profil: <id>.prof (pstats) dan <id>.json (ringkasan)"""
+
+    def __init__(self, directory=PROFILE_DIR, keep=PROFILE_KEEP):
+        self.directory = directory
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def save(self, page, profile, duration, status):
+        stats = pstats.Stats(profile)
+        started = datetime.now()
+        trace_id = f"{started.strftime('%Y%m%d%H%M%S%f')}_{page.lower().replace(' ', '_').replace('&', 'dan')}"
+        summary = {
+            'id': trace_id,
+            'halaman': page,
+            'waktu': started.strftime('%Y-%m-%d %H:%M:%S'),
+            'status': status,
+            'durasi_ms': round(duration * 1000, 2),
+            'span_ms': span_breakdown(stats),
+            'fungsi_teratas': top_functions(stats)
+        }
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            stats.dump_stats(os.path.join(self.directory, f"{trace_id}.prof"))
+            with open(os.path.join(self.directory, f"{trace_id}.json"), 'w') as f:
+                json.dump(summary, f, indent=2)
+            self._prune()
+        return summary
+
+    def _prune(self):
+        summaries = sorted(name for name in os.listdir(self.directory) if name.endswith('.json'))
+        for name in summaries[:max(0, len(summaries) - self.keep)]:
+            for extension in ('.json', '.prof'):
+                path = os.path.join(self.directory, name[:-5] + extension)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def load(self, trace_id):
+        with open(os.path.join(self.directory, f"{trace_id}.json")) as f:
+            return json.load(f)
+
+    def traces(self, page=None, limit=None):
+        """Ringkasan trace terbaru dulu: satu baris per rerun dengan kolom per span (ms)"""
+        if not os.path.isdir(self.directory):
+            return pd.DataFrame()
+        rows = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            if not name.endswith('.json'):
+                continue
+            summary = self.load(name[:-5])
+            if page and summary['halaman'] != page:
+                continue
+            rows.append(dict({key: summary[key] for key in ('id', 'halaman', 'waktu', 'status', 'durasi_ms')},
+                             **summary['span_ms']))
+            if limit and len(rows) >= limit:
+                break
+        return pd.DataFrame(rows).fillna(0) if rows else pd.DataFrame()
+
+    def compare(self, page):
+        """Statistik durasi dan span per halaman (median dan p95 atas trace tersimpan)"""
+        listing = self.traces(page)
+        if listing.empty:
+            return listing
+        numeric = listing.drop(columns=['id', 'halaman', 'waktu', 'status'])
+        return pd.DataFrame({'median_ms': numeric.median(), 'p95_ms': numeric.quantile(0.95),
+                             'terakhir_ms': numeric.iloc[0]}).round(2)
+
+traces = TraceStore()
+
+def profiled_page(page):
+    """Dekorator fungsi halaman: saat profiling aktif, setiap rerun diprofil dan trace-nya disimpan.
+
+    Saat tidak aktif fungsi halaman dipanggil langsung tanpa instrumentasi.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiling_enabled() or getattr(_active, 'page', None):
+                return func(*args, **kwargs)
+            profile = cProfile.Profile()
+            status = 'selesai'
+            _active.page = page
+            started = time.perf_counter()
+            profile.enable()
+            try:
+                return func(*args, **kwargs)
+            except BaseException as e:
+                # st.rerun/st.stop juga berupa exception; trace tetap disimpan
+                status = type(e).__name__
+                raise
+            finally:
+                profile.disable()
+                _active.page = None
+                summary = traces.save(page, profile, time.perf_counter() - started, status)
+                st.session_state['_profiling_last'] = summary['id']
+        return wrapper
+    return decorator
+
+def profiling_sidebar():
+    """Toggle profiling untuk admin dan ringkasan trace rerun sebelumnya"""
+    with st.sidebar.expander("🛠️ Admin: Profiling"):
+        if ENABLED:
+            st.caption(f"Profiling aktif untuk semua sesi ({PROFILE_ENV_VAR})")
+        else:
+            st.toggle("Profiling per rerun", key=STATE_KEY)
+        last = st.session_state.get('_profiling_last')
+        if not profiling_enabled() or not last:
+            return
+        try:
+            summary = traces.load(last)
+        except FileNotFoundError:
+            return
+        st.caption(f"{summary['halaman']} · {summary['waktu']} · {summary['durasi_ms']:.0f} ms")
+        st.dataframe(pd.DataFrame({'ms': summary['span_ms']}), use_container_width=True)
+        st.dataframe(traces.compare(summary['halaman']), use_container_width=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Ringkasan trace profiling halaman Sistem OBE")
+    parser.add_argument('--halaman', default=None, help="Filter nama halaman")
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--trace', default=None, help="Tampilkan fungsi teratas satu trace")
+    args = parser.parse_args()
+
+    if args.trace:
+        summary = traces.load(args.trace)
+        print(json.dumps(summary['span_ms'], indent=2))
+        print(pd.DataFrame(summary['fungsi_teratas']).to_string(index=False))
+        return
+    listing = traces.traces(args.halaman, args.limit)
+    if listing.empty:
+        print(f"Belum ada trace di {traces.directory}")
+        return
+    print(listing.to_string(index=False))
+    if args.halaman:
+        print()
+        print(traces.compare(args.halaman).to_string())
+
+if __name__ == "__main__":
+    main()
@@ -11,52 +11,146 @@ from reportlab.platypus import Image
 import plotly.express as px
 import plotly.graph_objects as go
 import plotly.io as pio
+from models.predictive_models import PredictiveAnalytics
+from models.ipo_scoring import IPOScoringEngine
+from database.async_access import load_concurrently
+
+def period_filters(tahun=None, semester=None):
+    """Filter dimensi periode untuk kubus pencapaian; kosong berarti semua periode"""
+    filters = {}
+    if tahun:
+        filters['tahun'] = int(tahun)
+    if semester:
+        filters['semester'] = int(semester)
+    return filters
+
+def period_cutoff(tahun=None, semester=None):
+    """Periode terakhir (tahun, semester) yang boleh dipakai analisis risiko; None berarti semua"""
+    if not tahun:
+        return None
+    return (int(tahun), int(semester) if semester else 2)
+
+def filter_period(data, tahun=None, semester=None):
+    """Baris data (dengan kolom tahun/semester) yang termasuk periode laporan"""
+    for column, value in period_filters(tahun, semester).items():
+        data = data[data[column] == value]
+    return data
+
+def period_label(tahun=None, semester=None):
+    if not tahun and not semester:
+        return "Semua Periode"
+    return " ".join(filter(None, [f"Tahun {tahun}" if tahun else None,
+                                  f"Semester {semester}" if semester else None]))
 
 class ReportGenerator:
     def __init__(self, database):
         self.db = database
+        self.preloaded = {}
+        self.period_risk = {}
+    
+    def preload(self):
+        """Muat sekali data yang dipakai semua laporan (mode batch); berlaku untuk versi data saat ini.
+
+        Hanya data lintas periode yang dimuat di sini; analisis risiko bergantung
+        pada periode laporan sehingga di-cache per periode oleh _risk_assessment.
+        """
+        self.preloaded = {}
+        self.period_risk = {}
+        self.preloaded = load_concurrently(
+            self.db,
+            plo=self.db.get_all_plo,
+            mk=self.db.get_all_mata_kuliah,
+            matrix=(self.db.snapshots.frame, 'plo_clo_matrix'),
+            assessment=(self.db.snapshots.frame, 'assessment'),
+            ipo=self.db.get_ipo_data
+        )
+        # Sel kubus pencapaian di-cache per proses; roll-up per periode tinggal groupby
+        self.db.attainment.frame()
+        return self.preloaded
+    
+    def _load(self, **calls):
+        """load_concurrently, kecuali data yang sudah dimuat lewat preload()"""
+        data = {name: self.preloaded[name] for name in calls if name in self.preloaded}
+        pending = {name: spec for name, spec in calls.items() if name not in self.preloaded}
+        if pending:
+            data.update(load_concurrently(self.db, **pending))
+        return data
+    
+    def _risk_assessment(self, tahun=None, semester=None):
+        """Risiko PLO dari riwayat sampai periode laporan; di mode batch di-cache per periode"""
+        sampai = period_cutoff(tahun, semester)
+        if sampai in self.period_risk:
+            return self.period_risk[sampai]
+        risk = PredictiveAnalytics(self.db).calculate_plo_risk_assessment(sampai=sampai)
+        if self.preloaded:
+            self.period_risk[sampai] = risk
+        return risk
     
-    def generate_excel_report(self):
+    @staticmethod
+    def renderer(jenis_laporan, format_laporan):
+        """Nama method pembuat laporan untuk jenis dan format dari halaman Automated Reporting"""
+        if jenis_laporan == 'Laporan Akreditasi LAM INFOKOM' and format_laporan == 'PDF':
+            return 'generate_lam_infokom_report'
+        if format_laporan == 'Excel':
+            return 'generate_excel_report'
+        return 'generate_pdf_report'
+    
+    def generate(self, jenis_laporan, format_laporan, tahun=None, semester=None):
+        """Laporan (BytesIO) untuk jenis, format dan periode tertentu"""
+        return getattr(self, self.renderer(jenis_laporan, format_laporan))(tahun, semester)
+    
+    def generate_excel_report(self, tahun=None, semester=None):
         """Generate comprehensive Excel report untuk akreditasi"""
         output = io.BytesIO()
         
+        # Data semua sheet dibaca bersamaan, penulisan workbook tetap berurutan
+        data = self._load(
+            summary=(self._prepare_summary_data, tahun, semester),
+            plo=self.db.get_all_plo,
+            matrix=(self.db.snapshots.frame, 'plo_clo_matrix'),
+            assessment=(self.db.snapshots.frame, 'assessment'),
+            ipo=self.db.get_ipo_data,
+            risk=(self._risk_assessment, tahun, semester)
+        )
+        
         with pd.ExcelWriter(output, engine='openpyxl') as writer:
             # Sheet 1: Summary Dashboard
-            summary_data = self._prepare_summary_data()
-            summary_df = pd.DataFrame([summary_data])
+            summary_df = pd.DataFrame([data['summary']])
             summary_df.to_excel(writer, sheet_name='Dashboard Summary', index=False)
             
             # Sheet 2: PLO Data
-            plo_data = self.db.get_all_plo()
-            plo_data.to_excel(writer, sheet_name='Data PLO', index=False)
+            data['plo'].to_excel(writer, sheet_name='Data PLO', index=False)
             
             # Sheet 3: PLO-CLO Matrix
-            matrix_data = self.db.get_plo_clo_matrix()
-            matrix_data.to_excel(writer, sheet_name='Matriks PLO-CLO', index=False)
+            data['matrix'].to_excel(writer, sheet_name='Matriks PLO-CLO', index=False)
             
             # Sheet 4: Assessment Data
-            assessment_data = self.db.get_assessment_data()
+            assessment_data = filter_period(data['assessment'], tahun, semester)
             assessment_data.to_excel(writer, sheet_name='Data Assessment', index=False)
             
             # Sheet 5: IPO Data
-            ipo_data = self.db.get_ipo_data()
+            ipo_data = filter_period(data['ipo'], tahun, semester)
             ipo_data.to_excel(writer, sheet_name='Matriks IPO', index=False)
             
+            # Sheet 5b: Skor Akreditasi IPO
+            ipo_scores = IPOScoringEngine(self.db).score_periods(ipo_data)
+            if not ipo_scores.empty:
+                ipo_scores.to_excel(writer, sheet_name='Skor Akreditasi IPO', index=False)
+            
             # Sheet 6: Predictive Analytics
-            predictive = PredictiveAnalytics(self.db)
-            risk_data = predictive.calculate_plo_risk_assessment()
+            risk_data = data['risk']
             if not risk_data.empty:
                 risk_data.to_excel(writer, sheet_name='Analisis Risiko PLO', index=False)
             
             # Sheet 7: Recommendations
-            recommendations = self._generate_recommendations()
+            recommendations = self._generate_recommendations(risk_data)
             rec_df = pd.DataFrame(recommendations, columns=['Kategori', 'Rekomendasi', 'Prioritas'])
             rec_df.to_excel(writer, sheet_name='Rekomendasi', index=False)
         
         output.seek(0)
         return output
     
-    def generate_pdf_report(self):
+    def generate_pdf_report(self, tahun=None, semester=None):
         """Generate professional PDF report untuk LAM INFOKOM"""
         buffer = io.BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=1*inch)
@@ -73,10 +167,12 @@ class ReportGenerator:
         )
         title = Paragraph("LAPORAN SISTEM OBE PROGRAM STUDI SISTEM INFORMASI", title_style)
         story.append(title)
+        story.append(Paragraph(f"Periode: {period_label(tahun, semester)}", styles['Normal']))
+        story.append(Spacer(1, 0.2*inch))
         
         # Executive Summary
         story.append(Paragraph("1. Ringkasan Eksekutif", styles['Heading2']))
-        summary = self._prepare_summary_data()
+        summary = self._prepare_summary_data(tahun, semester)
         
         summary_table_data = [
             ['Metric', 'Nilai'],
@@ -103,15 +199,13 @@ class ReportGenerator:
         
         # PLO Achievement
         story.append(Paragraph("2. Pencapaian Program Learning Outcomes", styles['Heading2']))
-        plo_data = self.db.get_all_plo()
-        assessment_data = self.db.get_assessment_data()
-        
-        if not assessment_data.empty:
-            # Calculate PLO achievement
-            matrix_data = self.db.get_plo_clo_matrix()
-            merged_data = pd.merge(assessment_data, matrix_data, on=['kode_mk', 'kode_clo'])
-            plo_achievement = merged_data.groupby('kode_plo')['nilai_rata_rata'].mean().reset_index()
-            plo_achievement = pd.merge(plo_achievement, plo_data, on='kode_plo')
+        plo_data = self._load(plo=self.db.get_all_plo)['plo']
+        # Roll-up per PLO dari kubus pencapaian
+        plo_achievement = self.db.attainment.rollup(['kode_plo'], period_filters(tahun, semester))
+        
+        if not plo_achievement.empty:
+            plo_achievement = pd.merge(plo_achievement[['kode_plo', 'pencapaian']],
+                                       plo_data[['kode_plo', 'deskripsi', 'kategori']], on='kode_plo')
             plo_achievement.columns = ['Kode PLO', 'Pencapaian', 'Deskripsi', 'Kategori']
             plo_achievement['Pencapaian'] = plo_achievement['Pencapaian'].round(2)
             
@@ -137,7 +231,7 @@ class ReportGenerator:
         
         # Recommendations
         story.append(Paragraph("3. Rekomendasi Perbaikan", styles['Heading2']))
-        recommendations = self._generate_recommendations()
+        recommendations = self._generate_recommendations(tahun=tahun, semester=semester)
         
         for i, rec in enumerate(recommendations[:5], 1):  # Show top 5 recommendations
             story.append(Paragraph(f"{i}. {rec['Kategori']}: {rec['Rekomendasi']}", styles['Normal']))
@@ -147,32 +241,42 @@ class ReportGenerator:
         buffer.seek(0)
         return buffer
     
-    def _prepare_summary_data(self):
+    def _prepare_summary_data(self, tahun=None, semester=None):
         """Mempersiapkan data summary untuk reporting"""
-        plo_data = self.db.get_all_plo()
-        mk_data = self.db.get_all_mata_kuliah()
-        assessment_data = self.db.get_assessment_data()
+        data = self._load(
+            plo=self.db.get_all_plo,
+            mk=self.db.get_all_mata_kuliah,
+            achievement=(self.db.attainment.rollup, [], period_filters(tahun, semester)),
+            ipo=self.db.get_ipo_data
+        )
+        plo_data = data['plo']
+        mk_data = data['mk']
         
-        # Calculate average PLO achievement
+        # Calculate average PLO achievement dari kubus pencapaian
         avg_achievement = 75.0  # Default
-        if not assessment_data.empty:
-            matrix_data = self.db.get_plo_clo_matrix()
-            merged_data = pd.merge(assessment_data, matrix_data, on=['kode_mk', 'kode_clo'])
-            avg_achievement = merged_data['nilai_rata_rata'].mean()
+        if data['achievement']['jumlah_nilai'].sum() > 0:
+            avg_achievement = data['achievement']['pencapaian'].iloc[0]
+        
+        # Status akreditasi dari skor IPO tertimbang periode laporan (terbaru bila semua periode)
+        accreditation = IPOScoringEngine(self.db).latest_accreditation(filter_period(data['ipo'], tahun, semester))
+        if accreditation is None:
+            accreditation_status = 'Belum ada data IPO'
+        else:
+            accreditation_status = f"{accreditation['peringkat']} ({accreditation['nilai_akreditasi']:.2f})"
         
         return {
             'total_plo': len(plo_data),
             'total_mk': len(mk_data),
             'avg_plo_achievement': round(avg_achievement, 2),
             'stakeholder_satisfaction': 4.2,  # This would come from survey data
-            'accreditation_status': 'Terakreditasi B',
+            'accreditation_status': accreditation_status,
             'report_date': datetime.now().strftime('%Y-%m-%d')
         }
     
-    def _generate_recommendations(self):
-        """Generate rekomendasi berdasarkan analisis data"""
-        predictive = PredictiveAnalytics(self.db)
-        risk_data = predictive.calculate_plo_risk_assessment()
+    def _generate_recommendations(self, risk_data=None, tahun=None, semester=None):
+        """Generate rekomendasi berdasarkan analisis data sampai periode laporan"""
+        if risk_data is None:
+            risk_data = self._risk_assessment(tahun, semester)
         
         recommendations = []
         
@@ -206,7 +310,60 @@ class ReportGenerator:
         
         return recommendations
     
-    def generate_lam_infokom_report(self):
+    def generate_diff_report(self, diff, format_laporan='Excel'):
+        """Laporan perubahan (hasil ReportDiff.compare_*) hanya berisi baris yang berubah"""
+        titles = {
+            'pencapaian_plo': 'Perubahan Pencapaian PLO',
+            'risiko': 'Transisi Tingkat Risiko',
+            'pemetaan': 'Perubahan Pemetaan PLO-CLO',
+            'ipo': 'Perubahan Komponen IPO'
+        }
+        summary = pd.DataFrame(
+            [{'Bagian': titles[bagian], 'Jumlah Perubahan': jumlah} for bagian, jumlah in diff['ringkasan'].items()]
+        )
+        
+        if format_laporan == 'Excel':
+            output = io.BytesIO()
+            with pd.ExcelWriter(output, engine='openpyxl') as writer:
+                pd.DataFrame([{'Dari': diff['dari'], 'Sampai': diff['sampai']}]).to_excel(
+                    writer, sheet_name='Ringkasan', index=False)
+                summary.to_excel(writer, sheet_name='Ringkasan', index=False, startrow=3)
+                for bagian, changes in diff['bagian'].items():
+                    if not changes.empty:
+                        changes.to_excel(writer, sheet_name=titles[bagian][:31], index=False)
+            output.seek(0)
+            return output
+        
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=1*inch)
+        styles = getSampleStyleSheet()
+        story = [
+            Paragraph("LAPORAN PERUBAHAN SISTEM OBE", styles['Heading1']),
+            Paragraph(f"{diff['dari']} &rarr; {diff['sampai']}", styles['Normal']),
+            Spacer(1, 0.2*inch)
+        ]
+        table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('FONTSIZE', (0, 0), (-1, -1), 7)
+        ])
+        for bagian, changes in diff['bagian'].items():
+            story.append(Paragraph(f"{titles[bagian]} ({len(changes)})", styles['Heading2']))
+            if changes.empty:
+                story.append(Paragraph("Tidak ada perubahan.", styles['Normal']))
+            else:
+                rows = changes.astype(object).where(changes.notna(), '-')
+                table = Table([list(changes.columns)] + rows.values.tolist(), repeatRows=1)
+                table.setStyle(table_style)
+                story.append(table)
+            story.append(Spacer(1, 0.2*inch))
+        doc.build(story)
+        buffer.seek(0)
+        return buffer
+    
+    def generate_lam_infokom_report(self, tahun=None, semester=None):
         """Generate report khusus format LAM INFOKOM"""
         # This would include specific templates and formats required by LAM INFOKOM
-        return self.generate_pdf_report()
\ No newline at end of file
+        return self.generate_pdf_report(tahun, semester)
\ No newline at end of file
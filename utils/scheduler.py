@@ -0,0 +1,170 @@
+import os
+import time
+import argparse
+import calendar
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from utils.reporting import ReportGenerator
+from models.report_diff import ReportDiff
+from utils.config import (REPORT_OUTPUT_DIR, REPORT_OUTBOX_DIR, REPORT_SENDER,
+                          SCHEDULER_POLL_INTERVAL)
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+FREQUENCY_MONTHS = {
+    'Bulanan': 1,
+    'Semesteran': 6,
+    'Tahunan': 12
+}
+
+REPORT_MIME_TYPES = {
+    'Excel': ('xlsx', 'application', 'vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'PDF': ('pdf', 'application', 'pdf')
+}
+
+def next_run_time(current, frekuensi):
+    """Waktu eksekusi berikutnya untuk frekuensi jadwal"""
+    if frekuensi == 'Mingguan':
+        return current + timedelta(days=7)
+    months = FREQUENCY_MONTHS[frekuensi]
+    month_index = current.month - 1 + months
+    year = current.year + month_index // 12
+    month = month_index % 12 + 1
+    day = min(current.day, calendar.monthrange(year, month)[1])
+    return current.replace(year=year, month=month, day=day)
+
+class LocalOutboxDelivery:
+    """Pengiriman laporan sebagai file .eml di folder outbox (stub SMTP)"""
+
+    def __init__(self, outbox_dir=REPORT_OUTBOX_DIR, sender=REPORT_SENDER):
+        self.outbox_dir = outbox_dir
+        self.sender = sender
+
+    def deliver(self, schedule, artifact_path):
+        recipients = [r.strip() for r in (schedule['penerima'] or '').split(',') if r.strip()]
+        if not recipients:
+            return None
+
+        os.makedirs(self.outbox_dir, exist_ok=True)
+        message = EmailMessage()
+        message['From'] = self.sender
+        message['To'] = ', '.join(recipients)
+        message['Subject'] = f"[OBE] {schedule['jenis_laporan']} - {schedule['nama']}"
+        message.set_content(
+            f"Laporan terjadwal ({schedule['frekuensi']}) terlampir.\n"
+            f"Dibuat otomatis oleh Sistem OBE pada {datetime.now().strftime(TIMESTAMP_FORMAT)}."
+        )
+        _, maintype, subtype = REPORT_MIME_TYPES[schedule['format_laporan']]
+        with open(artifact_path, 'rb') as f:
+            message.add_attachment(f.read(), maintype=maintype, subtype=subtype,
+                                   filename=os.path.basename(artifact_path))
+
+        eml_path = os.path.join(
+            self.outbox_dir,
+            f"schedule_{schedule['id']}_{datetime.now().strftime('%Y%m%d%H%M%S%f')}.eml"
+        )
+        with open(eml_path, 'wb') as f:
+            f.write(bytes(message))
+        return eml_path
+
+class ReportScheduler:
+    """Menjalankan jadwal laporan yang tersimpan di database.
+
+    Laporan hanya dibuat ulang bila versi data berubah; jika laporan yang
+    identik (jenis, format, versi data) sudah pernah dibuat, artifact
+    sebelumnya dipakai ulang dan langsung dikirim.
+    """
+
+    def __init__(self, database, output_dir=REPORT_OUTPUT_DIR, delivery=None):
+        self.db = database
+        self.output_dir = output_dir
+        self.delivery = delivery or LocalOutboxDelivery()
+        self.report_generator = ReportGenerator(database)
+
+    def add_schedule(self, nama, jenis_laporan, format_laporan, frekuensi, penerima, mulai=None):
+        if format_laporan not in REPORT_MIME_TYPES:
+            raise ValueError(f"Format laporan tidak dikenal: {format_laporan}")
+        if frekuensi != 'Mingguan' and frekuensi not in FREQUENCY_MONTHS:
+            raise ValueError(f"Frekuensi tidak dikenal: {frekuensi}")
+        mulai = mulai or datetime.now()
+        return self.db.add_report_schedule(nama, jenis_laporan, format_laporan, frekuensi, penerima,
+                                           mulai.strftime(TIMESTAMP_FORMAT))
+
+    def run_due(self, now=None):
+        """Menjalankan semua jadwal yang sudah jatuh tempo"""
+        now = now or datetime.now()
+        results = []
+        for _, schedule in self.db.get_due_report_schedules(now.strftime(TIMESTAMP_FORMAT)).iterrows():
+            current = datetime.strptime(schedule['jadwal_berikutnya'], TIMESTAMP_FORMAT)
+            upcoming = next_run_time(current, schedule['frekuensi'])
+            # Jadwal yang tertinggal tidak dijalankan berulang kali
+            while upcoming <= now:
+                upcoming = next_run_time(upcoming, schedule['frekuensi'])
+
+            if not self.db.claim_report_schedule(schedule['id'], schedule['jadwal_berikutnya'],
+                                                 upcoming.strftime(TIMESTAMP_FORMAT)):
+                continue
+            results.append(self.run_schedule(schedule))
+        return results
+
+    def run_schedule(self, schedule):
+        """Membuat (atau memakai ulang) laporan untuk satu jadwal lalu mengirimkannya"""
+        started = datetime.now().strftime(TIMESTAMP_FORMAT)
+        data_version = self.db.get_data_version()
+        status, artifact_path, pesan = 'sukses', None, None
+
+        try:
+            artifact_path = self.db.find_report_artifact(schedule['jenis_laporan'],
+                                                         schedule['format_laporan'], data_version)
+            if artifact_path and os.path.exists(artifact_path):
+                status = 'dipakai_ulang'
+                pesan = "Data tidak berubah sejak laporan terakhir"
+            else:
+                artifact_path = self._generate(schedule, data_version)
+
+            delivered = self.delivery.deliver(schedule, artifact_path)
+            if delivered:
+                pesan = "; ".join(filter(None, [pesan, f"Dikirim: {delivered}"]))
+        except Exception as e:
+            status, pesan = 'gagal', str(e)
+
+        self.db.add_report_run(schedule['id'], schedule['jenis_laporan'], schedule['format_laporan'],
+                               data_version, status, artifact_path, pesan, started,
+                               datetime.now().strftime(TIMESTAMP_FORMAT))
+        return {'schedule_id': schedule['id'], 'status': status,
+                'artifact_path': artifact_path, 'pesan': pesan}
+
+    def _generate(self, schedule, data_version):
+        report = self.report_generator.generate(schedule['jenis_laporan'], schedule['format_laporan'])
+        # Hasil terstruktur disimpan sebagai dasar laporan perubahan berikutnya
+        ReportDiff(self.db).capture()
+
+        extension = REPORT_MIME_TYPES[schedule['format_laporan']][0]
+        slug = schedule['jenis_laporan'].lower().replace(' ', '_')
+        os.makedirs(self.output_dir, exist_ok=True)
+        artifact_path = os.path.join(self.output_dir, f"{slug}_v{data_version}.{extension}")
+        with open(artifact_path, 'wb') as f:
+            f.write(report.getvalue())
+        return artifact_path
+
+def main():
+    from database.database import OBEDatabase
+
+    parser = argparse.ArgumentParser(description="Worker jadwal laporan otomatis Sistem OBE")
+    parser.add_argument('--db', default="database/obe_database.db")
+    parser.add_argument('--interval', type=int, default=SCHEDULER_POLL_INTERVAL,
+                        help="Jeda antar pengecekan jadwal (detik)")
+    parser.add_argument('--once', action='store_true', help="Jalankan jadwal jatuh tempo sekali lalu keluar")
+    args = parser.parse_args()
+
+    scheduler = ReportScheduler(OBEDatabase(args.db))
+    while True:
+        for result in scheduler.run_due():
+            print(f"[{datetime.now().strftime(TIMESTAMP_FORMAT)}] Jadwal {result['schedule_id']}: "
+                  f"{result['status']} {result['artifact_path'] or ''}")
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    main()
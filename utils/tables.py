@@ -0,0 +1,84 @@
+import streamlit as st
+
+def _page_state(key, signature):
+    """State pagination per tabel; direset saat sort/filter berubah"""
+    state_key = f"_pagination_{key}"
+    state = st.session_state.get(state_key)
+    if state is None or state['signature'] != signature:
+        state = {'signature': signature, 'cursors': [None], 'page': 0}
+        st.session_state[state_key] = state
+    return state
+
+def _pager(key, state, has_next, total=None, page_size=None):
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("⬅️ Sebelumnya", key=f"{key}_prev", disabled=state['page'] == 0,
+                     use_container_width=True):
+            state['page'] -= 1
+            st.rerun()
+    with col2:
+        label = f"Halaman {state['page'] + 1}"
+        if total is not None and page_size:
+            label += f" dari {max(1, -(-total // page_size))} ({total} baris)"
+        st.caption(label)
+    with col3:
+        if st.button("Berikutnya ➡️", key=f"{key}_next", disabled=not has_next,
+                     use_container_width=True):
+            state['page'] += 1
+            st.rerun()
+
+def _render(page, style_func, style_subset):
+    if style_func is not None and not page.empty:
+        # Styling hanya untuk baris yang dirender
+        st.dataframe(page.style.applymap(style_func, subset=style_subset), use_container_width=True)
+    else:
+        st.dataframe(page, use_container_width=True)
+
+def paginated_table(database, table, key, columns=None, sort_options=None, filter_columns=None,
+                    page_size=50, show_total=True, style_func=None, style_subset=None):
+    """Tabel dengan pagination di sisi server (keyset query ke OBEDatabase).
+
+    Hanya satu halaman yang dibaca dari SQLite dan dikirim ke browser; sort
+    dan filter dieksekusi sebagai SQL.
+    """
+    sort_options = sort_options or ['id']
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        sort_by = st.selectbox("Urutkan berdasarkan:", sort_options, key=f"{key}_sort")
+    with col2:
+        descending = st.checkbox("Menurun", value=True, key=f"{key}_desc")
+
+    filters = []
+    if filter_columns:
+        filter_cols = st.columns(len(filter_columns))
+        for column, container in zip(filter_columns, filter_cols):
+            with container:
+                value = st.text_input(f"Filter {column}:", key=f"{key}_filter_{column}").strip()
+            if value:
+                filters.append((column, '=', int(value)) if value.isdigit()
+                               else (column, 'LIKE', f"{value}%"))
+
+    state = _page_state(key, (sort_by, descending, tuple(filters), page_size))
+    # Cursor halaman saat ini diambil dari riwayat cursor halaman sebelumnya
+    page, next_cursor = database.get_page(table, columns=columns, sort_by=sort_by,
+                                          descending=descending, filters=filters,
+                                          after=state['cursors'][state['page']],
+                                          page_size=page_size)
+    del state['cursors'][state['page'] + 1:]
+    if next_cursor is not None:
+        state['cursors'].append(next_cursor)
+
+    _render(page, style_func, style_subset)
+    total = database.count_rows(table, filters) if show_total else None
+    _pager(key, state, next_cursor is not None, total, page_size)
+    return page
+
+def paginated_dataframe(df, key, page_size=50, style_func=None, style_subset=None):
+    """Pagination untuk DataFrame hasil analitik yang sudah ada di memori"""
+    state = _page_state(key, (len(df), tuple(df.columns), page_size))
+    start = state['page'] * page_size
+    page = df.iloc[start:start + page_size]
+
+    _render(page, style_func, style_subset)
+    _pager(key, state, start + page_size < len(df), len(df), page_size)
+    return page